@@ -0,0 +1,65 @@
+"""baseline schema: users, ml_models, predictions
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Базы, созданные до миграций через create_all, уже содержат эти таблицы
+    if migrations.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("credits", sa.Float(), nullable=True),
+    ):
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if migrations.create_table(
+        "ml_models",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("description", sa.String(), nullable=True),
+        sa.Column("version", sa.String(), nullable=True),
+        sa.Column("model_path", sa.String(), nullable=True),
+        sa.Column("model_type", sa.String(), nullable=True),
+        sa.Column("cost_per_prediction", sa.Float(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), nullable=True),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    ):
+        op.create_index("ix_ml_models_id", "ml_models", ["id"])
+        op.create_index("ix_ml_models_name", "ml_models", ["name"])
+
+    if migrations.create_table(
+        "predictions",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("model_id", sa.Integer(), sa.ForeignKey("ml_models.id"), nullable=True),
+        sa.Column("input_data", sa.ARRAY(sa.Float()), nullable=True),
+        sa.Column("prediction_result", sa.ARRAY(sa.Float()), nullable=True),
+        sa.Column("cost", sa.Float(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("input_file_path", sa.String(), nullable=True),
+        sa.Column("result_file_path", sa.String(), nullable=True),
+    ):
+        op.create_index("ix_predictions_id", "predictions", ["id"])
+
+def downgrade() -> None:
+    op.drop_table("predictions")
+    op.drop_table("ml_models")
+    op.drop_table("users")
@@ -0,0 +1,23 @@
+"""users.is_superuser for the admin endpoints
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    migrations.add_column(
+        "users",
+        sa.Column("is_superuser", sa.Boolean(), nullable=True, server_default=sa.false()),
+    )
+
+def downgrade() -> None:
+    migrations.drop_column("users", "is_superuser")
@@ -0,0 +1,25 @@
+"""ml_models.artifact_sha256 and artifact_size for streamed uploads
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    migrations.add_column("ml_models", sa.Column("artifact_sha256", sa.String(64), nullable=True))
+    migrations.add_column("ml_models", sa.Column("artifact_size", sa.BigInteger(), nullable=True))
+    migrations.create_index("ix_ml_models_artifact_sha256", "ml_models", ["artifact_sha256"])
+
+def downgrade() -> None:
+    op.drop_index("ix_ml_models_artifact_sha256", table_name="ml_models")
+    migrations.drop_column("ml_models", "artifact_size")
+    migrations.drop_column("ml_models", "artifact_sha256")
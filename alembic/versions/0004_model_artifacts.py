@@ -0,0 +1,41 @@
+"""model_artifacts table for content-addressed storage
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if migrations.create_table(
+        "model_artifacts",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("sha256", sa.String(64), nullable=False),
+        sa.Column("object_name", sa.String(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=False),
+        sa.Column("cost_per_prediction", sa.Float(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    ):
+        op.create_index("ix_model_artifacts_id", "model_artifacts", ["id"])
+        op.create_index("ix_model_artifacts_sha256", "model_artifacts", ["sha256"], unique=True)
+
+    # Модели, загруженные до хранения по хешу, не ссылаются на артефакт: внешний ключ допускает NULL
+    migrations.create_foreign_key(
+        "ml_models_artifact_sha256_fkey",
+        "ml_models",
+        "model_artifacts",
+        ["artifact_sha256"],
+        ["sha256"],
+    )
+
+def downgrade() -> None:
+    op.drop_constraint("ml_models_artifact_sha256_fkey", "ml_models", type_="foreignkey")
+    op.drop_table("model_artifacts")
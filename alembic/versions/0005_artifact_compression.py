@@ -0,0 +1,24 @@
+"""compression codec of stored artifacts
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    migrations.add_column("ml_models", sa.Column("compression", sa.String(), nullable=True))
+    migrations.add_column("model_artifacts", sa.Column("stored_size", sa.BigInteger(), nullable=True))
+    migrations.add_column("model_artifacts", sa.Column("compression", sa.String(), nullable=True))
+
+def downgrade() -> None:
+    migrations.drop_column("model_artifacts", "compression")
+    migrations.drop_column("model_artifacts", "stored_size")
+    migrations.drop_column("ml_models", "compression")
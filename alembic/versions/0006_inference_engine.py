@@ -0,0 +1,22 @@
+"""inference engine chosen at upload
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    migrations.add_column("ml_models", sa.Column("inference_engine", sa.String(), nullable=True))
+    migrations.add_column("model_artifacts", sa.Column("inference_engine", sa.String(), nullable=True))
+
+def downgrade() -> None:
+    migrations.drop_column("model_artifacts", "inference_engine")
+    migrations.drop_column("ml_models", "inference_engine")
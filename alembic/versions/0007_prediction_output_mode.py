@@ -0,0 +1,22 @@
+"""predictions.probabilities and output_mode
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    migrations.add_column("predictions", sa.Column("probabilities", sa.ARRAY(sa.Float()), nullable=True))
+    migrations.add_column("predictions", sa.Column("output_mode", sa.String(), nullable=True))
+
+def downgrade() -> None:
+    migrations.drop_column("predictions", "output_mode")
+    migrations.drop_column("predictions", "probabilities")
@@ -0,0 +1,31 @@
+"""feature schema captured at upload
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("n_features", sa.Integer),
+    ("feature_names", sa.JSON),
+    ("input_dtype", sa.String),
+    ("classes", sa.JSON),
+)
+
+def upgrade() -> None:
+    for table_name in ("ml_models", "model_artifacts"):
+        for name, column_type in COLUMNS:
+            migrations.add_column(table_name, sa.Column(name, column_type(), nullable=True))
+
+def downgrade() -> None:
+    for table_name in ("model_artifacts", "ml_models"):
+        for name, _ in reversed(COLUMNS):
+            migrations.drop_column(table_name, name)
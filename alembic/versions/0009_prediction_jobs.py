@@ -0,0 +1,45 @@
+"""prediction_jobs queue
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if migrations.create_table(
+        "prediction_jobs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("model_id", sa.Integer(), sa.ForeignKey("ml_models.id"), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("input_format", sa.String(), nullable=False),
+        sa.Column("input_file_path", sa.String(), nullable=True),
+        sa.Column("result_file_path", sa.String(), nullable=True),
+        sa.Column("output_format", sa.String(), nullable=False),
+        sa.Column("output_mode", sa.String(), nullable=False),
+        sa.Column("store_input", sa.Boolean(), nullable=True),
+        sa.Column("rows_total", sa.Integer(), nullable=True),
+        sa.Column("rows_processed", sa.Integer(), nullable=True),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=True),
+        sa.Column("error", sa.String(), nullable=True),
+        sa.Column("prediction_id", sa.Integer(), sa.ForeignKey("predictions.id"), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+    ):
+        op.create_index("ix_prediction_jobs_id", "prediction_jobs", ["id"])
+        op.create_index("ix_prediction_jobs_user_id", "prediction_jobs", ["user_id"])
+        op.create_index("ix_prediction_jobs_status", "prediction_jobs", ["status"])
+
+def downgrade() -> None:
+    op.drop_table("prediction_jobs")
@@ -0,0 +1,23 @@
+"""prediction_jobs.parallel for sharded scoring
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    migrations.add_column(
+        "prediction_jobs",
+        sa.Column("parallel", sa.Boolean(), nullable=True, server_default=sa.false()),
+    )
+
+def downgrade() -> None:
+    migrations.drop_column("prediction_jobs", "parallel")
@@ -0,0 +1,29 @@
+"""worker_nodes for model-affinity routing
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if migrations.create_table(
+        "worker_nodes",
+        sa.Column("worker_id", sa.String(), primary_key=True),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("weight", sa.Float(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+    ):
+        op.create_index("ix_worker_nodes_heartbeat_at", "worker_nodes", ["heartbeat_at"])
+
+def downgrade() -> None:
+    op.drop_table("worker_nodes")
@@ -0,0 +1,20 @@
+"""ml_models.inference_threads
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    migrations.add_column("ml_models", sa.Column("inference_threads", sa.Integer(), nullable=True))
+
+def downgrade() -> None:
+    migrations.drop_column("ml_models", "inference_threads")
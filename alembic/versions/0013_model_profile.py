@@ -0,0 +1,31 @@
+"""performance profile measured at upload
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19
+"""
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0013"
+down_revision = "0012"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("profile_load_time", sa.Float),
+    ("profile_memory_bytes", sa.BigInteger),
+    ("profile_latency_single", sa.Float),
+    ("profile_latency_batch", sa.Float),
+)
+
+def upgrade() -> None:
+    for table_name in ("ml_models", "model_artifacts"):
+        for name, column_type in COLUMNS:
+            migrations.add_column(table_name, sa.Column(name, column_type(), nullable=True))
+
+def downgrade() -> None:
+    for table_name in ("model_artifacts", "ml_models"):
+        for name, _ in reversed(COLUMNS):
+            migrations.drop_column(table_name, name)
@@ -0,0 +1,32 @@
+"""model_aliases for current-version routing
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0014"
+down_revision = "0013"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if migrations.create_table(
+        "model_aliases",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("model_id", sa.Integer(), sa.ForeignKey("ml_models.id"), nullable=False),
+        sa.Column("previous_model_id", sa.Integer(), sa.ForeignKey("ml_models.id"), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("promoted_at", sa.DateTime(), nullable=True),
+    ):
+        op.create_index("ix_model_aliases_id", "model_aliases", ["id"])
+        op.create_index("ix_model_aliases_name", "model_aliases", ["name"], unique=True)
+
+def downgrade() -> None:
+    op.drop_table("model_aliases")
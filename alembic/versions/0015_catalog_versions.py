@@ -0,0 +1,26 @@
+"""catalog_versions for model catalogue validators
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0015"
+down_revision = "0014"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    migrations.create_table(
+        "catalog_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+def downgrade() -> None:
+    op.drop_table("catalog_versions")
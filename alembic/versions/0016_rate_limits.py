@@ -0,0 +1,41 @@
+"""per-user plans, quotas and rate_limit_usage
+
+Revision ID: 0016
+Revises: 0015
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0016"
+down_revision = "0015"
+branch_labels = None
+depends_on = None
+
+COLUMNS = (
+    ("plan", sa.String),
+    ("rate_limit", sa.Float),
+    ("rate_burst", sa.Integer),
+    ("max_concurrent_predictions", sa.Integer),
+)
+
+def upgrade() -> None:
+    # Пустые лимиты берутся из тарифа по умолчанию
+    for name, column_type in COLUMNS:
+        migrations.add_column("users", sa.Column(name, column_type(), nullable=True))
+
+    if migrations.create_table(
+        "rate_limit_usage",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("window_start", sa.DateTime(), primary_key=True),
+        sa.Column("requests", sa.Integer(), nullable=False),
+    ):
+        op.create_index("ix_rate_limit_usage_window_start", "rate_limit_usage", ["window_start"])
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_usage")
+
+    for name, _ in reversed(COLUMNS):
+        migrations.drop_column("users", name)
@@ -0,0 +1,32 @@
+"""api_keys for service clients
+
+Revision ID: 0017
+Revises: 0016
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.db import migrations
+
+revision = "0017"
+down_revision = "0016"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if migrations.create_table(
+        "api_keys",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("prefix", sa.String(), nullable=False),
+        sa.Column("key_hash", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    ):
+        op.create_index("ix_api_keys_id", "api_keys", ["id"])
+        op.create_index("ix_api_keys_user_id", "api_keys", ["user_id"])
+        op.create_index("ix_api_keys_prefix", "api_keys", ["prefix"], unique=True)
+
+def downgrade() -> None:
+    op.drop_table("api_keys")
@@ -0,0 +1,286 @@
+import json
+import logging
+import re
+import time
+from typing import AsyncIterator, Optional
+from urllib.parse import parse_qs, unquote
+
+import httpx
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import AFFINITY_ROUTED
+from app.core.security import create_forward_signature, verify_forward_signature
+from app.services.affinity import AFFINITY_MODE_REDIRECT, AffinityRouter
+from app.services.model_aliases import model_alias_manager
+
+logger = logging.getLogger(__name__)
+
+# Значение: "<worker_id>:<expires_at>:<подпись>", подпись HMAC на SECRET_KEY от метода и пути
+FORWARDED_HEADER = "x-affinity-forwarded"
+WORKER_HEADER = "x-affinity-worker"
+# Для /predictions/file id модели передается заголовком: разбирать multipart ради маршрутизации дорого
+MODEL_HEADER = "x-model-id"
+
+MODEL_PREDICT_PATH = re.compile(rf"^{re.escape(settings.API_V1_STR)}/models/(\d+)/predict/?$")
+ALIAS_PREDICT_PATH = re.compile(rf"^{re.escape(settings.API_V1_STR)}/models/aliases/([^/]+)/predict/?$")
+JSON_PREDICTION_PATHS = {
+    f"{settings.API_V1_STR}/predictions/",
+    f"{settings.API_V1_STR}/predictions/batch",
+}
+FILE_PREDICTION_PATH = f"{settings.API_V1_STR}/predictions/file"
+# Бинарный батч несет id модели в строке запроса, тело не разбирается
+BINARY_PREDICTION_PATH = f"{settings.API_V1_STR}/predictions/batch/binary"
+
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "content-encoding",
+    "content-length",
+    "host",
+    "keep-alive",
+    "transfer-encoding",
+}
+
+class AffinityMiddleware:
+    """
+    Направляет запросы предсказаний воркеру, которому принадлежит модель.
+
+    В режиме forward запрос проксируется владельцу, в режиме redirect
+    клиент получает 307 с адресом владельца в Location и X-Affinity-Worker.
+    Если владелец недоступен, запрос обслуживается на месте.
+
+    Перенаправленный запрос помечается подписанным заголовком, без верной
+    подписи заголовок не учитывается. HTTP-клиент закрывается при остановке
+    приложения.
+    """
+
+    def __init__(self, app: ASGIApp, router: AffinityRouter):
+        self.app = app
+        self.router = router
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=settings.AFFINITY_FORWARD_TIMEOUT)
+
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self.app(scope, receive, self._close_on_shutdown(send))
+            return
+
+        if scope["type"] != "http" or scope["method"] != "POST" or not self.router.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        path = scope["path"]
+
+        if self._forwarded(headers, scope) or not self._routed(path):
+            await self.app(scope, receive, send)
+            return
+
+        body = None
+        model_id = self._model_id_from_headers(headers, path)
+
+        if model_id is None and path == BINARY_PREDICTION_PATH:
+            model_id = self._model_id_from_query(scope.get("query_string", b""))
+
+        if model_id is None and path in JSON_PREDICTION_PATHS:
+            body = await self._read_body(receive)
+            model_id = self._model_id_from_body(body)
+
+        target = self.router.pick(model_id) if model_id is not None else None
+
+        if target is None:
+            await self.app(scope, self._replay(body, receive) if body is not None else receive, send)
+            return
+
+        target_url = target.url.rstrip("/") + self._target_path(scope)
+
+        if self.router.mode == AFFINITY_MODE_REDIRECT:
+            AFFINITY_ROUTED.labels(action="redirect").inc()
+
+            response = Response(
+                status_code=307,
+                headers={"location": target_url, WORKER_HEADER: target.worker_id},
+            )
+            await response(scope, receive, send)
+            return
+
+        request = self.client.build_request(
+            scope["method"],
+            target_url,
+            headers=self._forward_headers(headers, scope),
+            content=body if body is not None else self._stream(receive),
+        )
+
+        try:
+            upstream = await self.client.send(request, stream=True)
+        except httpx.HTTPError as e:
+            if body is None:
+                # Тело уже частично отправлено владельцу и не может быть прочитано повторно
+                logger.error(f"Affinity forward to {target.worker_id} failed: {str(e)}")
+                response = JSONResponse(status_code=502, content={"detail": "Воркер модели недоступен"})
+                await response(scope, receive, send)
+                return
+
+            logger.warning(f"Affinity forward to {target.worker_id} failed, serving locally: {str(e)}")
+            AFFINITY_ROUTED.labels(action="fallback").inc()
+
+            await self.app(scope, self._replay(body, receive), send)
+            return
+
+        AFFINITY_ROUTED.labels(action="forward").inc()
+
+        # Ответ владельца передается клиенту по частям, не накапливаясь в памяти
+        response = StreamingResponse(
+            upstream.aiter_bytes(),
+            status_code=upstream.status_code,
+            headers={
+                key: value for key, value in upstream.headers.items()
+                if key.lower() not in HOP_BY_HOP_HEADERS
+            },
+        )
+        response.headers[WORKER_HEADER] = target.worker_id
+
+        try:
+            await response(scope, receive, send)
+        finally:
+            await upstream.aclose()
+
+    def _close_on_shutdown(self, send: Send) -> Send:
+        async def close_on_shutdown(message: Message) -> None:
+            if message["type"].startswith("lifespan.shutdown."):
+                await self.aclose()
+
+            await send(message)
+
+        return close_on_shutdown
+
+    def _target_path(self, scope: Scope) -> str:
+        path = scope["path"]
+
+        if scope.get("query_string"):
+            path += "?" + scope["query_string"].decode("latin-1")
+
+        return path
+
+    def _forwarded(self, headers: Headers, scope: Scope) -> bool:
+        value = headers.get(FORWARDED_HEADER)
+
+        if not value:
+            return False
+
+        try:
+            worker_id, expires_at, signature = value.rsplit(":", 2)
+            expires_at = int(expires_at)
+        except ValueError:
+            return False
+
+        # Заголовок от клиента без подписи игнорируется, запрос маршрутизируется как обычно
+        return verify_forward_signature(worker_id, scope["method"], self._target_path(scope), expires_at, signature)
+
+    def _routed(self, path: str) -> bool:
+        return (
+            path in JSON_PREDICTION_PATHS
+            or path == FILE_PREDICTION_PATH
+            or path == BINARY_PREDICTION_PATH
+            or MODEL_PREDICT_PATH.match(path) is not None
+            or ALIAS_PREDICT_PATH.match(path) is not None
+        )
+
+    def _model_id_from_headers(self, headers: Headers, path: str) -> Optional[int]:
+        match = MODEL_PREDICT_PATH.match(path)
+
+        if match:
+            return int(match.group(1))
+
+        match = ALIAS_PREDICT_PATH.match(path)
+
+        if match:
+            # Имя разрешается в версию, на которую переключен этот воркер, без запроса к базе
+            return model_alias_manager.current(unquote(match.group(1)))
+
+        value = headers.get(MODEL_HEADER)
+
+        return int(value) if value and value.isdigit() else None
+
+    def _model_id_from_query(self, query_string: bytes) -> Optional[int]:
+        params = parse_qs(query_string.decode("latin-1"))
+
+        if "model_alias" in params:
+            return model_alias_manager.current(params["model_alias"][0])
+
+        value = params.get("model_id", [""])[0]
+
+        return int(value) if value.isdigit() else None
+
+    def _model_id_from_body(self, body: bytes) -> Optional[int]:
+        try:
+            data = json.loads(body)
+            model_id = data.get("model_id")
+            model_alias = data.get("model_alias")
+        except (ValueError, AttributeError):
+            return None
+
+        if isinstance(model_alias, str):
+            return model_alias_manager.current(model_alias)
+
+        return model_id if isinstance(model_id, int) else None
+
+    def _forward_headers(self, headers: Headers, scope: Scope) -> dict:
+        forwarded = {
+            key: value for key, value in headers.items()
+            if key.lower() not in HOP_BY_HOP_HEADERS
+        }
+        worker_id = self.router.worker_id
+        expires_at = int(time.time()) + settings.AFFINITY_FORWARD_TTL
+        signature = create_forward_signature(worker_id, scope["method"], self._target_path(scope), expires_at)
+        forwarded[FORWARDED_HEADER] = f"{worker_id}:{expires_at}:{signature}"
+
+        return forwarded
+
+    async def _read_body(self, receive: Receive) -> bytes:
+        chunks = []
+
+        async for chunk in self._stream(receive):
+            chunks.append(chunk)
+
+        return b"".join(chunks)
+
+    async def _stream(self, receive: Receive) -> AsyncIterator[bytes]:
+        while True:
+            message = await receive()
+
+            if message["type"] != "http.request":
+                return
+
+            yield message.get("body", b"")
+
+            if not message.get("more_body", False):
+                return
+
+    def _replay(self, body: bytes, receive: Receive) -> Receive:
+        sent = False
+
+        async def replay() -> Message:
+            nonlocal sent
+
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            return await receive()
+
+        return replay
@@ -1,9 +1,16 @@
 from fastapi import APIRouter
-from app.api.endpoints import users, auth, models, predictions
+from app.api.endpoints import users, auth, api_keys, aliases, models, predictions, jobs, admin, storage
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(api_keys.router, prefix="/auth/api-keys", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
+# Раньше models: иначе /models/aliases совпадет с /models/{model_id}
+api_router.include_router(aliases.router, prefix="/models/aliases", tags=["models"])
 api_router.include_router(models.router, prefix="/models", tags=["models"])
+# Раньше predictions: иначе /predictions/jobs совпадет с /predictions/{prediction_id}
+api_router.include_router(jobs.router, prefix="/predictions/jobs", tags=["jobs"])
 api_router.include_router(predictions.router, prefix="/predictions", tags=["predictions"])
+api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(storage.router, prefix="/storage", tags=["storage"])
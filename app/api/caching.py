@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.services.model_catalog import model_catalog
+
+def cache_headers(name: str) -> Dict[str, str]:
+    """
+    Cache-Control и валидаторы ресурса каталога по его версии в памяти.
+    """
+    max_age = settings.MODEL_CATALOG_MAX_AGE
+    headers = {"cache-control": f"public, max-age={max_age}" if max_age > 0 else "no-cache"}
+    state = model_catalog.get(name)
+
+    if state is not None:
+        version, updated_at = state
+        # Слабый валидатор: в ответ входят поля владельца, которые версия каталога не отслеживает
+        headers["etag"] = f'W/"{name.replace("/", "-")}-{version}"'
+        headers["last-modified"] = format_datetime(updated_at.replace(tzinfo=timezone.utc), usegmt=True)
+
+    return headers
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+
+    return tag[2:] if tag.startswith("W/") else tag
+
+def _parse_http_date(value: str) -> Optional[datetime]:
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    etag = headers.get("etag")
+    if_none_match = request.headers.get("if-none-match")
+
+    # If-Modified-Since учитывается, только если клиент не прислал If-None-Match
+    if if_none_match is not None:
+        if etag is None:
+            return False
+
+        tags = [_opaque(tag) for tag in if_none_match.split(",")]
+
+        return "*" in tags or _opaque(etag) in tags
+
+    last_modified = headers.get("last-modified")
+    if_modified_since = request.headers.get("if-modified-since")
+
+    if last_modified is None or if_modified_since is None:
+        return False
+
+    since = _parse_http_date(if_modified_since)
+
+    return since is not None and parsedate_to_datetime(last_modified) <= since
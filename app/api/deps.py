@@ -1,4 +1,4 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -13,6 +13,8 @@ from app import crud, models, schemas
 from app.core import security
 from app.core.config import settings
 from app.db.session import SessionLocal
+from app.services.admission import prediction_admission
+from app.services.api_keys import api_key_cache
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login"
@@ -29,19 +31,33 @@ def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(reusable_oauth2)
 ) -> models.User:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
+    if security.api_key_prefix(token) is not None:
+        # API-ключ передается тем же заголовком Authorization: Bearer, что и JWT
+        user_id = api_key_cache.verify(token, db)
 
-        token_data = schemas.TokenPayload(**payload)
-    except (JWTError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Не удалось проверить учетные данные",
-        )
+        if user_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Не удалось проверить учетные данные",
+            )
+    else:
+        try:
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
 
-    user = crud.get_user(db, user_id=token_data.sub)
+            token_data = schemas.TokenPayload(**payload)
+        except (JWTError, ValidationError):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Не удалось проверить учетные данные",
+            )
+
+        user_id = token_data.sub
+
+    # Строка пользователя читается и для API-ключа: обработчики проверяют и списывают
+    # кредиты через этот объект, поэтому он не может браться из кэша воркера
+    user = crud.get_user(db, user_id=user_id)
 
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
@@ -58,3 +74,22 @@ def get_current_active_user(
         raise HTTPException(status_code=400, detail="Пользователь неактивен")
 
     return current_user
+
+def get_current_active_superuser(
+    current_user: models.User = Depends(get_current_active_user),
+) -> models.User:
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Недостаточно прав"
+        )
+
+    return current_user
+
+async def admit_prediction() -> AsyncGenerator[None, None]:
+    started_at = await prediction_admission.acquire()
+
+    try:
+        yield
+    finally:
+        prediction_admission.release(started_at)
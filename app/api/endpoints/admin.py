@@ -0,0 +1,167 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.config import settings
+from app.crud import crud_model, crud_user
+from app.models.models import User
+from app.schemas.schemas import CapacityReport, ModelCapacity, ResidentModel, UserQuotaUpdate
+from app.schemas.schemas import User as UserSchema
+from app.services.affinity import affinity_router
+from app.services.model_registry import model_registry
+from app.services.model_service import PROFILE_BATCH_ROWS
+from app.services.rate_limit import rate_limiter
+
+router = APIRouter()
+
+@router.get("/models", response_model=List[ResidentModel])
+def read_resident_models(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Модели, загруженные в память текущего воркера, со статистикой использования ресурсов.
+    """
+    return sorted(
+        model_registry.resident(),
+        key=lambda entry: entry.memory_bytes,
+        reverse=True,
+    )
+
+@router.get("/capacity", response_model=CapacityReport)
+def read_capacity(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Профили активных моделей и сколько памяти нужно, чтобы держать их все загруженными.
+    """
+    models = []
+    artifacts = {}
+
+    for model in crud_model.get_active(db):
+        rows_per_second = None
+
+        if model.profile_latency_batch:
+            rows_per_second = PROFILE_BATCH_ROWS / model.profile_latency_batch
+
+        models.append(ModelCapacity(
+            id=model.id,
+            name=model.name,
+            version=model.version,
+            memory_bytes=model.profile_memory_bytes,
+            load_time=model.profile_load_time,
+            latency_single=model.profile_latency_single,
+            latency_batch=model.profile_latency_batch,
+            rows_per_second=rows_per_second,
+        ))
+
+        # Модели с общим артефактом занимают память один раз
+        artifacts[model.artifact_sha256 or model.model_path] = model.profile_memory_bytes or model.artifact_size or 0
+
+    memory_bytes = sum(artifacts.values())
+
+    return CapacityReport(
+        models=models,
+        memory_bytes=memory_bytes,
+        cache_max_bytes=settings.MODEL_CACHE_MAX_BYTES,
+        cache_max_models=settings.MODEL_CACHE_MAX_MODELS,
+        fits_in_cache=memory_bytes <= settings.MODEL_CACHE_MAX_BYTES and len(artifacts) <= settings.MODEL_CACHE_MAX_MODELS,
+        unprofiled_models=sum(model.latency_batch is None for model in models),
+    )
+
+@router.get("/affinity")
+def read_affinity(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Живые воркеры и назначение моделей воркерам, как их видит текущий воркер.
+    """
+    return affinity_router.snapshot()
+
+@router.post("/models/{model_id}/pin", response_model=ResidentModel)
+def pin_model(
+    *,
+    db: Session = Depends(deps.get_db),
+    model_id: int,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    model = crud_model.get(db, id=model_id)
+
+    if not model:
+        raise HTTPException(
+            status_code=404,
+            detail="Модель не найдена",
+        )
+
+    try:
+        return model_registry.pin(model)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при загрузке модели: {str(e)}",
+        )
+
+@router.delete("/models/{model_id}/pin", response_model=ResidentModel)
+def unpin_model(
+    *,
+    model_id: int,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    entry = model_registry.unpin(model_id)
+
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Модель не загружена в память",
+        )
+
+    return entry
+
+@router.delete("/models/{model_id}", response_model=ResidentModel)
+def evict_model(
+    *,
+    model_id: int,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    entry = model_registry.evict(model_id)
+
+    if entry is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Модель не загружена в память",
+        )
+
+    return entry
+
+@router.put("/users/{user_id}/quota", response_model=UserSchema)
+def update_user_quota(
+    *,
+    db: Session = Depends(deps.get_db),
+    user_id: int,
+    quota_in: UserQuotaUpdate,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Тариф и личные лимиты пользователя. Явно переданный null возвращает значение тарифа.
+    """
+    user = crud_user.get(db, id=user_id)
+
+    if not user:
+        raise HTTPException(
+            status_code=404,
+            detail="Пользователь не найден",
+        )
+
+    if quota_in.plan is not None and quota_in.plan not in settings.RATE_LIMIT_PLANS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неизвестный тариф: {quota_in.plan}",
+        )
+
+    user = crud_user.update(db, db_obj=user, obj_in=quota_in)
+    rate_limiter.update(user)
+
+    return user
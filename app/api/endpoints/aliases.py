@@ -0,0 +1,80 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api import deps
+from app.api.endpoints.predictions import run_single_prediction, validate_output_mode
+from app.crud import crud_alias, crud_model
+from app.schemas.schemas import ModelAlias, Prediction, PredictionInput
+from app.services.model_aliases import model_alias_manager
+from app.services.model_service import OUTPUT_MODE_LABEL
+
+router = APIRouter()
+
+def alias_out(alias: models.ModelAlias) -> ModelAlias:
+    return ModelAlias(
+        name=alias.name,
+        owner_id=alias.owner_id,
+        model_id=alias.model_id,
+        previous_model_id=alias.previous_model_id,
+        version=alias.version,
+        promoted_at=alias.promoted_at,
+        active_model_id=model_alias_manager.current(alias.name),
+    )
+
+@router.get("/", response_model=List[ModelAlias])
+def read_aliases(
+    db: Session = Depends(deps.get_db),
+) -> Any:
+    return [alias_out(alias) for alias in crud_alias.get_all(db)]
+
+@router.get("/{name}", response_model=ModelAlias)
+def read_alias(
+    *,
+    db: Session = Depends(deps.get_db),
+    name: str,
+) -> Any:
+    alias = crud_alias.get_by_name(db, name=name)
+
+    if alias is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Модель с таким именем не найдена"
+        )
+
+    return alias_out(alias)
+
+@router.post(
+    "/{name}/predict",
+    response_model=Prediction,
+    dependencies=[Depends(deps.admit_prediction)],
+)
+def make_alias_prediction(
+    *,
+    db: Session = Depends(deps.get_db),
+    name: str,
+    input_data: PredictionInput,
+    output_mode: str = Query(OUTPUT_MODE_LABEL),
+    current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    validate_output_mode(output_mode)
+
+    model_id = model_alias_manager.resolve(db, name)
+    model = crud_model.get(db, id=model_id) if model_id is not None else None
+
+    if not model:
+        raise HTTPException(
+            status_code=404,
+            detail="Модель с таким именем не найдена"
+        )
+
+    return run_single_prediction(
+        db,
+        model=model,
+        current_user=current_user,
+        input_data=input_data.input_data,
+        output_mode=output_mode,
+    )
@@ -0,0 +1,76 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.core.security import create_api_key, hash_api_key
+from app.crud import crud_api_key
+from app.models.models import User
+from app.schemas.schemas import ApiKey, ApiKeyCreate, ApiKeyCreated
+from app.services.api_keys import api_key_cache
+
+router = APIRouter()
+
+@router.get("/", response_model=List[ApiKey])
+def read_api_keys(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    return crud_api_key.get_multi_by_user(db, user_id=current_user.id)
+
+@router.post("/", response_model=ApiKeyCreated)
+def create_api_key_for_user(
+    *,
+    db: Session = Depends(deps.get_db),
+    api_key_in: ApiKeyCreate,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Создание API-ключа. Ключ возвращается один раз, в базе хранится только его HMAC.
+    """
+    key, prefix = create_api_key()
+    api_key = crud_api_key.create(
+        db,
+        user_id=current_user.id,
+        name=api_key_in.name,
+        prefix=prefix,
+        key_hash=hash_api_key(key),
+    )
+
+    return ApiKeyCreated(
+        id=api_key.id,
+        name=api_key.name,
+        prefix=api_key.prefix,
+        created_at=api_key.created_at,
+        key=key,
+    )
+
+@router.delete("/{api_key_id}", response_model=ApiKey)
+def revoke_api_key(
+    *,
+    db: Session = Depends(deps.get_db),
+    api_key_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    api_key = crud_api_key.get(db, id=api_key_id)
+
+    if not api_key or api_key.user_id != current_user.id:
+        raise HTTPException(
+            status_code=404,
+            detail="API-ключ не найден",
+        )
+
+    # После удаления поля объекта уже не читаются из базы
+    revoked = ApiKey(
+        id=api_key.id,
+        name=api_key.name,
+        prefix=api_key.prefix,
+        created_at=api_key.created_at,
+    )
+
+    crud_api_key.remove(db, db_obj=api_key)
+    api_key_cache.invalidate(revoked.prefix)
+
+    return revoked
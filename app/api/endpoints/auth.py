@@ -2,6 +2,7 @@ from datetime import timedelta
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 
 from sqlalchemy.orm import Session
@@ -15,11 +16,12 @@ from app.schemas.schemas import Token, UserCreate
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     db: Session = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
-    user = crud.get_user_by_email(db, email=form_data.username)
+    # Проверка пароля идет в отдельном пуле: поток запросов не ждет bcrypt
+    user = await run_in_threadpool(crud.get_user_by_email, db, email=form_data.username)
 
     if not user:
         raise HTTPException(
@@ -28,7 +30,7 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not security.verify_password(form_data.password, user.hashed_password):
+    if not await security.verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль",
@@ -50,12 +52,12 @@ def login(
     }
 
 @router.post("/register", response_model=Token)
-def register(
+async def register(
     *,
     db: Session = Depends(deps.get_db),
     user_in: UserCreate,
 ) -> Any:
-    user = crud.get_user_by_email(db, email=user_in.email)
+    user = await run_in_threadpool(crud.get_user_by_email, db, email=user_in.email)
 
     if user:
         raise HTTPException(
@@ -63,7 +65,8 @@ def register(
             detail="Пользователь с таким email уже существует"
         )
 
-    user = crud.create_user(db, user_in)
+    hashed_password = await security.get_password_hash_async(user_in.password)
+    user = await run_in_threadpool(crud.create_user, db, user_in, hashed_password=hashed_password)
 
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = security.create_access_token(
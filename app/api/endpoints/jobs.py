@@ -0,0 +1,64 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.crud.crud_job import JOB_FINAL_STATUSES, crud_job
+from app.models.models import PredictionJob, User
+from app.schemas.schemas import PredictionJob as PredictionJobSchema
+
+router = APIRouter()
+
+def get_user_job(db: Session, job_id: int, user: User) -> PredictionJob:
+    job = crud_job.get(db, id=job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail="Задача не найдена",
+        )
+
+    if job.user_id != user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Недостаточно прав для доступа к задаче",
+        )
+
+    return job
+
+@router.get("/", response_model=List[PredictionJobSchema])
+def read_jobs(
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_active_user),
+    skip: int = 0,
+    limit: int = 100,
+) -> Any:
+    return crud_job.get_multi_by_user(db, user_id=current_user.id, skip=skip, limit=limit)
+
+@router.get("/{job_id}", response_model=PredictionJobSchema)
+def read_job(
+    *,
+    db: Session = Depends(deps.get_db),
+    job_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    return get_user_job(db, job_id, current_user)
+
+@router.post("/{job_id}/cancel", response_model=PredictionJobSchema)
+def cancel_job(
+    *,
+    db: Session = Depends(deps.get_db),
+    job_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    job = get_user_job(db, job_id, current_user)
+
+    if job.status in JOB_FINAL_STATUSES:
+        raise HTTPException(
+            status_code=400,
+            detail="Задача уже завершена",
+        )
+
+    return crud_job.request_cancel(db, job=job)
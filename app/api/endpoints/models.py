@@ -1,13 +1,25 @@
 import logging
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app import crud, models
 from app.api import deps
-from app.schemas.schemas import MLModel, MLModelCreate, Prediction, PredictionInput, ModelCostEstimate
-from app.services.model_service import load_model
+from app.api.caching import cache_headers, is_not_modified
+from app.api.endpoints.aliases import alias_out
+from app.api.endpoints.predictions import run_single_prediction, validate_output_mode
+from app.schemas.schemas import MLModel, MLModelCreate, ModelAlias, Prediction, PredictionInput, ModelCostEstimate
+from app.crud.crud_catalog import CATALOG_KEY, model_key
+from app.services.model_aliases import model_alias_manager
+from app.services.model_catalog import model_catalog
+from app.services.model_service import (
+    OUTPUT_MODE_LABEL,
+    estimate_upload_cost,
+    spool_model_upload,
+    store_model_artifact,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -15,6 +27,7 @@ logger = logging.getLogger(__name__)
 @router.post("/estimate-cost", response_model=ModelCostEstimate)
 async def estimate_model_cost(
     *,
+    db: Session = Depends(deps.get_db),
     model_file: UploadFile = File(...),
 ) -> Any:
     try:
@@ -24,21 +37,18 @@ async def estimate_model_cost(
                 detail="Поддерживаются только файлы .joblib или .pkl"
             )
 
-        contents = await model_file.read()
-
-        if not contents:
-            raise HTTPException(
-                status_code=400,
-                detail="Файл пуст"
-            )
+        model_upload = await spool_model_upload(model_file)
 
         try:
-            _, cost = load_model(contents)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=400,
-                detail=str(e)
-            )
+            if not model_upload.size:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Файл пуст"
+                )
+
+            cost = await run_in_threadpool(estimate_upload_cost, db, model_upload)
+        finally:
+            model_upload.cleanup()
 
         return {"cost_per_prediction": round(cost, 3)}
     except HTTPException:
@@ -60,6 +70,7 @@ async def create_model(
     version: str = Form(...),
     model_file: UploadFile = File(...),
     model_type: str = Form(...),
+    inference_threads: Optional[int] = Form(None),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
     if current_user.credits < 1:
@@ -68,46 +79,91 @@ async def create_model(
             detail="Недостаточно кредитов для публикации модели"
         )
 
+    if inference_threads is not None and inference_threads < 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Число потоков модели должно быть положительным"
+        )
+
+    model_upload = await spool_model_upload(model_file)
+
     try:
-        contents = await model_file.read()
-        _, cost = load_model(contents)
-        
+        artifact = await run_in_threadpool(store_model_artifact, db, model_upload)
+
         model_in = MLModelCreate(
             name=name,
             description=description,
             version=version,
-            model_file=contents,
+            model_path=artifact.object_name,
+            artifact_sha256=artifact.sha256,
+            artifact_size=artifact.size,
+            compression=artifact.compression,
+            inference_engine=artifact.inference_engine,
+            n_features=artifact.n_features,
+            feature_names=artifact.feature_names,
+            input_dtype=artifact.input_dtype,
+            classes=artifact.classes,
+            inference_threads=inference_threads,
+            profile_load_time=artifact.profile_load_time,
+            profile_memory_bytes=artifact.profile_memory_bytes,
+            profile_latency_single=artifact.profile_latency_single,
+            profile_latency_batch=artifact.profile_latency_batch,
             model_type=model_type,
-            cost_per_prediction=cost,
+            cost_per_prediction=artifact.cost_per_prediction,
             owner_id=current_user.id
         )
 
-        return crud.create_model(
+        model = crud.create_model(
             db=db,
             obj_in=model_in,
             user=current_user
         )
+
+        await run_in_threadpool(model_catalog.changed)
+
+        return model
     except Exception as e:
         logger.error(f"Error creating model: {str(e)}")
         raise HTTPException(
             status_code=400,
             detail="Не удалось создать модель"
         )
+    finally:
+        model_upload.cleanup()
 
 @router.get("/", response_model=List[MLModel])
 def read_models(
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
+    # Версия читается до запроса к базе: ответ не может оказаться старше своего ETag
+    headers = cache_headers(CATALOG_KEY)
+
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+
     return crud.get_multi(db, skip=skip, limit=limit)
 
 @router.get("/{model_id}", response_model=MLModel)
 def read_model(
     *,
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     model_id: int,
 ) -> Any:
+    headers = cache_headers(model_key(model_id))
+
+    if is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+
     model = crud.get_model(db=db, model_id=model_id)
 
     if not model:
@@ -118,14 +174,21 @@ def read_model(
 
     return model
 
-@router.post("/{model_id}/predict", response_model=Prediction)
+@router.post(
+    "/{model_id}/predict",
+    response_model=Prediction,
+    dependencies=[Depends(deps.admit_prediction)],
+)
 def make_prediction(
     *,
     db: Session = Depends(deps.get_db),
     model_id: int,
     input_data: PredictionInput,
+    output_mode: str = Query(OUTPUT_MODE_LABEL),
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
+    validate_output_mode(output_mode)
+
     model = crud.get_model(db=db, model_id=model_id)
 
     if not model:
@@ -146,23 +209,59 @@ def make_prediction(
             detail="Недостаточно кредитов для предсказания"
         )
 
-    try:
-        prediction = crud.make_prediction(
-            db=db,
-            model_id=model_id,
-            input_data=input_data.input_data,
-            user_id=current_user.id
+    return run_single_prediction(
+        db,
+        model=model,
+        current_user=current_user,
+        input_data=input_data.input_data,
+        output_mode=output_mode,
+    )
+
+@router.post(
+    "/{model_id}/promote",
+    response_model=ModelAlias,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def promote_model(
+    *,
+    db: Session = Depends(deps.get_db),
+    model_id: int,
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Делает модель текущей версией своего имени.
+
+    Воркеры прогревают новую версию в фоне и переключают имя на нее после
+    загрузки, поэтому ответ возвращается сразу, а active_model_id в нем
+    еще может указывать на прежнюю версию.
+    """
+    model = crud.get_model(db=db, model_id=model_id)
+
+    if not model or not model.is_active:
+        raise HTTPException(
+            status_code=404,
+            detail="Модель не найдена"
         )
 
-        return prediction
-    except Exception as e:
-        logger.error(f"Error making prediction: {str(e)}")
+    if model.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Недостаточно прав для продвижения этой модели"
+        )
 
+    alias = crud.crud_alias.get_by_name(db, name=model.name)
+
+    if alias is not None and alias.owner_id != current_user.id:
         raise HTTPException(
-            status_code=400,
-            detail="Не удалось сделать предсказание"
+            status_code=403,
+            detail="Имя модели занято другим пользователем"
         )
 
+    alias = crud.crud_alias.promote(db, model=model, user=current_user)
+    model_alias_manager.wake()
+
+    return alias_out(alias)
+
 @router.delete("/{model_id}", response_model=MLModel)
 def delete_model(
     *,
@@ -190,14 +289,25 @@ def delete_model(
             detail="Модель уже удалена"
         )
 
+    alias = crud.crud_alias.get_by_name(db, name=model.name)
+
+    if alias is not None and alias.model_id == model.id:
+        raise HTTPException(
+            status_code=400,
+            detail="Модель является текущей версией своего имени, сначала продвиньте другую версию"
+        )
+
     try:
         model.is_deleted = True
         model.is_active = False
 
         db.add(model)
+        crud.crud_catalog.bump(db, CATALOG_KEY, model_key(model.id))
         db.commit()
         db.refresh(model)
 
+        model_catalog.changed()
+
         return model
     except Exception as e:
         db.rollback()
@@ -1,50 +1,86 @@
-import os
-import io
+import json
 import time
-import joblib
-from typing import Any, List
-from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 
 from sqlalchemy.orm import Session
 
-import pandas as pd
 import numpy as np
 
 from app.api import deps
-from app.models.models import User
+from app.api.responses import fast_response
+from app.models.models import MLModel, User
 from app.schemas.schemas import (
     Prediction as PredictionSchema,
     PredictionCreate,
     PredictionUpdate,
-    FilePredictionResult
+    PredictionInput,
+    BatchPredictionInput,
+    BatchPredictionResult,
+    FilePredictionResult,
+    PredictionJob,
+    PredictionJobCreate,
+    DownloadLink,
 )
-from app.crud import crud_prediction, crud_model, crud_user
+from app.core.config import settings
+from app.crud import crud_job, crud_prediction, crud_model, crud_user
+from app.services.array_codec import BINARY_CONTENT_TYPES, decode_array, encode_arrays, media_type
+from app.services.model_aliases import model_alias_manager
+from app.services.model_registry import model_registry
+from app.services.model_service import OUTPUT_MODE_LABEL, OUTPUT_MODES, run_prediction
 from app.services.storage_service import storage_service
+from app.services.input_service import detect_input_format, read_prediction_input, validate_feature_count
+from app.services.job_service import prediction_job_runner
+from app.services.parallel_scoring import sharded_scorer
+from app.services.result_service import (
+    OUTPUT_FORMAT_CSV,
+    OUTPUT_FORMATS,
+    download_filename,
+    prediction_object_prefix,
+    store_input_file,
+    store_prediction_files,
+    delete_prediction_files,
+)
 from app.core.metrics import (
     PREDICTION_COUNTER,
-    PREDICTION_LATENCY,
-    MODEL_USAGE,
-    PREDICTION_COST,
-    USER_CREDITS,
-    USER_CREDITS_HISTORY,
     MODEL_SUCCESS_RATE,
     SYSTEM_ERRORS,
-    MODEL_LOAD_TIME
+    record_prediction_metrics,
 )
 
 router = APIRouter()
 
-@router.post("/", response_model=PredictionSchema)
-def create_prediction(
-    *,
-    db: Session = Depends(deps.get_db),
-    prediction_in: PredictionCreate,
-    current_user: User = Depends(deps.get_current_active_user),
-) -> Any:
-    model = crud_model.get(db, id=prediction_in.model_id)
+def validate_output_mode(output_mode: str) -> None:
+    if output_mode not in OUTPUT_MODES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Неподдерживаемый режим вывода: {output_mode}",
+        )
+
+def load_registered_model(model: MLModel) -> Any:
+    try:
+        return model_registry.get(model)
+    except Exception as e:
+        SYSTEM_ERRORS.labels(error_type="model_load_error").inc()
+
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при загрузке модели: {str(e)}",
+        )
+
+def get_prediction_model(db: Session, model_id: Optional[int], model_alias: Optional[str]) -> MLModel:
+    # По имени выбирается версия, которую этот воркер уже прогрел
+    if model_alias is not None:
+        model_id = model_alias_manager.resolve(db, model_alias)
+    elif model_id is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Укажите model_id или model_alias",
+        )
+
+    model = crud_model.get(db, id=model_id) if model_id is not None else None
 
     if not model:
         raise HTTPException(
@@ -52,6 +88,28 @@ def create_prediction(
             detail="Модель не найдена",
         )
 
+    return model
+
+def validate_input_width(model: MLModel, n_columns: int) -> None:
+    # Проверка по схеме, сохраненной при загрузке: без списания кредитов и загрузки артефакта
+    try:
+        validate_feature_count(n_columns, model.n_features)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e),
+        )
+
+def run_single_prediction(
+    db: Session,
+    *,
+    model: MLModel,
+    current_user: User,
+    input_data: List[float],
+    output_mode: str = OUTPUT_MODE_LABEL,
+) -> Any:
+    validate_input_width(model, len(input_data))
+
     if current_user.credits < model.cost_per_prediction:
         raise HTTPException(
             status_code=400,
@@ -65,14 +123,8 @@ def create_prediction(
             credits=-model.cost_per_prediction,
         )
 
-        model_load_start = time.time()
-
         try:
-            model_data = storage_service.load_model(model.model_path)
-            ml_model = joblib.load(io.BytesIO(model_data))
-            model_load_time = time.time() - model_load_start
-
-            MODEL_LOAD_TIME.labels(model_name=model.name).observe(model_load_time)
+            loaded_model = model_registry.get(model)
         except Exception as e:
             crud_user.update_credits(
                 db=db,
@@ -90,41 +142,38 @@ def create_prediction(
         start_time = time.time()
 
         try:
-            prediction_result = ml_model.predict(np.array(prediction_in.input_data).reshape(1, -1))
+            output = run_prediction(loaded_model, np.array(input_data).reshape(1, -1), output_mode)
+
+            if output.labels is None:
+                prediction_result = []
+            elif output.labels.ndim == 1:
+                prediction_result = float(output.labels[0])
+            else:
+                prediction_result = output.labels[0].tolist()
 
             prediction_update = PredictionUpdate(
-                model_id=prediction_in.model_id,
-                input_data=prediction_in.input_data,
+                model_id=model.id,
+                input_data=input_data,
                 cost=model.cost_per_prediction,
-                prediction_result=float(prediction_result[0])
+                prediction_result=prediction_result,
+                probabilities=None if output.probabilities is None else output.probabilities[0].ravel().tolist(),
+                output_mode=output_mode,
             )
 
             prediction = crud_prediction.create(
                 db=db,
-                obj_in=prediction_in,
+                obj_in=PredictionCreate(
+                    model_id=model.id,
+                    input_data=input_data,
+                    cost=model.cost_per_prediction,
+                    user_id=current_user.id,
+                ),
                 obj_out=prediction_update,
                 user=current_user,
                 model=model,
             )
 
-            latency = time.time() - start_time
-
-            PREDICTION_LATENCY.labels(model_name=model.name).observe(latency)
-            PREDICTION_COUNTER.labels(
-                model_name=model.name,
-                status="success",
-                user_email=current_user.email
-            ).inc()
-            MODEL_USAGE.labels(model_name=model.name).inc()
-            PREDICTION_COST.labels(
-                model_name=model.name,
-                user_email=current_user.email
-            ).inc(model.cost_per_prediction)
-            USER_CREDITS.labels(user_email=current_user.email).set(current_user.credits)
-            USER_CREDITS_HISTORY.labels(
-                user_email=current_user.email,
-                operation="subtract"
-            ).inc(model.cost_per_prediction)
+            record_prediction_metrics(model, current_user, 1, time.time() - start_time)
 
             total_predictions = PREDICTION_COUNTER.labels(
                 model_name=model.name,
@@ -151,6 +200,12 @@ def create_prediction(
                 credits=model.cost_per_prediction,
             )
 
+            if isinstance(e, ValueError):
+                raise HTTPException(
+                    status_code=400,
+                    detail=str(e),
+                )
+
             PREDICTION_COUNTER.labels(
                 model_name=model.name,
                 status="error",
@@ -162,6 +217,8 @@ def create_prediction(
                 status_code=500,
                 detail=f"Ошибка при выполнении предсказания: {str(e)}",
             )
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
 
@@ -170,6 +227,245 @@ def create_prediction(
             detail=f"Ошибка при выполнении предсказания: {str(e)}",
         )
 
+def score_batch(
+    db: Session,
+    *,
+    model: MLModel,
+    X: np.ndarray,
+    output_mode: str,
+    current_user: User,
+) -> Tuple[Any, Any]:
+    """
+    Предсказание по готовому массиву признаков со списанием кредитов
+    и сохранением записи о предсказании.
+    """
+    rows = len(X)
+    cost = model.cost_per_prediction * rows
+
+    validate_input_width(model, X.shape[1])
+
+    if current_user.credits < cost:
+        raise HTTPException(
+            status_code=400,
+            detail="Недостаточно кредитов для выполнения предсказания",
+        )
+
+    loaded_model = load_registered_model(model)
+
+    start_time = time.time()
+
+    try:
+        output = run_prediction(loaded_model, X, output_mode)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e),
+        )
+    except Exception as e:
+        PREDICTION_COUNTER.labels(
+            model_name=model.name,
+            status="error",
+            user_email=current_user.email
+        ).inc()
+        SYSTEM_ERRORS.labels(error_type="prediction_error").inc()
+
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при выполнении предсказания: {str(e)}",
+        )
+
+    # Большой батч не копируется в базу: результат уже отдан клиенту в ответе
+    inline = rows <= settings.PREDICTION_INLINE_MAX_ROWS
+
+    prediction = crud_prediction.create(
+        db=db,
+        obj_in=PredictionCreate(
+            model_id=model.id,
+            input_data=X.ravel().tolist() if inline else [],
+            cost=cost,
+            user_id=current_user.id,
+        ),
+        obj_out=PredictionUpdate(
+            model_id=model.id,
+            input_data=[],
+            cost=cost,
+            prediction_result=output.labels.ravel().tolist() if inline and output.labels is not None else [],
+            probabilities=output.probabilities.ravel().tolist() if inline and output.probabilities is not None else None,
+            output_mode=output_mode,
+        ),
+        user=current_user,
+        model=model,
+    )
+
+    crud_user.update_credits(
+        db=db,
+        db_obj=current_user,
+        credits=-cost,
+    )
+
+    record_prediction_metrics(model, current_user, rows, time.time() - start_time)
+
+    return prediction, output
+
+def batch_result(prediction: Any, output: Any, output_mode: str) -> Any:
+    # Поля BatchPredictionResult: массивы сериализуются без перевода в списки
+    return fast_response({
+        "prediction_id": prediction.id,
+        "rows": len(output),
+        "output_mode": output_mode,
+        "predictions": output.labels,
+        "probabilities": output.probabilities,
+        "classes": output.classes_list(),
+    })
+
+@router.post(
+    "/",
+    response_model=PredictionSchema,
+    dependencies=[Depends(deps.admit_prediction)],
+)
+def create_prediction(
+    *,
+    db: Session = Depends(deps.get_db),
+    prediction_in: PredictionInput,
+    output_mode: str = Query(OUTPUT_MODE_LABEL),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    validate_output_mode(output_mode)
+
+    model = get_prediction_model(db, prediction_in.model_id, prediction_in.model_alias)
+
+    return run_single_prediction(
+        db,
+        model=model,
+        current_user=current_user,
+        input_data=prediction_in.input_data,
+        output_mode=output_mode,
+    )
+
+@router.post(
+    "/batch",
+    response_model=BatchPredictionResult,
+    dependencies=[Depends(deps.admit_prediction)],
+)
+def create_batch_prediction(
+    *,
+    db: Session = Depends(deps.get_db),
+    batch_in: BatchPredictionInput,
+    output_mode: str = Query(OUTPUT_MODE_LABEL),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    validate_output_mode(output_mode)
+
+    model = get_prediction_model(db, batch_in.model_id, batch_in.model_alias)
+
+    if not batch_in.inputs:
+        raise HTTPException(
+            status_code=400,
+            detail="Пустой батч",
+        )
+
+    try:
+        X = np.array(batch_in.inputs, dtype=np.float64)
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Строки батча должны иметь одинаковое число признаков",
+        )
+
+    prediction, output = score_batch(
+        db,
+        model=model,
+        X=X,
+        output_mode=output_mode,
+        current_user=current_user,
+    )
+
+    return batch_result(prediction, output, output_mode)
+
+async def read_binary_batch(request: Request) -> np.ndarray:
+    # Тело читается целиком в асинхронной зависимости, чтобы сам обработчик выполнялся в пуле потоков
+    body = await request.body()
+
+    try:
+        X = decode_array(body, request.headers.get("content-type"), request.headers)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e),
+        )
+
+    if not len(X):
+        raise HTTPException(
+            status_code=400,
+            detail="Пустой батч",
+        )
+
+    return X
+
+def binary_media_type(accept: Optional[str]) -> Optional[str]:
+    for item in (accept or "").split(","):
+        kind = media_type(item)
+
+        if kind in BINARY_CONTENT_TYPES:
+            return kind
+
+    return None
+
+@router.post(
+    "/batch/binary",
+    response_model=BatchPredictionResult,
+    dependencies=[Depends(deps.admit_prediction)],
+)
+def create_binary_batch_prediction(
+    *,
+    db: Session = Depends(deps.get_db),
+    request: Request,
+    X: np.ndarray = Depends(read_binary_batch),
+    model_id: Optional[int] = Query(None),
+    model_alias: Optional[str] = Query(None),
+    output_mode: str = Query(OUTPUT_MODE_LABEL),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Батч-предсказание с входом в бинарном виде (application/x-ndarray или
+    application/x-npy). Если Accept запрашивает один из этих типов,
+    результат возвращается так же, иначе в JSON.
+    """
+    validate_output_mode(output_mode)
+
+    model = get_prediction_model(db, model_id, model_alias)
+    response_type = binary_media_type(request.headers.get("accept"))
+
+    prediction, output = score_batch(
+        db,
+        model=model,
+        X=X,
+        output_mode=output_mode,
+        current_user=current_user,
+    )
+
+    if response_type is None:
+        return batch_result(prediction, output, output_mode)
+
+    try:
+        content, headers = encode_arrays(response_type, output.labels, output.probabilities)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=406,
+            detail=str(e),
+        )
+
+    headers["x-prediction-id"] = str(prediction.id)
+    headers["x-rows"] = str(len(X))
+    headers["x-output-mode"] = output_mode
+
+    classes = output.classes_list()
+
+    if classes is not None:
+        headers["x-classes"] = json.dumps(classes)
+
+    return Response(content=content, media_type=response_type, headers=headers)
+
 @router.get("/", response_model=List[PredictionSchema])
 def read_predictions(
     db: Session = Depends(deps.get_db),
@@ -209,122 +505,222 @@ def read_prediction(
 
     return prediction
 
-@router.post("/file", response_model=FilePredictionResult)
+async def submit_prediction_job(
+    db: Session,
+    *,
+    file: UploadFile,
+    model: MLModel,
+    output_format: str,
+    output_mode: str,
+    store_input: bool,
+    parallel: bool,
+    current_user: User,
+) -> Any:
+    # Входной файл сохраняется в хранилище сразу: задачу может забрать другой процесс
+    input_format = detect_input_format(file.file, file.content_type)
+
+    try:
+        input_object = await run_in_threadpool(
+            store_input_file,
+            prediction_object_prefix(current_user.id),
+            file.file,
+            input_format,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Ошибка при обработке файла: {str(e)}",
+        )
+
+    try:
+        job = crud_job.create(
+            db,
+            obj_in=PredictionJobCreate(
+                model_id=model.id,
+                input_format=input_format,
+                input_file_path=input_object,
+                output_format=output_format,
+                output_mode=output_mode,
+                store_input=store_input,
+                parallel=parallel,
+            ),
+            user=current_user,
+        )
+    except Exception:
+        delete_prediction_files(input_object)
+        raise
+
+    prediction_job_runner.wake()
+
+    return job
+
+@router.post(
+    "/file",
+    response_model=Union[FilePredictionResult, PredictionJob],
+    dependencies=[Depends(deps.admit_prediction)],
+)
 async def create_prediction_from_file(
     *,
     db: Session = Depends(deps.get_db),
+    response: Response,
     file: UploadFile = File(...),
-    model_id: int = Form(...),
+    model_id: Optional[int] = Form(None),
+    model_alias: Optional[str] = Form(None),
+    output_format: str = Form(OUTPUT_FORMAT_CSV),
+    store_input: bool = Form(True),
+    summary_only: bool = Form(False),
+    output_mode: str = Form(OUTPUT_MODE_LABEL),
+    run_async: bool = Form(False),
+    parallel: bool = Form(False),
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
-    model = crud_model.get(db, id=model_id)
+    validate_output_mode(output_mode)
 
-    if not model:
+    if output_format not in OUTPUT_FORMATS:
         raise HTTPException(
-            status_code=404,
-            detail="Модель не найдена",
+            status_code=400,
+            detail=f"Неподдерживаемый формат результата: {output_format}",
         )
 
+    model = get_prediction_model(db, model_id, model_alias)
+
     if current_user.credits < model.cost_per_prediction:
         raise HTTPException(
             status_code=400,
             detail="Недостаточно кредитов для выполнения предсказания",
         )
 
-    try:
-        df = pd.read_csv(file.file)
-
-        model_load_start = time.time()
-
-        try:
-            model_data = storage_service.load_model(model.model_path)
-            ml_model = joblib.load(io.BytesIO(model_data))
-            model_load_time = time.time() - model_load_start
+    if run_async:
+        response.status_code = 202
+
+        return await submit_prediction_job(
+            db,
+            file=file,
+            model=model,
+            output_format=output_format,
+            output_mode=output_mode,
+            store_input=store_input,
+            parallel=parallel,
+            current_user=current_user,
+        )
 
-            MODEL_LOAD_TIME.labels(model_name=model.name).observe(model_load_time)
-        except Exception as e:
-            SYSTEM_ERRORS.labels(error_type="model_load_error").inc()
+    try:
+        loaded_model = None
+
+        if model.n_features is None:
+            # Схема признаков не сохранена при загрузке: имена берутся у самой модели
+            loaded_model = await run_in_threadpool(load_registered_model, model)
+            feature_names = getattr(loaded_model.model, "feature_names_in_", None)
+        else:
+            feature_names = model.feature_names
+
+        # Колонки выбираются в порядке признаков, на которых обучалась модель
+        prediction_input = await run_in_threadpool(
+            read_prediction_input,
+            file.file,
+            file.content_type,
+            feature_names,
+            model.n_features,
+        )
 
+        if current_user.credits < model.cost_per_prediction * len(prediction_input):
             raise HTTPException(
-                status_code=500,
-                detail=f"Ошибка при загрузке модели: {str(e)}",
+                status_code=400,
+                detail="Недостаточно кредитов для выполнения предсказания",
             )
 
-        start_time = time.time()
-
-        try:
-            predictions = ml_model.predict(df.values)
-
-            predictions_list = predictions.tolist()
-
-            df['prediction'] = predictions_list
+        sharded = parallel and sharded_scorer.applies(model, len(prediction_input))
 
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            result_filename = f"predictions_{timestamp}.csv"
-            result_path = os.path.join("results", result_filename)
+        if loaded_model is None and not sharded:
+            # Холодная загрузка или ожидание чужой загрузки не блокирует event loop
+            loaded_model = await run_in_threadpool(load_registered_model, model)
 
-            input_filename = f"input_{timestamp}.csv"
-            input_path = os.path.join("results", input_filename)
-
-            os.makedirs("results", exist_ok=True)
-
-            df.drop('prediction', axis=1).to_csv(input_path, index=False)
+        start_time = time.time()
 
-            df.to_csv(result_path, index=False)
+        try:
+            if sharded:
+                output = await run_in_threadpool(
+                    sharded_scorer.score,
+                    model,
+                    prediction_input.values,
+                    output_mode,
+                )
+            else:
+                # Расчет и ожидание бюджета потоков не занимают event loop
+                output = await run_in_threadpool(
+                    run_prediction,
+                    loaded_model,
+                    prediction_input.values,
+                    output_mode,
+                )
+
+            rows = len(output)
+            cost = model.cost_per_prediction * rows
+
+            input_object, result_object = await run_in_threadpool(
+                store_prediction_files,
+                current_user.id,
+                file.file if store_input else None,
+                prediction_input,
+                output,
+                output_format,
+            )
 
+            # Входы и результаты лежат в файлах хранилища, в базе только пути к ним
             prediction_in = PredictionCreate(
-                model_id=model_id,
-                input_data=df.drop('prediction', axis=1).values.flatten().tolist(),
-                cost=model.cost_per_prediction * len(predictions_list),
+                model_id=model.id,
+                input_data=[],
+                cost=cost,
                 user_id=current_user.id
             )
 
             prediction_update = PredictionUpdate(
-                model_id=model_id,
-                input_data=df.drop('prediction', axis=1).values.flatten().tolist(),
-                cost=model.cost_per_prediction * len(predictions_list),
-                prediction_result=predictions_list
+                model_id=model.id,
+                input_data=[],
+                cost=cost,
+                prediction_result=[],
+                output_mode=output_mode,
             )
 
-            _ = crud_prediction.create(
-                db=db,
-                obj_in=prediction_in,
-                obj_out=prediction_update,
-                user=current_user,
-                model=model,
-                input_file_path=input_path,
-                result_file_path=result_path
-            )
+            try:
+                prediction = crud_prediction.create(
+                    db=db,
+                    obj_in=prediction_in,
+                    obj_out=prediction_update,
+                    user=current_user,
+                    model=model,
+                    input_file_path=input_object,
+                    result_file_path=result_object
+                )
+            except Exception:
+                delete_prediction_files(input_object, result_object)
+                raise
 
             crud_user.update_credits(
                 db=db,
                 db_obj=current_user,
-                credits=-(model.cost_per_prediction * len(predictions_list)),
+                credits=-cost,
             )
 
-            latency = time.time() - start_time
-
-            PREDICTION_LATENCY.labels(model_name=model.name).observe(latency)
-            PREDICTION_COUNTER.labels(
-                model_name=model.name,
-                status="success",
-                user_email=current_user.email
-            ).inc(len(predictions_list))
-            MODEL_USAGE.labels(model_name=model.name).inc(len(predictions_list))
-            PREDICTION_COST.labels(
-                model_name=model.name,
-                user_email=current_user.email
-            ).inc(model.cost_per_prediction * len(predictions_list))
-            USER_CREDITS.labels(user_email=current_user.email).set(current_user.credits)
-            USER_CREDITS_HISTORY.labels(
-                user_email=current_user.email,
-                operation="subtract"
-            ).inc(model.cost_per_prediction * len(predictions_list))
-
-            return FilePredictionResult(
-                predictions=predictions_list,
-                file_path=result_path
-            )
+            record_prediction_metrics(model, current_user, rows, time.time() - start_time)
+
+            # Поля FilePredictionResult: массивы сериализуются без перевода в списки
+            return fast_response({
+                "prediction_id": prediction.id,
+                "rows": rows,
+                "output_format": output_format,
+                "output_mode": output_mode,
+                "predictions": None if summary_only else output.labels,
+                "probabilities": None if summary_only else output.probabilities,
+                "classes": output.classes_list(),
+                "file_path": result_object,
+                "input_file_path": input_object,
+                "download_url": storage_service.get_file_url(
+                    result_object,
+                    settings.STORAGE_URL_EXPIRES,
+                    filename=download_filename(prediction.id, result_object),
+                ),
+            })
 
         except Exception as e:
             PREDICTION_COUNTER.labels(
@@ -339,24 +735,53 @@ async def create_prediction_from_file(
                 detail=f"Ошибка при выполнении предсказания: {str(e)}",
             )
 
+    except HTTPException:
+        # Нехватка кредитов и ошибки загрузки модели доходят до клиента как есть
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=400,
             detail=f"Ошибка при обработке файла: {str(e)}",
         )
 
-@router.get("/file/{filename}")
-async def download_prediction_file(filename: str) -> Any:
-    file_path = os.path.join("results", filename)
+@router.get("/{prediction_id}/download", response_model=DownloadLink)
+def get_prediction_download_link(
+    *,
+    db: Session = Depends(deps.get_db),
+    prediction_id: int,
+    kind: str = Query("result", pattern="^(result|input)$"),
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Временная ссылка на скачивание файла с результатами или входного файла.
+    """
+    prediction = crud_prediction.get(db=db, id=prediction_id)
+
+    if not prediction:
+        raise HTTPException(
+            status_code=404,
+            detail="Предсказание не найдено",
+        )
+
+    if prediction.user_id != current_user.id:
+        raise HTTPException(
+            status_code=403,
+            detail="Недостаточно прав для доступа к предсказанию",
+        )
+
+    object_name = prediction.result_file_path if kind == "result" else prediction.input_file_path
 
-    if not os.path.exists(file_path):
+    if not object_name:
         raise HTTPException(
             status_code=404,
             detail="Файл не найден",
         )
 
-    return FileResponse(
-        path=file_path,
-        filename=filename,
-        media_type="text/csv"
+    return DownloadLink(
+        url=storage_service.get_file_url(
+            object_name,
+            settings.STORAGE_URL_EXPIRES,
+            filename=download_filename(prediction.id, object_name),
+        ),
+        expires_in=settings.STORAGE_URL_EXPIRES,
     )
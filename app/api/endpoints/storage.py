@@ -0,0 +1,54 @@
+import os
+from typing import Any, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from app.core.security import verify_download_signature
+from app.services.storage_backends import LocalStorageBackend
+from app.services.storage_service import storage_service
+
+router = APIRouter()
+
+@router.get("/{object_name:path}")
+def download_object(
+    object_name: str,
+    expires: int,
+    signature: str,
+    filename: Optional[str] = None,
+) -> Any:
+    """
+    Скачивание объекта локального хранилища по подписанной ссылке.
+    """
+    backend = storage_service.backend
+
+    if not isinstance(backend, LocalStorageBackend):
+        raise HTTPException(
+            status_code=404,
+            detail="Файл не найден",
+        )
+
+    if not verify_download_signature(object_name, expires, signature, filename or None):
+        raise HTTPException(
+            status_code=403,
+            detail="Ссылка недействительна или устарела",
+        )
+
+    try:
+        path = backend.path(object_name)
+    except ValueError:
+        raise HTTPException(
+            status_code=404,
+            detail="Файл не найден",
+        )
+
+    if not os.path.isfile(path):
+        raise HTTPException(
+            status_code=404,
+            detail="Файл не найден",
+        )
+
+    return FileResponse(
+        path=path,
+        filename=filename or os.path.basename(object_name),
+    )
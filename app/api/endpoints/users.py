@@ -1,12 +1,13 @@
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.api import deps
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash, get_password_hash_async
 from app.models.models import User
 from app.schemas.schemas import User as UserSchema
 from app.schemas.schemas import UserCreate, CreditUpdate, UserUpdate
@@ -14,12 +15,12 @@ from app.schemas.schemas import UserCreate, CreditUpdate, UserUpdate
 router = APIRouter()
 
 @router.post("/", response_model=UserSchema)
-def create_user(
+async def create_user(
     *,
     db: Session = Depends(deps.get_db),
     user_in: UserCreate,
 ) -> Any:
-    user = db.query(User).filter(User.email == user_in.email).first()
+    user = await run_in_threadpool(crud.get_user_by_email, db, email=user_in.email)
 
     if user:
         raise HTTPException(
@@ -27,17 +28,9 @@ def create_user(
             detail="Пользователь с таким email уже существует",
         )
 
-    user = User(
-        email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
-        full_name=user_in.full_name,
-    )
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+    hashed_password = await get_password_hash_async(user_in.password)
 
-    return user
+    return await run_in_threadpool(crud.create_user, db, user_in, hashed_password=hashed_password)
 
 @router.get("/me", response_model=UserSchema)
 def read_user_me(
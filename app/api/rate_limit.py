@@ -0,0 +1,122 @@
+import math
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.api.affinity import (
+    ALIAS_PREDICT_PATH,
+    BINARY_PREDICTION_PATH,
+    FILE_PREDICTION_PATH,
+    JSON_PREDICTION_PATHS,
+    MODEL_PREDICT_PATH,
+)
+from app.core.config import settings
+from app.core.security import api_key_prefix
+from app.services.api_keys import api_key_cache
+from app.services.rate_limit import RateLimitExceeded, RateLimiter
+
+RATE_LIMIT_DETAILS = {
+    "concurrency": "Превышен лимит одновременных предсказаний",
+}
+
+class RateLimitMiddleware:
+    """
+    Ограничивает частоту POST-запросов к API и число одновременных
+    предсказаний пользователя.
+
+    Пользователь определяется по токену или API-ключу до чтения тела
+    запроса, поэтому превысивший лимит клиент получает 429 с Retry-After,
+    не занимая сеть загрузкой файла. Запросы без действительного токена пропускаются:
+    их отклонит проверка авторизации эндпоинта.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not self.limiter.enabled
+            or not scope["path"].startswith(settings.API_V1_STR)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        user_id = await self._user_id(Headers(scope=scope))
+
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        limits = self.limiter.limits_for(user_id)
+
+        if limits is None:
+            limits = await run_in_threadpool(self.limiter.load, user_id)
+
+        if limits is None:
+            await self.app(scope, receive, send)
+            return
+
+        inference = self._inference(scope["path"])
+
+        try:
+            self.limiter.check_rate(user_id, limits)
+
+            if inference:
+                self.limiter.acquire_inference(limits)
+        except RateLimitExceeded as e:
+            response = JSONResponse(
+                status_code=429,
+                content={"detail": RATE_LIMIT_DETAILS.get(e.limit, "Превышен лимит запросов, повторите позже")},
+                headers={"retry-after": str(max(1, math.ceil(e.retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        if not inference:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release_inference(user_id)
+
+    async def _user_id(self, headers: Headers) -> Optional[int]:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+
+        if scheme.lower() != "bearer" or not token:
+            return None
+
+        prefix = api_key_prefix(token)
+
+        if prefix is not None:
+            if api_key_cache.cached(prefix) is not None:
+                return api_key_cache.verify(token)
+
+            return await run_in_threadpool(api_key_cache.verify, token)
+
+        try:
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+
+        subject = str(payload.get("sub", ""))
+
+        return int(subject) if subject.isdigit() else None
+
+    def _inference(self, path: str) -> bool:
+        return (
+            path in JSON_PREDICTION_PATHS
+            or path == FILE_PREDICTION_PATH
+            or path == BINARY_PREDICTION_PATH
+            or MODEL_PREDICT_PATH.match(path) is not None
+            or ALIAS_PREDICT_PATH.match(path) is not None
+        )
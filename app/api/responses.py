@@ -0,0 +1,59 @@
+import json
+import logging
+from typing import Any, Dict
+
+import numpy as np
+
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.warning("orjson is not installed, fast responses fall back to json")
+
+def _default(value: Any) -> Any:
+    # orjson сам пишет только непрерывные числовые массивы, остальное (строковые метки, срезы) приходит сюда
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON-ответ, который пишет массивы numpy напрямую, без промежуточных
+    списков Python.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(
+                content,
+                default=_default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            )
+
+        return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def fast_response(content: Dict[str, Any]) -> Any:
+    """
+    Ответ из данных, которые обработчик собрал сам.
+
+    С FAST_RESPONSES ответ возвращается как есть, и FastAPI не проверяет его
+    по response_model повторно. Иначе массивы переводятся в списки и ответ
+    проходит обычную проверку.
+    """
+    if settings.FAST_RESPONSES:
+        return FastJSONResponse(content)
+
+    return {
+        key: value.tolist() if isinstance(value, np.ndarray) else value
+        for key, value in content.items()
+    }
@@ -30,6 +30,10 @@ class Settings(BaseSettings):
 
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8
+    # Потоки для bcrypt при входе и регистрации, отдельно от потоков запросов
+    PASSWORD_HASH_WORKERS: int = 2
+    # Сколько секунд API-ключ хранится в памяти воркера: за это время отзыв доходит до остальных воркеров
+    API_KEY_CACHE_TTL: float = 60.0
 
     DEBUG: bool = False
     ENVIRONMENT: str = "development"
@@ -39,8 +43,147 @@ class Settings(BaseSettings):
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_SECURE: bool = False
     MINIO_BUCKET: str = "ml-models"
+    MINIO_PART_SIZE: int = 16 * 1024 * 1024
+    MINIO_PUBLIC_ENDPOINT: Optional[str] = None
+    MINIO_REGION: str = "us-east-1"
+
+    STORAGE_BACKEND: str = "minio"
+    STORAGE_POOL_SIZE: int = 32
+    STORAGE_CONNECT_TIMEOUT: float = 5.0
+    STORAGE_READ_TIMEOUT: float = 60.0
+    STORAGE_MAX_RETRIES: int = 3
+    STORAGE_RANGE_THRESHOLD: int = 64 * 1024 * 1024
+    STORAGE_RANGE_PART_SIZE: int = 16 * 1024 * 1024
+    STORAGE_RANGE_CONCURRENCY: int = 8
+    STORAGE_URL_EXPIRES: int = 3600
+    PUBLIC_API_URL: str = "http://localhost:8000"
+
+    @validator("STORAGE_BACKEND")
+    def validate_storage_backend(cls, v: str) -> str:
+        if v not in ("minio", "local"):
+            raise ValueError("STORAGE_BACKEND must be one of: minio, local")
+
+        return v
+
+    PREDICTION_MAX_IN_FLIGHT: int = 8
+    PREDICTION_MAX_QUEUE_SIZE: int = 32
+    PREDICTION_MAX_QUEUE_WAIT: float = 2.0
+
+    # Лимиты пользователей: rate запросов в секунду с запасом burst и concurrency одновременных предсказаний.
+    # concurrency считается на каждый воркер отдельно, RATE_LIMIT_COORDINATION его не объединяет
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_DEFAULT_PLAN: str = "free"
+    RATE_LIMIT_PLANS: Dict[str, Dict[str, float]] = {
+        "free": {"rate": 5.0, "burst": 10, "concurrency": 2},
+        "pro": {"rate": 50.0, "burst": 100, "concurrency": 8},
+    }
+    # Сколько секунд лимиты пользователя хранятся в памяти воркера
+    RATE_LIMIT_QUOTA_TTL: float = 60.0
+    # off - лимит на каждый воркер, postgres - общий лимит частоты запросов через таблицу rate_limit_usage
+    RATE_LIMIT_COORDINATION: str = "off"
+    RATE_LIMIT_SYNC_INTERVAL: float = 1.0
+    RATE_LIMIT_WINDOW: float = 10.0
+
+    @validator("RATE_LIMIT_COORDINATION")
+    def validate_rate_limit_coordination(cls, v: str) -> str:
+        if v not in ("off", "postgres"):
+            raise ValueError("RATE_LIMIT_COORDINATION must be one of: off, postgres")
+
+        return v
+
+    @validator("RATE_LIMIT_PLANS")
+    def validate_rate_limit_plans(cls, v: Dict[str, Dict[str, float]], values: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+        if values.get("RATE_LIMIT_DEFAULT_PLAN") not in v:
+            raise ValueError("RATE_LIMIT_PLANS must contain RATE_LIMIT_DEFAULT_PLAN")
+
+        for name, limits in v.items():
+            if set(limits) != {"rate", "burst", "concurrency"}:
+                raise ValueError(f"Plan {name} must define rate, burst and concurrency")
+
+        return v
+
+    # Входы и результаты батча хранятся в базе, только если в нем не больше строк;
+    # у предсказаний из файла в базе только пути к файлам
+    PREDICTION_INLINE_MAX_ROWS: int = 100
+
+    PREDICTION_JOBS_ENABLED: bool = True
+    PREDICTION_JOB_WORKERS: int = 2
+    PREDICTION_JOB_CHUNK_ROWS: int = 50000
+    PREDICTION_JOB_POLL_INTERVAL: float = 2.0
+    PREDICTION_JOB_LEASE_TIMEOUT: float = 300.0
+
+    # 0 - по числу ядер
+    PREDICTION_PARALLEL_WORKERS: int = 0
+    PREDICTION_SHARD_ROWS: int = 100000
+    # Пул процессов используется, если расчет на месте по профилю модели дольше этого порога
+    PREDICTION_PARALLEL_MIN_SECONDS: float = 1.0
+
+    AFFINITY_MODE: str = "off"
+    AFFINITY_WORKER_ID: Optional[str] = None
+    # Адрес, по которому другие воркеры могут обратиться к этому напрямую
+    AFFINITY_WORKER_URL: Optional[str] = None
+    AFFINITY_WORKER_WEIGHT: float = 1.0
+    AFFINITY_VNODES: int = 64
+    AFFINITY_LOAD_FACTOR: float = 1.25
+    AFFINITY_REQUESTS_PER_REPLICA: int = 1000
+    AFFINITY_MAX_REPLICAS: int = 3
+    AFFINITY_TRAFFIC_WINDOW: int = 600
+    AFFINITY_REFRESH_INTERVAL: float = 10.0
+    AFFINITY_MEMBER_TIMEOUT: float = 30.0
+    AFFINITY_FORWARD_TIMEOUT: float = 60.0
+    # Срок действия подписи перенаправленного запроса: запас на расхождение часов воркеров
+    AFFINITY_FORWARD_TTL: int = 30
+
+    @validator("AFFINITY_MODE")
+    def validate_affinity_mode(cls, v: str) -> str:
+        if v not in ("off", "forward", "redirect"):
+            raise ValueError("AFFINITY_MODE must be one of: off, forward, redirect")
+
+        return v
+
+    MODEL_COMPRESSION: str = "original"
+    MODEL_COMPRESSION_LEVEL: int = 3
+
+    @validator("MODEL_COMPRESSION")
+    def validate_model_compression(cls, v: str) -> str:
+        if v not in ("original", "none", "zlib", "lzma", "lz4"):
+            raise ValueError("MODEL_COMPRESSION must be one of: original, none, zlib, lzma, lz4")
+
+        return v
+
+    MODEL_COMPILATION_ENABLED: bool = True
+
+    MODEL_PROFILE_REPEAT: int = 10
+    MODEL_PRICE_PER_CPU_SECOND: float = 1000.0
+    MODEL_PRICE_PER_GB: float = 10.0
+    MODEL_PRICE_MIN: float = 0.01
+
+    # Потоков на один вызов модели (n_jobs и лимит OpenMP/BLAS), 0 - не ограничивать
+    MODEL_INFERENCE_THREADS: int = 1
+    # Потоков на все одновременные вызовы в процессе, 0 - по числу ядер
+    MODEL_THREAD_BUDGET: int = 0
+
+    MODEL_ALIAS_REFRESH_INTERVAL: float = 5.0
+    # Сколько секунд прежняя версия остается закрепленной в памяти после переключения имени
+    MODEL_ALIAS_DRAIN_SECONDS: float = 60.0
+
+    # Результаты предсказаний сериализуются напрямую из массивов numpy, без pydantic
+    FAST_RESPONSES: bool = True
+    # Ответы больше этого размера сжимаются gzip, если клиент его принимает, 0 - не сжимать
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024 * 1024
+    RESPONSE_COMPRESSION_LEVEL: int = 1
+
+    MODEL_CATALOG_REFRESH_INTERVAL: float = 5.0
+    # max-age для GET /models/, 0 - клиент проверяет актуальность при каждом запросе
+    MODEL_CATALOG_MAX_AGE: int = 0
+
+    MODEL_CACHE_MAX_MODELS: int = 16
+    MODEL_CACHE_MAX_BYTES: int = 2 * 1024 * 1024 * 1024
+    MODEL_DISK_CACHE_MAX_BYTES: int = 10 * 1024 * 1024 * 1024
 
     BASE_DIR: Path = Path(__file__).resolve().parent.parent
+    MODEL_CACHE_DIR: Path = BASE_DIR.parent / "model_cache"
+    LOCAL_STORAGE_ROOT: Path = BASE_DIR.parent / "storage"
 
     class Config:
         case_sensitive = True
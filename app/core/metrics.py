@@ -66,12 +66,135 @@ PREDICTION_QUEUE_SIZE = Gauge(
     "Current size of prediction queue"
 )
 
+PREDICTION_IN_FLIGHT = Gauge(
+    "ml_service_prediction_in_flight",
+    "Number of predictions currently being served"
+)
+
+PREDICTION_QUEUE_WAIT = Histogram(
+    "ml_service_prediction_queue_wait_seconds",
+    "Time spent by predictions waiting for admission"
+)
+
+PREDICTION_SHED = Counter(
+    "ml_service_prediction_shed_total",
+    "Total number of predictions rejected by admission control",
+    ["reason"]
+)
+
+RATE_LIMIT_DECISIONS = Counter(
+    "ml_service_rate_limit_decisions_total",
+    "Total number of per-user rate and concurrency limit decisions",
+    ["plan", "limit", "decision"]
+)
+
 MODEL_LOAD_TIME = Histogram(
     'model_load_time_seconds',
     'Time spent loading model',
     ['model_name']
 )
 
+MODEL_MEMORY_BYTES = Gauge(
+    'model_memory_bytes',
+    'Estimated memory footprint of a resident model',
+    ['artifact', 'model_name']
+)
+
+MODEL_PREDICT_CALLS = Counter(
+    'model_predict_calls_total',
+    'Total number of predict calls on a resident model',
+    ['artifact', 'model_name']
+)
+
+MODEL_PREDICT_ROWS = Counter(
+    'model_predict_rows_total',
+    'Total number of rows scored by a resident model',
+    ['artifact', 'model_name']
+)
+
+MODEL_PREDICT_CPU_SECONDS = Counter(
+    'model_predict_cpu_seconds_total',
+    'CPU time spent in predict calls of a resident model',
+    ['artifact', 'model_name']
+)
+
+MODEL_RESIDENT = Gauge(
+    'model_resident_count',
+    'Number of models resident in memory'
+)
+
+MODEL_RESIDENT_BYTES = Gauge(
+    'model_resident_bytes',
+    'Total estimated memory footprint of resident models'
+)
+
+MODEL_CACHE_EVENTS = Counter(
+    'model_cache_events_total',
+    'Model cache hits, misses and evictions',
+    ['event']
+)
+
+PREDICTION_JOBS = Counter(
+    'prediction_jobs_total',
+    'Finished asynchronous prediction jobs',
+    ['status']
+)
+
+PREDICTION_JOBS_RUNNING = Gauge(
+    'prediction_jobs_running',
+    'Number of asynchronous prediction jobs being processed by this worker'
+)
+
+AFFINITY_MEMBERS = Gauge(
+    'affinity_members',
+    'Number of live workers taking part in model-affinity routing'
+)
+
+AFFINITY_ASSIGNED_MODELS = Gauge(
+    'affinity_assigned_models',
+    'Number of models assigned to this worker'
+)
+
+AFFINITY_ROUTED = Counter(
+    'affinity_routed_total',
+    'Prediction requests sent to the worker that owns the model',
+    ['action']
+)
+
+MODEL_ALIAS_SWAPS = Counter(
+    'model_alias_swaps_total',
+    'Switches of a model name to a new current version in this worker',
+    ['status']
+)
+
+THREAD_BUDGET_IN_USE = Gauge(
+    'thread_budget_in_use',
+    'Threads reserved by predictions running in this worker'
+)
+
+THREAD_BUDGET_WAIT = Histogram(
+    'thread_budget_wait_seconds',
+    'Time spent by predictions waiting for the thread budget'
+)
+
+def record_prediction_metrics(model, user, rows: int, latency: float) -> None:
+    PREDICTION_LATENCY.labels(model_name=model.name).observe(latency)
+    PREDICTION_COUNTER.labels(
+        model_name=model.name,
+        status="success",
+        user_email=user.email
+    ).inc(rows)
+    MODEL_USAGE.labels(model_name=model.name).inc(rows)
+    PREDICTION_COST.labels(
+        model_name=model.name,
+        user_email=user.email
+    ).inc(model.cost_per_prediction * rows)
+    USER_CREDITS.labels(user_email=user.email).set(user.credits)
+    USER_CREDITS_HISTORY.labels(
+        user_email=user.email,
+        operation="subtract"
+    ).inc(model.cost_per_prediction * rows)
+
 def setup_metrics(app):
     instrumentator = Instrumentator(
         should_group_status_codes=False,
@@ -1,5 +1,12 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import secrets
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
 
 from jose import jwt
 
@@ -9,6 +16,14 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt намеренно медленный: поток входов ждет здесь, не занимая потоки запросов предсказаний
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
+
+API_KEY_PREFIX = "ik_"
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
 ) -> str:
@@ -30,3 +45,62 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(password_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
+def create_api_key() -> Tuple[str, str]:
+    """
+    Новый API-ключ вида ik_<prefix>_<secret> и его prefix.
+    """
+    prefix = secrets.token_hex(4)
+
+    return f"{API_KEY_PREFIX}{prefix}_{secrets.token_urlsafe(32)}", prefix
+
+def api_key_prefix(key: str) -> Optional[str]:
+    # None, если строка не похожа на API-ключ: тогда это JWT
+    if not key.startswith(API_KEY_PREFIX):
+        return None
+
+    prefix, separator, secret = key[len(API_KEY_PREFIX):].partition("_")
+
+    return prefix if separator and secret else None
+
+def hash_api_key(key: str) -> str:
+    # У ключа 256 бит случайности, поэтому медленный хэш вроде bcrypt не нужен
+    return hmac.new(settings.SECRET_KEY.encode(), key.encode(), hashlib.sha256).hexdigest()
+
+def create_download_signature(object_name: str, expires_at: int, filename: Optional[str] = None) -> str:
+    # Имя файла для Content-Disposition тоже подписывается, JSON однозначно разделяет поля
+    message = json.dumps([object_name, expires_at, filename]).encode()
+
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+def verify_download_signature(
+    object_name: str,
+    expires_at: int,
+    signature: str,
+    filename: Optional[str] = None,
+) -> bool:
+    if expires_at < time.time():
+        return False
+
+    return hmac.compare_digest(create_download_signature(object_name, expires_at, filename), signature)
+
+def create_forward_signature(worker_id: str, method: str, path: str, expires_at: int) -> str:
+    message = f"forward:{worker_id}:{method}:{path}:{expires_at}".encode()
+
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+def verify_forward_signature(worker_id: str, method: str, path: str, expires_at: int, signature: str) -> bool:
+    if expires_at < time.time():
+        return False
+
+    return hmac.compare_digest(create_forward_signature(worker_id, method, path, expires_at), signature)
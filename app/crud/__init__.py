@@ -1,5 +1,12 @@
 from .crud_user import crud_user, create_user, get_user, get_user_by_email, update_user_credits
 from .crud_model import crud_model, get_multi, create_model, get_model
+from .crud_artifact import crud_artifact
+from .crud_alias import crud_alias
+from .crud_catalog import crud_catalog
+from .crud_api_key import crud_api_key
+from .crud_rate_limit import crud_rate_limit
+from .crud_job import crud_job
+from .crud_worker import crud_worker
 from .crud_prediction import crud_prediction, create_prediction, get_prediction, get_multi_by_user
 
 __all__ = [
@@ -12,6 +19,13 @@ __all__ = [
     "get_multi",
     "create_model",
     "get_model",
+    "crud_artifact",
+    "crud_alias",
+    "crud_catalog",
+    "crud_api_key",
+    "crud_rate_limit",
+    "crud_job",
+    "crud_worker",
     "crud_prediction",
     "create_prediction",
     "get_prediction",
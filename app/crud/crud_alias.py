@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.models import MLModel, ModelAlias, User
+
+class CRUDAlias:
+    def get_by_name(self, db: Session, *, name: str) -> Optional[ModelAlias]:
+        return db.query(ModelAlias).filter(ModelAlias.name == name).first()
+
+    def get_all(self, db: Session) -> List[ModelAlias]:
+        return db.query(ModelAlias).order_by(ModelAlias.name).all()
+
+    def get_multi_by_owner(self, db: Session, *, owner_id: int) -> List[ModelAlias]:
+        return (
+            db.query(ModelAlias)
+            .filter(ModelAlias.owner_id == owner_id)
+            .order_by(ModelAlias.name)
+            .all()
+        )
+
+    def promote(self, db: Session, *, model: MLModel, user: User) -> ModelAlias:
+        # Блокировка строки: два одновременных продвижения не потеряют previous_model_id
+        alias = (
+            db.query(ModelAlias)
+            .filter(ModelAlias.name == model.name)
+            .with_for_update()
+            .first()
+        )
+
+        if alias is None:
+            alias = ModelAlias(name=model.name, owner_id=user.id, version=0)
+        elif alias.model_id == model.id:
+            db.rollback()
+            return alias
+        else:
+            alias.previous_model_id = alias.model_id
+
+        alias.model_id = model.id
+        alias.version += 1
+        alias.promoted_at = datetime.utcnow()
+
+        db.add(alias)
+        db.commit()
+        db.refresh(alias)
+
+        return alias
+
+crud_alias = CRUDAlias()
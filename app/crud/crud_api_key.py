@@ -0,0 +1,36 @@
+from typing import List, Optional
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.models import ApiKey
+
+class CRUDApiKey:
+    def get(self, db: Session, *, id: int) -> Optional[ApiKey]:
+        return db.get(ApiKey, id)
+
+    def get_by_prefix(self, db: Session, *, prefix: str) -> Optional[ApiKey]:
+        # Владелец загружается тем же запросом: его активность кэшируется вместе с ключом
+        return (
+            db.query(ApiKey)
+            .options(joinedload(ApiKey.user))
+            .filter(ApiKey.prefix == prefix)
+            .first()
+        )
+
+    def get_multi_by_user(self, db: Session, *, user_id: int) -> List[ApiKey]:
+        return db.query(ApiKey).filter(ApiKey.user_id == user_id).order_by(ApiKey.id).all()
+
+    def create(self, db: Session, *, user_id: int, name: str, prefix: str, key_hash: str) -> ApiKey:
+        db_obj = ApiKey(user_id=user_id, name=name, prefix=prefix, key_hash=key_hash)
+
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+
+        return db_obj
+
+    def remove(self, db: Session, *, db_obj: ApiKey) -> None:
+        db.delete(db_obj)
+        db.commit()
+
+crud_api_key = CRUDApiKey()
@@ -0,0 +1,53 @@
+from typing import Optional
+
+from fastapi import HTTPException
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.crud.base import CRUDBase
+from app.models.models import ModelArtifact
+from app.schemas.schemas import ModelArtifactCreate
+
+class CRUDArtifact(CRUDBase[ModelArtifact, ModelArtifactCreate, ModelArtifactCreate]):
+    def get_by_sha256(self, db: Session, *, sha256: str) -> Optional[ModelArtifact]:
+        return db.query(ModelArtifact).filter(ModelArtifact.sha256 == sha256).first()
+
+    def create(self, db: Session, *, obj_in: ModelArtifactCreate) -> ModelArtifact:
+        try:
+            db_obj = ModelArtifact(
+                sha256=obj_in.sha256,
+                object_name=obj_in.object_name,
+                size=obj_in.size,
+                stored_size=obj_in.stored_size,
+                compression=obj_in.compression,
+                inference_engine=obj_in.inference_engine,
+                n_features=obj_in.n_features,
+                feature_names=obj_in.feature_names,
+                input_dtype=obj_in.input_dtype,
+                classes=obj_in.classes,
+                profile_load_time=obj_in.profile_load_time,
+                profile_memory_bytes=obj_in.profile_memory_bytes,
+                profile_latency_single=obj_in.profile_latency_single,
+                profile_latency_batch=obj_in.profile_latency_batch,
+                cost_per_prediction=obj_in.cost_per_prediction,
+            )
+
+            db.add(db_obj)
+            db.commit()
+            db.refresh(db_obj)
+
+            return db_obj
+        except IntegrityError:
+            # Тот же артефакт параллельно загрузил другой запрос
+            db.rollback()
+
+            return self.get_by_sha256(db, sha256=obj_in.sha256)
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Ошибка при сохранении артефакта модели: {str(e)}"
+            )
+
+crud_artifact = CRUDArtifact(ModelArtifact)
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.models import CatalogVersion
+
+CATALOG_KEY = "models"
+
+def model_key(model_id: int) -> str:
+    return f"{CATALOG_KEY}/{model_id}"
+
+class CRUDCatalog:
+    def get(self, db: Session, *, name: str) -> Optional[CatalogVersion]:
+        return db.get(CatalogVersion, name)
+
+    def get_all(self, db: Session) -> List[CatalogVersion]:
+        return db.query(CatalogVersion).all()
+
+    def bump(self, db: Session, *names: str) -> None:
+        """
+        Увеличивает счетчики версий в текущей транзакции, без commit:
+        версии меняются вместе с данными, которые они описывают.
+        """
+        now = datetime.utcnow()
+
+        for name in names:
+            statement = insert(CatalogVersion).values(name=name, version=1, updated_at=now)
+            db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[CatalogVersion.name],
+                    set_={"version": CatalogVersion.version + 1, "updated_at": now},
+                )
+            )
+
+crud_catalog = CRUDCatalog()
@@ -0,0 +1,277 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import HTTPException
+
+from sqlalchemy.orm import Query, Session
+
+from app.crud.base import CRUDBase
+from app.models.models import Prediction, PredictionJob, User
+from app.schemas.schemas import PredictionJobCreate
+
+JOB_STATUS_QUEUED = "queued"
+JOB_STATUS_RUNNING = "running"
+JOB_STATUS_SUCCEEDED = "succeeded"
+JOB_STATUS_FAILED = "failed"
+JOB_STATUS_CANCELLED = "cancelled"
+
+JOB_FINAL_STATUSES = (JOB_STATUS_SUCCEEDED, JOB_STATUS_FAILED, JOB_STATUS_CANCELLED)
+
+class CRUDPredictionJob(CRUDBase[PredictionJob, PredictionJobCreate, PredictionJobCreate]):
+    def create(self, db: Session, *, obj_in: PredictionJobCreate, user: User) -> PredictionJob:
+        try:
+            db_obj = PredictionJob(
+                user_id=user.id,
+                model_id=obj_in.model_id,
+                status=JOB_STATUS_QUEUED,
+                input_format=obj_in.input_format,
+                input_file_path=obj_in.input_file_path,
+                result_file_path=None,
+                output_format=obj_in.output_format,
+                output_mode=obj_in.output_mode,
+                store_input=obj_in.store_input,
+                parallel=obj_in.parallel,
+                rows_processed=0,
+                cancel_requested=False,
+            )
+
+            db.add(db_obj)
+            db.commit()
+            db.refresh(db_obj)
+
+            return db_obj
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Ошибка при создании задачи: {str(e)}"
+            )
+
+    def get_multi_by_user(
+        self,
+        db: Session,
+        *,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[PredictionJob]:
+        return (
+            db.query(PredictionJob)
+            .filter(PredictionJob.user_id == user_id)
+            .order_by(PredictionJob.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def claim_next(self, db: Session) -> Optional[PredictionJob]:
+        """
+        Забирает самую старую задачу из очереди.
+
+        SKIP LOCKED позволяет нескольким процессам и потокам разбирать одну
+        таблицу без внешнего брокера: строку, заблокированную другим
+        обработчиком, запрос пропускает.
+        """
+        job = (
+            db.query(PredictionJob)
+            .filter(PredictionJob.status == JOB_STATUS_QUEUED)
+            .order_by(PredictionJob.id)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+
+        if job is None:
+            db.rollback()
+            return None
+
+        now = datetime.utcnow()
+
+        job.status = JOB_STATUS_RUNNING
+        job.started_at = now
+        job.heartbeat_at = now
+        job.rows_processed = 0
+
+        db.commit()
+        db.refresh(job)
+
+        return job
+
+    def requeue_stale(self, db: Session, *, lease_timeout: float) -> int:
+        # Задачи процесса, который упал, не обновив heartbeat, возвращаются в очередь
+        deadline = datetime.utcnow() - timedelta(seconds=lease_timeout)
+
+        count = (
+            db.query(PredictionJob)
+            .filter(PredictionJob.status == JOB_STATUS_RUNNING)
+            .filter(PredictionJob.heartbeat_at < deadline)
+            .update(
+                {PredictionJob.status: JOB_STATUS_QUEUED, PredictionJob.rows_processed: 0},
+                synchronize_session=False,
+            )
+        )
+
+        db.commit()
+
+        return count
+
+    def _leased(self, db: Session, *, job_id: int, started_at: datetime) -> Query:
+        # Строка задачи, пока она принадлежит обработчику, взявшему ее в started_at.
+        # После requeue_stale задачу забирает другой обработчик с новым started_at
+        return (
+            db.query(PredictionJob)
+            .filter(PredictionJob.id == job_id)
+            .filter(PredictionJob.status == JOB_STATUS_RUNNING)
+            .filter(PredictionJob.started_at == started_at)
+        )
+
+    def heartbeat(self, db: Session, *, job_id: int, started_at: datetime) -> bool:
+        updated = self._leased(db, job_id=job_id, started_at=started_at).update(
+            {PredictionJob.heartbeat_at: datetime.utcnow()},
+            synchronize_session=False,
+        )
+
+        db.commit()
+
+        return bool(updated)
+
+    def update_progress(
+        self,
+        db: Session,
+        *,
+        job: PredictionJob,
+        started_at: datetime,
+        rows_processed: int,
+    ) -> bool:
+        updated = self._leased(db, job_id=job.id, started_at=started_at).update(
+            {
+                PredictionJob.rows_processed: rows_processed,
+                PredictionJob.heartbeat_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+
+        db.commit()
+        # refresh подтягивает cancel_requested, выставленный из другого запроса
+        db.refresh(job)
+
+        return bool(updated)
+
+    def complete(
+        self,
+        db: Session,
+        *,
+        job: PredictionJob,
+        started_at: datetime,
+        prediction: Prediction,
+        user: User,
+        cost: float,
+        result_file_path: str,
+        input_file_path: Optional[str] = None,
+    ) -> bool:
+        """
+        Завершает задачу успешно: запись о предсказании, списание кредитов
+        и смена статуса сохраняются в одной транзакции.
+
+        Если задача уже не принадлежит этому обработчику, ничего не
+        записывается и возвращается False: результат и списание остаются
+        за обработчиком, который забрал задачу.
+        """
+        try:
+            # UPDATE блокирует строку задачи до конца транзакции, поэтому второй
+            # обработчик той же задачи не сможет завершить ее одновременно
+            finished = self._leased(db, job_id=job.id, started_at=started_at).update(
+                {
+                    PredictionJob.status: JOB_STATUS_SUCCEEDED,
+                    PredictionJob.error: None,
+                    PredictionJob.result_file_path: result_file_path,
+                    PredictionJob.input_file_path: input_file_path,
+                    PredictionJob.finished_at: datetime.utcnow(),
+                },
+                synchronize_session=False,
+            )
+
+            if not finished:
+                db.rollback()
+                return False
+
+            if cost > user.credits:
+                raise ValueError("Недостаточно кредитов для выполнения предсказания")
+
+            db.add(prediction)
+            db.flush()
+
+            db.query(PredictionJob).filter(PredictionJob.id == job.id).update(
+                {PredictionJob.prediction_id: prediction.id},
+                synchronize_session=False,
+            )
+
+            user.credits = round(user.credits - cost, 1)
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        db.refresh(job)
+
+        return True
+
+    def finish(
+        self,
+        db: Session,
+        *,
+        job: PredictionJob,
+        started_at: datetime,
+        status: str,
+        error: Optional[str] = None,
+        input_file_path: Optional[str] = None,
+    ) -> bool:
+        # Неуспешное завершение тоже условное: задачу, переданную другому обработчику, не трогаем
+        finished = self._leased(db, job_id=job.id, started_at=started_at).update(
+            {
+                PredictionJob.status: status,
+                PredictionJob.error: error,
+                PredictionJob.input_file_path: input_file_path,
+                PredictionJob.finished_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+
+        db.commit()
+        db.refresh(job)
+
+        return bool(finished)
+
+    def request_cancel(self, db: Session, *, job: PredictionJob) -> PredictionJob:
+        if job.status == JOB_STATUS_QUEUED:
+            # Задача еще не взята в работу, ее можно отменить сразу
+            cancelled = (
+                db.query(PredictionJob)
+                .filter(PredictionJob.id == job.id)
+                .filter(PredictionJob.status == JOB_STATUS_QUEUED)
+                .update(
+                    {
+                        PredictionJob.status: JOB_STATUS_CANCELLED,
+                        PredictionJob.cancel_requested: True,
+                        PredictionJob.finished_at: datetime.utcnow(),
+                    },
+                    synchronize_session=False,
+                )
+            )
+
+            db.commit()
+            db.refresh(job)
+
+            if cancelled:
+                return job
+
+        if job.status == JOB_STATUS_RUNNING:
+            job.cancel_requested = True
+
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+
+        return job
+
+crud_job = CRUDPredictionJob(PredictionJob)
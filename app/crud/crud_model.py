@@ -1,13 +1,14 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from fastapi import HTTPException
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
 
 from app.crud.base import CRUDBase
+from app.crud.crud_catalog import CATALOG_KEY, crud_catalog, model_key
 from app.models.models import MLModel, User
 from app.schemas.schemas import MLModelCreate, MLModelUpdate
-from app.services.model_service import save_model, load_model
 
 class CRUDModel(CRUDBase[MLModel, MLModelCreate, MLModelUpdate]):
     def get(self, db: Session, id: int, include_deleted: bool = False) -> Optional[MLModel]:
@@ -21,8 +22,10 @@ class CRUDModel(CRUDBase[MLModel, MLModelCreate, MLModelUpdate]):
     def get_multi(
         self, db: Session, *, skip: int = 0, limit: int = 100
     ) -> List[MLModel]:
+        # Владелец входит в схему MLModel: он загружается тем же запросом, а не по строке
         return (
             db.query(MLModel)
+            .options(joinedload(MLModel.owner))
             .filter(MLModel.is_deleted == False)
             .filter(MLModel.is_active == True)
             .offset(skip)
@@ -32,28 +35,34 @@ class CRUDModel(CRUDBase[MLModel, MLModelCreate, MLModelUpdate]):
 
     def create(self, db: Session, *, obj_in: MLModelCreate, user: User) -> MLModel:
         try:
-            model_path = save_model(
-                model_data=obj_in.model_file,
-                user=user,
-                model_name=obj_in.name,
-                version=obj_in.version
-            )
-
-            _, cost = load_model(obj_in.model_file)
-
             db_obj = MLModel(
                 name=obj_in.name,
                 description=obj_in.description,
                 version=obj_in.version,
                 owner_id=user.id,
-                model_path=model_path,
+                model_path=obj_in.model_path,
+                artifact_sha256=obj_in.artifact_sha256,
+                artifact_size=obj_in.artifact_size,
+                compression=obj_in.compression,
+                inference_engine=obj_in.inference_engine,
+                n_features=obj_in.n_features,
+                feature_names=obj_in.feature_names,
+                input_dtype=obj_in.input_dtype,
+                classes=obj_in.classes,
+                profile_load_time=obj_in.profile_load_time,
+                profile_memory_bytes=obj_in.profile_memory_bytes,
+                profile_latency_single=obj_in.profile_latency_single,
+                profile_latency_batch=obj_in.profile_latency_batch,
+                inference_threads=obj_in.inference_threads,
                 model_type=obj_in.model_type,
-                cost_per_prediction=cost,
+                cost_per_prediction=round(obj_in.cost_per_prediction, 3),
                 is_active=True,
                 is_deleted=False,
             )
 
             db.add(db_obj)
+            db.flush()
+            crud_catalog.bump(db, CATALOG_KEY, model_key(db_obj.id))
             db.commit()
             db.refresh(db_obj)
 
@@ -75,6 +84,7 @@ class CRUDModel(CRUDBase[MLModel, MLModelCreate, MLModelUpdate]):
     ) -> List[MLModel]:
         return (
             db.query(MLModel)
+            .options(joinedload(MLModel.owner))
             .filter(MLModel.owner_id == owner_id)
             .filter(MLModel.is_deleted == False)
             .offset(skip)
@@ -82,6 +92,25 @@ class CRUDModel(CRUDBase[MLModel, MLModelCreate, MLModelUpdate]):
             .all()
         )
 
+    def get_active(self, db: Session) -> List[MLModel]:
+        return (
+            db.query(MLModel)
+            .filter(MLModel.is_deleted == False)
+            .filter(MLModel.is_active == True)
+            .order_by(MLModel.id)
+            .all()
+        )
+
+    def get_sizes(self, db: Session) -> List[Tuple[int, Optional[int]]]:
+        # Объем в памяти из профиля точнее размера сжатого артефакта
+        return (
+            db.query(MLModel.id, func.coalesce(MLModel.profile_memory_bytes, MLModel.artifact_size))
+            .filter(MLModel.is_deleted == False)
+            .filter(MLModel.is_active == True)
+            .order_by(MLModel.id)
+            .all()
+        )
+
 crud_model = CRUDModel(MLModel)
 
 def create_model(
@@ -91,19 +120,25 @@ def create_model(
     user: User
 ) -> MLModel:
     try:
-        model_path = save_model(
-            model_data=obj_in.model_file,
-            user=user,
-            model_name=obj_in.name,
-            version=obj_in.version
-        )
-
         db_obj = MLModel(
             name=obj_in.name,
             description=obj_in.description,
             version=obj_in.version,
             owner_id=user.id,
-            model_path=model_path,
+            model_path=obj_in.model_path,
+            artifact_sha256=obj_in.artifact_sha256,
+            artifact_size=obj_in.artifact_size,
+            compression=obj_in.compression,
+            inference_engine=obj_in.inference_engine,
+            n_features=obj_in.n_features,
+            feature_names=obj_in.feature_names,
+            input_dtype=obj_in.input_dtype,
+            classes=obj_in.classes,
+            profile_load_time=obj_in.profile_load_time,
+            profile_memory_bytes=obj_in.profile_memory_bytes,
+            profile_latency_single=obj_in.profile_latency_single,
+            profile_latency_batch=obj_in.profile_latency_batch,
+            inference_threads=obj_in.inference_threads,
             model_type=obj_in.model_type,
             cost_per_prediction=round(obj_in.cost_per_prediction, 3),
             is_active=True,
@@ -111,6 +146,8 @@ def create_model(
         )
 
         db.add(db_obj)
+        db.flush()
+        crud_catalog.bump(db, CATALOG_KEY, model_key(db_obj.id))
         db.commit()
         db.refresh(db_obj)
 
@@ -142,6 +179,7 @@ def get_multi(
 ) -> List[MLModel]:
     return (
         db.query(MLModel)
+        .options(joinedload(MLModel.owner))
         .filter(MLModel.is_deleted == False)
         .filter(MLModel.is_active == True)
         .offset(skip)
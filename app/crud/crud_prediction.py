@@ -1,11 +1,48 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
 from fastapi import HTTPException
 from app.crud.base import CRUDBase
 from app.models.models import Prediction, User, MLModel
 from app.schemas.schemas import PredictionCreate, PredictionUpdate
 
+def with_relations(query: Query) -> Query:
+    # Схема Prediction включает пользователя, модель и владельца модели: они загружаются
+    # для всего списка сразу, а не отдельным запросом на каждую строку при сериализации
+    return query.options(
+        joinedload(Prediction.user),
+        selectinload(Prediction.model).joinedload(MLModel.owner),
+    )
+
 class CRUDPrediction(CRUDBase[Prediction, PredictionCreate, PredictionUpdate]):
+    def build(
+        self,
+        *,
+        obj_in: PredictionCreate,
+        obj_out: PredictionUpdate,
+        user: User,
+        model: MLModel,
+        input_file_path: Optional[str] = None,
+        result_file_path: Optional[str] = None
+    ) -> Prediction:
+        # Запись без сохранения: ее можно добавить в транзакцию вызывающего кода
+        prediction_result = obj_out.prediction_result
+        if not isinstance(prediction_result, list):
+            prediction_result = [prediction_result]
+
+        return Prediction(
+            user_id=user.id,
+            model_id=model.id,
+            input_data=obj_in.input_data,
+            prediction_result=prediction_result,
+            probabilities=obj_out.probabilities,
+            output_mode=obj_out.output_mode,
+            cost=model.cost_per_prediction,
+            input_file_path=input_file_path,
+            result_file_path=result_file_path
+        )
+
     def create(
         self,
         db: Session,
@@ -18,18 +55,11 @@ class CRUDPrediction(CRUDBase[Prediction, PredictionCreate, PredictionUpdate]):
         result_file_path: Optional[str] = None
     ) -> Prediction:
         try:
-            input_data = obj_in.input_data
-
-            prediction_result = obj_out.prediction_result
-            if not isinstance(prediction_result, list):
-                prediction_result = [prediction_result]
-
-            prediction = Prediction(
-                user_id=user.id,
-                model_id=model.id,
-                input_data=input_data,
-                prediction_result=prediction_result,
-                cost=model.cost_per_prediction,
+            prediction = self.build(
+                obj_in=obj_in,
+                obj_out=obj_out,
+                user=user,
+                model=model,
                 input_file_path=input_file_path,
                 result_file_path=result_file_path
             )
@@ -55,7 +85,7 @@ class CRUDPrediction(CRUDBase[Prediction, PredictionCreate, PredictionUpdate]):
         limit: int = 100
     ) -> List[Prediction]:
         return (
-            db.query(Prediction)
+            with_relations(db.query(Prediction))
             .filter(Prediction.user_id == user_id)
             .order_by(Prediction.created_at.desc())
             .offset(skip)
@@ -63,6 +93,16 @@ class CRUDPrediction(CRUDBase[Prediction, PredictionCreate, PredictionUpdate]):
             .all()
         )
 
+    def count_by_model(self, db: Session, *, since: datetime) -> Dict[int, int]:
+        rows = (
+            db.query(Prediction.model_id, func.count(Prediction.id))
+            .filter(Prediction.created_at >= since)
+            .group_by(Prediction.model_id)
+            .all()
+        )
+
+        return {model_id: count for model_id, count in rows}
+
 crud_prediction = CRUDPrediction(Prediction)
 
 def create_prediction(
@@ -113,7 +153,7 @@ def get_user_predictions(
     limit: int = 100
 ) -> List[Prediction]:
     return (
-        db.query(Prediction)
+        with_relations(db.query(Prediction))
         .filter(Prediction.user_id == user_id)
         .offset(skip)
         .limit(limit)
@@ -128,7 +168,7 @@ def get_multi_by_user(
     limit: int = 100
 ) -> List[Prediction]:
     return (
-        db.query(Prediction)
+        with_relations(db.query(Prediction))
         .filter(Prediction.user_id == user_id)
         .order_by(Prediction.created_at.desc())
         .offset(skip)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.models import RateLimitUsage
+
+class CRUDRateLimit:
+    def add_usage(self, db: Session, *, window_start: datetime, requests: Dict[int, int]) -> Dict[int, int]:
+        """
+        Добавляет запросы воркера к окну и возвращает общее число запросов
+        каждого пользователя в нем по всем воркерам.
+        """
+        totals = {}
+
+        for user_id, count in requests.items():
+            statement = insert(RateLimitUsage).values(user_id=user_id, window_start=window_start, requests=count)
+            totals[user_id] = db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[RateLimitUsage.user_id, RateLimitUsage.window_start],
+                    set_={"requests": RateLimitUsage.requests + count},
+                ).returning(RateLimitUsage.requests)
+            ).scalar_one()
+
+        db.commit()
+
+        return totals
+
+    def delete_before(self, db: Session, *, window_start: datetime) -> None:
+        db.query(RateLimitUsage).filter(RateLimitUsage.window_start < window_start).delete(synchronize_session=False)
+        db.commit()
+
+crud_rate_limit = CRUDRateLimit()
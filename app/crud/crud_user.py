@@ -61,11 +61,11 @@ class CRUDUser(CRUDBase[User, UserCreate, UserUpdate]):
 
 crud_user = CRUDUser(User)
 
-def create_user(db: Session, user: UserCreate) -> User:
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None) -> User:
     try:
         db_user = User(
             email=user.email,
-            hashed_password=get_password_hash(user.password),
+            hashed_password=hashed_password or get_password_hash(user.password),
             full_name=user.full_name,
             credits=0,
         )
@@ -0,0 +1,37 @@
+from datetime import datetime
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.models.models import WorkerNode
+
+class CRUDWorker:
+    def heartbeat(self, db: Session, *, worker_id: str, url: str, weight: float) -> WorkerNode:
+        node = db.get(WorkerNode, worker_id)
+
+        if node is None:
+            node = WorkerNode(worker_id=worker_id, started_at=datetime.utcnow())
+
+        node.url = url
+        node.weight = weight
+        node.heartbeat_at = datetime.utcnow()
+
+        db.add(node)
+        db.commit()
+        db.refresh(node)
+
+        return node
+
+    def get_alive(self, db: Session, *, since: datetime) -> List[WorkerNode]:
+        return (
+            db.query(WorkerNode)
+            .filter(WorkerNode.heartbeat_at >= since)
+            .order_by(WorkerNode.worker_id)
+            .all()
+        )
+
+    def leave(self, db: Session, *, worker_id: str) -> None:
+        db.query(WorkerNode).filter(WorkerNode.worker_id == worker_id).delete(synchronize_session=False)
+        db.commit()
+
+crud_worker = CRUDWorker()
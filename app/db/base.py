@@ -1,2 +1,2 @@
 from app.db.base_class import Base
-from app.models.models import User, MLModel, Prediction
+from app.models.models import User, MLModel, ModelArtifact, Prediction, PredictionJob, WorkerNode, ModelAlias, CatalogVersion, ApiKey, RateLimitUsage
@@ -0,0 +1,78 @@
+from typing import Any
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# Base.metadata.create_all при старте приложения создает недостающие таблицы целиком,
+# поэтому миграции пропускают таблицы, колонки и индексы, которые уже есть в базе.
+# В offline-режиме (alembic upgrade --sql) базы нет, и DDL выводится без проверок
+
+def _inspector() -> Any:
+    if op.get_context().as_sql:
+        return None
+
+    return sa.inspect(op.get_bind())
+
+def has_table(table_name: str) -> bool:
+    inspector = _inspector()
+
+    return inspector is not None and inspector.has_table(table_name)
+
+def has_column(table_name: str, column_name: str) -> bool:
+    inspector = _inspector()
+
+    if inspector is None or not inspector.has_table(table_name):
+        return False
+
+    return any(column["name"] == column_name for column in inspector.get_columns(table_name))
+
+def has_index(table_name: str, index_name: str) -> bool:
+    inspector = _inspector()
+
+    if inspector is None or not inspector.has_table(table_name):
+        return False
+
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+def has_foreign_key(table_name: str, constraint_name: str) -> bool:
+    inspector = _inspector()
+
+    if inspector is None or not inspector.has_table(table_name):
+        return False
+
+    return any(fk["name"] == constraint_name for fk in inspector.get_foreign_keys(table_name))
+
+def create_table(table_name: str, *columns: Any, **kwargs: Any) -> bool:
+    if has_table(table_name):
+        return False
+
+    op.create_table(table_name, *columns, **kwargs)
+
+    return True
+
+def create_index(index_name: str, table_name: str, columns: list, unique: bool = False) -> None:
+    if not has_index(table_name, index_name):
+        op.create_index(index_name, table_name, columns, unique=unique)
+
+def add_column(table_name: str, column: sa.Column) -> None:
+    if not has_column(table_name, column.name):
+        op.add_column(table_name, column)
+
+def create_foreign_key(
+    constraint_name: str,
+    source_table: str,
+    referent_table: str,
+    local_cols: list,
+    remote_cols: list,
+) -> None:
+    if not has_foreign_key(source_table, constraint_name):
+        op.create_foreign_key(constraint_name, source_table, referent_table, local_cols, remote_cols)
+
+def drop_table(table_name: str) -> None:
+    if has_table(table_name) or op.get_context().as_sql:
+        op.drop_table(table_name)
+
+def drop_column(table_name: str, column_name: str) -> None:
+    if has_column(table_name, column_name) or op.get_context().as_sql:
+        op.drop_column(table_name, column_name)
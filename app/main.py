@@ -1,12 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
+from app.api.affinity import AffinityMiddleware
 from app.api.api import api_router
+from app.api.rate_limit import RateLimitMiddleware
 from app.core.config import settings
 from app.core.metrics import setup_metrics
 from app.db.base import Base
 from app.db.session import engine
 from app.db.init_db import wait_for_db
+from app.services.affinity import affinity_router
+from app.services.job_service import prediction_job_runner
+from app.services.model_aliases import model_alias_manager
+from app.services.model_catalog import model_catalog
+from app.services.parallel_scoring import sharded_scorer
+from app.services.rate_limit import rate_limiter
 
 wait_for_db()
 
@@ -19,6 +28,22 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+# Внутри маршрутизации: перенаправленный запрос учитывается один раз, на воркере-владельце
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+app.add_middleware(AffinityMiddleware, router=affinity_router)
+
+if settings.RESPONSE_COMPRESSION_MIN_SIZE > 0:
+    # Снаружи маршрутизации: ответы, полученные от владельца модели, тоже сжимаются
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=settings.RESPONSE_COMPRESSION_MIN_SIZE,
+        compresslevel=settings.RESPONSE_COMPRESSION_LEVEL,
+    )
+
+setup_metrics(app)
+
+# Добавляется последним и оборачивает весь стек: ответы 429 и 307 из middleware тоже получают CORS-заголовки
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3001"],
@@ -27,10 +52,51 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-setup_metrics(app)
-
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+def start_prediction_jobs() -> None:
+    if settings.PREDICTION_JOBS_ENABLED:
+        prediction_job_runner.start()
+
+@app.on_event("startup")
+def start_affinity_routing() -> None:
+    affinity_router.start()
+
+@app.on_event("startup")
+def start_model_aliases() -> None:
+    # После маршрутизации: прогреваются только версии, принадлежащие воркеру
+    model_alias_manager.start()
+
+@app.on_event("startup")
+def start_model_catalog() -> None:
+    model_catalog.start()
+
+@app.on_event("startup")
+def start_rate_limits() -> None:
+    rate_limiter.start()
+
+@app.on_event("shutdown")
+def stop_rate_limits() -> None:
+    rate_limiter.stop()
+
+@app.on_event("shutdown")
+def stop_model_catalog() -> None:
+    model_catalog.stop()
+
+@app.on_event("shutdown")
+def stop_model_aliases() -> None:
+    model_alias_manager.stop()
+
+@app.on_event("shutdown")
+def stop_affinity_routing() -> None:
+    affinity_router.stop()
+
+@app.on_event("shutdown")
+def stop_prediction_jobs() -> None:
+    prediction_job_runner.stop(timeout=30)
+    sharded_scorer.shutdown()
+
 @app.get("/")
 async def root():
     return {
@@ -1,3 +1,3 @@
-from .models import User, MLModel, Prediction
+from .models import User, MLModel, ModelArtifact, Prediction, PredictionJob, WorkerNode, ModelAlias, CatalogVersion, ApiKey, RateLimitUsage
 
-__all__ = ["User", "MLModel", "Prediction"]
+__all__ = ["User", "MLModel", "ModelArtifact", "Prediction", "PredictionJob", "WorkerNode", "ModelAlias", "CatalogVersion", "ApiKey", "RateLimitUsage"]
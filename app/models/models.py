@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Float, ForeignKey, Integer, String, DateTime, ARRAY
+from sqlalchemy import BigInteger, Boolean, Column, Float, ForeignKey, Integer, JSON, String, DateTime, ARRAY
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -12,7 +12,13 @@ class User(Base):
     hashed_password = Column(String, nullable=False)
     full_name = Column(String)
     is_active = Column(Boolean(), default=True)
+    is_superuser = Column(Boolean(), default=False)
     credits = Column(Float, default=0.0)
+    # Тариф и личные лимиты: пустые значения берутся из тарифа в RATE_LIMIT_PLANS
+    plan = Column(String, nullable=True)
+    rate_limit = Column(Float, nullable=True)
+    rate_burst = Column(Integer, nullable=True)
+    max_concurrent_predictions = Column(Integer, nullable=True)
     
     predictions = relationship("Prediction", back_populates="user")
     models = relationship("MLModel", back_populates="owner")
@@ -25,6 +31,19 @@ class MLModel(Base):
     description = Column(String, nullable=True)
     version = Column(String)
     model_path = Column(String)
+    artifact_sha256 = Column(String(64), ForeignKey("model_artifacts.sha256"), index=True, nullable=True)
+    artifact_size = Column(BigInteger, nullable=True)
+    compression = Column(String, nullable=True)
+    inference_engine = Column(String, nullable=True)
+    n_features = Column(Integer, nullable=True)
+    feature_names = Column(JSON, nullable=True)
+    input_dtype = Column(String, nullable=True)
+    classes = Column(JSON, nullable=True)
+    inference_threads = Column(Integer, nullable=True)
+    profile_load_time = Column(Float, nullable=True)
+    profile_memory_bytes = Column(BigInteger, nullable=True)
+    profile_latency_single = Column(Float, nullable=True)
+    profile_latency_batch = Column(Float, nullable=True)
     model_type = Column(String)
     cost_per_prediction = Column(Float)
     is_active = Column(Boolean(), default=True)
@@ -34,6 +53,30 @@ class MLModel(Base):
     
     owner = relationship("User", back_populates="models")
     predictions = relationship("Prediction", back_populates="model")
+    artifact = relationship("ModelArtifact", back_populates="models")
+
+class ModelArtifact(Base):
+    __tablename__ = "model_artifacts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    object_name = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    stored_size = Column(BigInteger, nullable=True)
+    compression = Column(String, nullable=True)
+    inference_engine = Column(String, nullable=True)
+    n_features = Column(Integer, nullable=True)
+    feature_names = Column(JSON, nullable=True)
+    input_dtype = Column(String, nullable=True)
+    classes = Column(JSON, nullable=True)
+    profile_load_time = Column(Float, nullable=True)
+    profile_memory_bytes = Column(BigInteger, nullable=True)
+    profile_latency_single = Column(Float, nullable=True)
+    profile_latency_batch = Column(Float, nullable=True)
+    cost_per_prediction = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    models = relationship("MLModel", back_populates="artifact")
 
 class Prediction(Base):
     __tablename__ = "predictions"
@@ -43,6 +86,8 @@ class Prediction(Base):
     model_id = Column(Integer, ForeignKey("ml_models.id"))
     input_data = Column(ARRAY(Float))
     prediction_result = Column(ARRAY(Float))
+    probabilities = Column(ARRAY(Float), nullable=True)
+    output_mode = Column(String, nullable=True)
     cost = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
     input_file_path = Column(String, nullable=True)
@@ -50,3 +95,82 @@ class Prediction(Base):
 
     user = relationship("User", back_populates="predictions")
     model = relationship("MLModel", back_populates="predictions")
+
+class PredictionJob(Base):
+    __tablename__ = "prediction_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    model_id = Column(Integer, ForeignKey("ml_models.id"))
+    status = Column(String, index=True, nullable=False)
+    input_format = Column(String, nullable=False)
+    input_file_path = Column(String, nullable=True)
+    result_file_path = Column(String, nullable=True)
+    output_format = Column(String, nullable=False)
+    output_mode = Column(String, nullable=False)
+    store_input = Column(Boolean(), default=True)
+    parallel = Column(Boolean(), default=False)
+    rows_total = Column(Integer, nullable=True)
+    rows_processed = Column(Integer, default=0)
+    cancel_requested = Column(Boolean(), default=False)
+    error = Column(String, nullable=True)
+    prediction_id = Column(Integer, ForeignKey("predictions.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    user = relationship("User")
+    model = relationship("MLModel")
+    prediction = relationship("Prediction")
+
+class WorkerNode(Base):
+    __tablename__ = "worker_nodes"
+
+    worker_id = Column(String, primary_key=True)
+    url = Column(String, nullable=False)
+    weight = Column(Float, default=1.0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ModelAlias(Base):
+    __tablename__ = "model_aliases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, unique=True, index=True, nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    model_id = Column(Integer, ForeignKey("ml_models.id"), nullable=False)
+    previous_model_id = Column(Integer, ForeignKey("ml_models.id"), nullable=True)
+    version = Column(Integer, default=1, nullable=False)
+    promoted_at = Column(DateTime, default=datetime.utcnow)
+
+    owner = relationship("User")
+    model = relationship("MLModel", foreign_keys=[model_id])
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_versions"
+
+    # "models" - весь каталог, "models/{id}" - отдельная модель
+    name = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class ApiKey(Base):
+    __tablename__ = "api_keys"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    name = Column(String, nullable=False)
+    # Открытая часть ключа для поиска, сам ключ хранится только как HMAC
+    prefix = Column(String, unique=True, index=True, nullable=False)
+    key_hash = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    user = relationship("User")
+
+class RateLimitUsage(Base):
+    __tablename__ = "rate_limit_usage"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    window_start = Column(DateTime, primary_key=True, index=True)
+    requests = Column(Integer, default=0, nullable=False)
@@ -9,11 +9,24 @@ from .schemas import (
     MLModel,
     MLModelCreate,
     MLModelUpdate,
+    ModelArtifactCreate,
     Prediction,
     PredictionCreate,
     PredictionUpdate,
     FilePredictionInput,
+    BatchPredictionInput,
+    BatchPredictionResult,
     FilePredictionResult,
+    PredictionJobCreate,
+    PredictionJob,
+    DownloadLink,
+    ResidentModel,
+    ModelCapacity,
+    CapacityReport,
+    ModelAlias,
+    ApiKeyCreate,
+    ApiKey,
+    ApiKeyCreated,
 )
 
 __all__ = [
@@ -27,9 +40,22 @@ __all__ = [
     "MLModel",
     "MLModelCreate",
     "MLModelUpdate",
+    "ModelArtifactCreate",
     "Prediction",
     "PredictionCreate",
     "PredictionUpdate",
     "FilePredictionInput",
+    "BatchPredictionInput",
+    "BatchPredictionResult",
     "FilePredictionResult",
+    "PredictionJobCreate",
+    "PredictionJob",
+    "DownloadLink",
+    "ResidentModel",
+    "ModelCapacity",
+    "CapacityReport",
+    "ModelAlias",
+    "ApiKeyCreate",
+    "ApiKey",
+    "ApiKeyCreated",
 ]
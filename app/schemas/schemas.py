@@ -1,4 +1,4 @@
-from typing import Optional, List, Union
+from typing import Any, Optional, List, Union
 from datetime import datetime
 
 from pydantic import BaseModel, EmailStr
@@ -32,6 +32,11 @@ class UserUpdate(UserBase):
 class UserInDBBase(UserBase):
     id: int
     credits: float
+    is_superuser: Optional[bool] = False
+    plan: Optional[str] = None
+    rate_limit: Optional[float] = None
+    rate_burst: Optional[int] = None
+    max_concurrent_predictions: Optional[int] = None
 
     class Config:
         orm_mode = True
@@ -45,6 +50,13 @@ class UserInDB(UserInDBBase):
 class CreditUpdate(BaseModel):
     amount: float
 
+class UserQuotaUpdate(BaseModel):
+    # Пустые лимиты берутся из тарифа
+    plan: Optional[str] = None
+    rate_limit: Optional[float] = None
+    rate_burst: Optional[int] = None
+    max_concurrent_predictions: Optional[int] = None
+
 class MLModelBase(BaseModel):
     name: str
     description: str
@@ -53,9 +65,39 @@ class MLModelBase(BaseModel):
 class MLModelCreate(MLModelBase):
     owner_id: int
     cost_per_prediction: float
-    model_file: bytes
+    model_path: str
+    artifact_sha256: str
+    artifact_size: int
+    compression: Optional[str] = None
+    inference_engine: Optional[str] = None
+    n_features: Optional[int] = None
+    feature_names: Optional[List[str]] = None
+    input_dtype: Optional[str] = None
+    classes: Optional[List[Any]] = None
+    inference_threads: Optional[int] = None
+    profile_load_time: Optional[float] = None
+    profile_memory_bytes: Optional[int] = None
+    profile_latency_single: Optional[float] = None
+    profile_latency_batch: Optional[float] = None
     model_type: str
 
+class ModelArtifactCreate(BaseModel):
+    sha256: str
+    object_name: str
+    size: int
+    stored_size: int
+    compression: str
+    inference_engine: str
+    n_features: Optional[int] = None
+    feature_names: Optional[List[str]] = None
+    input_dtype: Optional[str] = None
+    classes: Optional[List[Any]] = None
+    profile_load_time: Optional[float] = None
+    profile_memory_bytes: Optional[int] = None
+    profile_latency_single: Optional[float] = None
+    profile_latency_batch: Optional[float] = None
+    cost_per_prediction: float
+
 class MLModelUpdate(MLModelBase):
     is_active: Optional[bool] = None
 
@@ -67,13 +109,28 @@ class MLModel(MLModelBase):
     created_at: datetime
     cost_per_prediction: float
     model_type: str
+    artifact_sha256: Optional[str] = None
+    artifact_size: Optional[int] = None
+    compression: Optional[str] = None
+    inference_engine: Optional[str] = None
+    n_features: Optional[int] = None
+    feature_names: Optional[List[str]] = None
+    input_dtype: Optional[str] = None
+    classes: Optional[List[Any]] = None
+    inference_threads: Optional[int] = None
+    profile_load_time: Optional[float] = None
+    profile_memory_bytes: Optional[int] = None
+    profile_latency_single: Optional[float] = None
+    profile_latency_batch: Optional[float] = None
     owner: User
 
     class Config:
         orm_mode = True
 
 class PredictionInput(BaseModel):
-    model_id: int
+    model_id: Optional[int] = None
+    # Имя модели: предсказание выполняет ее текущая версия
+    model_alias: Optional[str] = None
     input_data: List[float]
 
 class PredictionBase(BaseModel):
@@ -86,6 +143,8 @@ class PredictionCreate(PredictionBase):
 
 class PredictionUpdate(PredictionBase):
     prediction_result: Union[float, List[float]]
+    probabilities: Optional[List[float]] = None
+    output_mode: Optional[str] = None
 
 class Prediction(PredictionBase):
     id: int
@@ -94,6 +153,8 @@ class Prediction(PredictionBase):
     user: User
     model: MLModel
     prediction_result: Union[float, List[float]]
+    probabilities: Optional[List[float]] = None
+    output_mode: Optional[str] = None
     input_file_path: Optional[str] = None
     result_file_path: Optional[str] = None
 
@@ -107,6 +168,129 @@ class FilePredictionInput(BaseModel):
     model_id: int
     file_path: str
 
+class BatchPredictionInput(BaseModel):
+    model_id: Optional[int] = None
+    # Имя модели: предсказание выполняет ее текущая версия
+    model_alias: Optional[str] = None
+    inputs: List[List[float]]
+
+class BatchPredictionResult(BaseModel):
+    prediction_id: int
+    rows: int
+    output_mode: str
+    predictions: Optional[List[Any]] = None
+    probabilities: Optional[List[Any]] = None
+    classes: Optional[List[Any]] = None
+
 class FilePredictionResult(BaseModel):
-    predictions: List[float]
+    prediction_id: int
+    rows: int
+    output_format: str
+    output_mode: str
+    predictions: Optional[List[Any]] = None
+    probabilities: Optional[List[Any]] = None
+    classes: Optional[List[Any]] = None
     file_path: str
+    input_file_path: Optional[str] = None
+    download_url: str
+
+class PredictionJobCreate(BaseModel):
+    model_id: int
+    input_format: str
+    input_file_path: str
+    output_format: str
+    output_mode: str
+    store_input: bool = True
+    parallel: bool = False
+
+class PredictionJob(BaseModel):
+    id: int
+    model_id: int
+    status: str
+    input_format: str
+    output_format: str
+    output_mode: str
+    parallel: bool = False
+    rows_total: Optional[int] = None
+    rows_processed: int = 0
+    cancel_requested: bool = False
+    error: Optional[str] = None
+    prediction_id: Optional[int] = None
+    input_file_path: Optional[str] = None
+    result_file_path: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+class DownloadLink(BaseModel):
+    url: str
+    expires_in: int
+
+class ResidentModel(BaseModel):
+    artifact: str
+    model_ids: List[int]
+    model_name: str
+    inference_engine: str
+    threads: Optional[int] = None
+    memory_bytes: int
+    load_time: float
+    loaded_at: datetime
+    last_used_at: datetime
+    pinned: bool
+    predict_calls: int
+    predict_rows: int
+    predict_cpu_time: float
+    cpu_time_per_row: float
+
+    class Config:
+        orm_mode = True
+
+class ModelCapacity(BaseModel):
+    id: int
+    name: str
+    version: str
+    memory_bytes: Optional[int] = None
+    load_time: Optional[float] = None
+    latency_single: Optional[float] = None
+    latency_batch: Optional[float] = None
+    rows_per_second: Optional[float] = None
+
+class CapacityReport(BaseModel):
+    models: List[ModelCapacity]
+    memory_bytes: int
+    cache_max_bytes: int
+    cache_max_models: int
+    fits_in_cache: bool
+    unprofiled_models: int
+
+class ModelAlias(BaseModel):
+    name: str
+    owner_id: int
+    model_id: int
+    previous_model_id: Optional[int] = None
+    version: int
+    promoted_at: datetime
+    # Версия, которую обслуживает воркер, ответивший на запрос
+    active_model_id: Optional[int] = None
+
+    class Config:
+        orm_mode = True
+
+class ApiKeyCreate(BaseModel):
+    name: str
+
+class ApiKey(BaseModel):
+    id: int
+    name: str
+    prefix: str
+    created_at: datetime
+
+    class Config:
+        orm_mode = True
+
+class ApiKeyCreated(ApiKey):
+    # Полный ключ возвращается только при создании
+    key: str
@@ -0,0 +1,132 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.metrics import (
+    PREDICTION_QUEUE_SIZE,
+    PREDICTION_IN_FLIGHT,
+    PREDICTION_QUEUE_WAIT,
+    PREDICTION_SHED,
+)
+
+class AdmissionController:
+    """
+    Ограничивает число одновременно выполняемых предсказаний.
+
+    Запросы сверх лимита ждут в ограниченной очереди в event loop, а не в
+    threadpool. Если очередь заполнена или слот не освободился за
+    max_queue_wait секунд, запрос сразу отклоняется с 503 и Retry-After.
+    """
+
+    def __init__(self, max_in_flight: int, max_queue_size: int, max_queue_wait: float):
+        self.max_in_flight = max_in_flight
+        self.max_queue_size = max_queue_size
+        self.max_queue_wait = max_queue_wait
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_size(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        if not self._service_time:
+            return 1
+
+        backlog = (len(self._waiters) + self._in_flight) / max(1, self.max_in_flight)
+
+        return max(1, math.ceil(backlog * self._service_time))
+
+    def _shed(self, reason: str) -> HTTPException:
+        PREDICTION_SHED.labels(reason=reason).inc()
+
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сервис перегружен, повторите запрос позже",
+            headers={"Retry-After": str(self.retry_after())},
+        )
+
+    def _update_gauges(self) -> None:
+        PREDICTION_QUEUE_SIZE.set(len(self._waiters))
+        PREDICTION_IN_FLIGHT.set(self._in_flight)
+
+    async def acquire(self) -> float:
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._update_gauges()
+            PREDICTION_QUEUE_WAIT.observe(0.0)
+
+            return time.monotonic()
+
+        if len(self._waiters) >= self.max_queue_size:
+            raise self._shed("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_gauges()
+
+        enqueued_at = time.monotonic()
+
+        try:
+            await asyncio.wait({waiter}, timeout=self.max_queue_wait)
+        except asyncio.CancelledError:
+            if waiter.done():
+                self._pass_slot()
+            else:
+                self._drop_waiter(waiter)
+
+            raise
+
+        PREDICTION_QUEUE_WAIT.observe(time.monotonic() - enqueued_at)
+
+        if not waiter.done():
+            self._drop_waiter(waiter)
+
+            raise self._shed("timeout")
+
+        return time.monotonic()
+
+    def _drop_waiter(self, waiter: asyncio.Future) -> None:
+        waiter.cancel()
+        self._waiters.remove(waiter)
+        self._update_gauges()
+
+    def _pass_slot(self) -> None:
+        # Слот передается следующему ожидающему, счетчик in_flight не меняется
+        while self._waiters:
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                waiter.set_result(None)
+                self._update_gauges()
+                return
+
+        self._in_flight -= 1
+        self._update_gauges()
+
+    def release(self, started_at: float) -> None:
+        elapsed = time.monotonic() - started_at
+
+        if self._service_time:
+            self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+        else:
+            self._service_time = elapsed
+
+        self._pass_slot()
+
+prediction_admission = AdmissionController(
+    max_in_flight=settings.PREDICTION_MAX_IN_FLIGHT,
+    max_queue_size=settings.PREDICTION_MAX_QUEUE_SIZE,
+    max_queue_wait=settings.PREDICTION_MAX_QUEUE_WAIT,
+)
@@ -0,0 +1,197 @@
+import itertools
+import logging
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from app.core.config import settings
+from app.core.metrics import AFFINITY_ASSIGNED_MODELS, AFFINITY_MEMBERS
+from app.crud.crud_model import crud_model
+from app.crud.crud_prediction import crud_prediction
+from app.crud.crud_worker import crud_worker
+from app.db.session import SessionLocal
+from app.services.hash_ring import ModelLoad, WorkerInfo, assign_models
+from app.services.model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+AFFINITY_MODE_OFF = "off"
+AFFINITY_MODE_FORWARD = "forward"
+AFFINITY_MODE_REDIRECT = "redirect"
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class AffinityRouter:
+    """
+    Принадлежность моделей воркерам.
+
+    Воркеры регистрируются в таблице worker_nodes и обновляют heartbeat.
+    Раз в refresh_interval каждый воркер читает живых участников, размеры и
+    трафик моделей и пересчитывает назначение. Модели, которые больше не
+    принадлежат воркеру, выгружаются из его памяти.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        worker_id: str,
+        url: Optional[str],
+        weight: float,
+        refresh_interval: float,
+        member_timeout: float,
+    ):
+        self.mode = mode
+        self.worker_id = worker_id
+        self.url = url
+        self.weight = weight
+        self.refresh_interval = refresh_interval
+        self.member_timeout = member_timeout
+
+        self._workers: Dict[str, WorkerInfo] = {}
+        self._assignment: Dict[int, List[str]] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._counter = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != AFFINITY_MODE_OFF and bool(self.url)
+
+    def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+
+        self._stopping.clear()
+        self.refresh()
+
+        self._thread = threading.Thread(target=self._run, name="affinity-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+        self._thread.join(self.refresh_interval)
+        self._thread = None
+
+        db = SessionLocal()
+
+        try:
+            crud_worker.leave(db, worker_id=self.worker_id)
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Affinity refresh failed: {str(e)}")
+
+    def refresh(self) -> None:
+        db = SessionLocal()
+
+        try:
+            crud_worker.heartbeat(db, worker_id=self.worker_id, url=self.url, weight=self.weight)
+
+            alive_since = datetime.utcnow() - timedelta(seconds=self.member_timeout)
+            workers = [
+                WorkerInfo(node.worker_id, node.url, node.weight)
+                for node in crud_worker.get_alive(db, since=alive_since)
+            ]
+
+            traffic_since = datetime.utcnow() - timedelta(seconds=settings.AFFINITY_TRAFFIC_WINDOW)
+            requests = crud_prediction.count_by_model(db, since=traffic_since)
+            models = [
+                ModelLoad(model_id, size or 0, requests.get(model_id, 0))
+                for model_id, size in crud_model.get_sizes(db)
+            ]
+        finally:
+            db.close()
+
+        self.update(workers, models)
+
+    def update(self, workers: Sequence[WorkerInfo], models: Sequence[ModelLoad]) -> None:
+        assignment = assign_models(
+            workers,
+            models,
+            vnodes=settings.AFFINITY_VNODES,
+            requests_per_replica=settings.AFFINITY_REQUESTS_PER_REPLICA,
+            max_replicas=settings.AFFINITY_MAX_REPLICAS,
+            load_factor=settings.AFFINITY_LOAD_FACTOR,
+        )
+
+        with self._lock:
+            self._workers = {worker.worker_id: worker for worker in workers}
+            self._assignment = assignment
+
+        AFFINITY_MEMBERS.set(len(workers))
+        AFFINITY_ASSIGNED_MODELS.set(sum(self.worker_id in owners for owners in assignment.values()))
+
+        self._evict_foreign()
+
+    def _evict_foreign(self) -> None:
+        # Освобождаем память от моделей, которые после перебалансировки принадлежат другим воркерам.
+        # Закрепленные тоже вытесняются: запросы к ним сюда больше не придут
+        for entry in model_registry.resident():
+            if not entry.model_ids:
+                continue
+
+            if not any(self.is_local(model_id) for model_id in entry.model_ids):
+                model_registry.evict(entry.model_ids[0])
+
+    def owners(self, model_id: int) -> List[WorkerInfo]:
+        with self._lock:
+            return [
+                self._workers[worker_id]
+                for worker_id in self._assignment.get(model_id, [])
+                if worker_id in self._workers
+            ]
+
+    def is_local(self, model_id: int) -> bool:
+        with self._lock:
+            owners = self._assignment.get(model_id)
+
+        # Модель, о которой воркер еще не знает (только что создана), обслуживается на месте
+        return not owners or self.worker_id in owners
+
+    def pick(self, model_id: int) -> Optional[WorkerInfo]:
+        """
+        Воркер для запроса к модели или None, если запрос обслуживается здесь.
+        """
+        if not self.enabled or self.is_local(model_id):
+            return None
+
+        owners = self.owners(model_id)
+
+        if not owners:
+            return None
+
+        # Запросы к реплицированной модели распределяются по репликам по кругу
+        return owners[next(self._counter) % len(owners)]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "worker_id": self.worker_id,
+                "mode": self.mode,
+                "workers": [
+                    {"worker_id": worker.worker_id, "url": worker.url, "weight": worker.weight}
+                    for worker in self._workers.values()
+                ],
+                "assignment": {model_id: list(owners) for model_id, owners in self._assignment.items()},
+            }
+
+affinity_router = AffinityRouter(
+    mode=settings.AFFINITY_MODE,
+    worker_id=settings.AFFINITY_WORKER_ID or default_worker_id(),
+    url=settings.AFFINITY_WORKER_URL,
+    weight=settings.AFFINITY_WORKER_WEIGHT,
+    refresh_interval=settings.AFFINITY_REFRESH_INTERVAL,
+    member_timeout=settings.AFFINITY_MEMBER_TIMEOUT,
+)
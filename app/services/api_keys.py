@@ -0,0 +1,101 @@
+import hmac
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import api_key_prefix, hash_api_key
+from app.crud.crud_api_key import crud_api_key
+from app.db.session import SessionLocal
+
+class ApiKeyEntry:
+    def __init__(self, user_id: int, key_hash: str, user_active: bool, expires_at: float):
+        self.user_id = user_id
+        self.key_hash = key_hash
+        self.user_active = user_active
+        self.expires_at = expires_at
+
+class ApiKeyCache:
+    """
+    API-ключи в памяти воркера.
+
+    Ключ ищется по открытому prefix, секрет сверяется с сохраненным HMAC
+    за постоянное время. После первого обращения ключ проверяется без
+    запроса к базе, пока не истечет ttl: отозванный ключ перестает
+    действовать на воркере, который его отозвал, сразу, на остальных -
+    не позже чем через ttl секунд.
+
+    Вместе с ключом кэшируется активность владельца: ключ неактивного
+    пользователя отклоняется без запроса к базе, отключение пользователя
+    вступает в силу так же не позже чем через ttl секунд.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+        self._entries: Dict[str, ApiKeyEntry] = {}
+        self._lock = threading.Lock()
+
+    def cached(self, prefix: str) -> Optional[ApiKeyEntry]:
+        with self._lock:
+            entry = self._entries.get(prefix)
+
+            if entry is None or entry.expires_at <= time.monotonic():
+                return None
+
+            return entry
+
+    def load(self, prefix: str, db: Optional[Session] = None) -> Optional[ApiKeyEntry]:
+        own_session = db is None
+        db = db or SessionLocal()
+
+        try:
+            api_key = crud_api_key.get_by_prefix(db, prefix=prefix)
+        finally:
+            if own_session:
+                db.close()
+
+        with self._lock:
+            if api_key is None:
+                self._entries.pop(prefix, None)
+                return None
+
+            entry = ApiKeyEntry(
+                api_key.user_id,
+                api_key.key_hash,
+                api_key.user.is_active,
+                time.monotonic() + self.ttl,
+            )
+            self._entries[prefix] = entry
+
+            return entry
+
+    def verify(self, key: str, db: Optional[Session] = None) -> Optional[int]:
+        """
+        id владельца ключа или None, если ключ неизвестен, неверен или
+        его владелец неактивен.
+        Без ключа в кэше обращается к базе, поэтому из event loop вызывается
+        только после cached.
+        """
+        prefix = api_key_prefix(key)
+
+        if prefix is None:
+            return None
+
+        entry = self.cached(prefix) or self.load(prefix, db)
+
+        if entry is None or not hmac.compare_digest(hash_api_key(key), entry.key_hash):
+            return None
+
+        if not entry.user_active:
+            return None
+
+        return entry.user_id
+
+    def invalidate(self, prefix: str) -> None:
+        with self._lock:
+            self._entries.pop(prefix, None)
+
+api_key_cache = ApiKeyCache(ttl=settings.API_KEY_CACHE_TTL)
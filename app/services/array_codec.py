@@ -0,0 +1,156 @@
+import io
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+CONTENT_TYPE_NDARRAY = "application/x-ndarray"
+CONTENT_TYPE_NPY = "application/x-npy"
+BINARY_CONTENT_TYPES = (CONTENT_TYPE_NDARRAY, CONTENT_TYPE_NPY)
+
+DTYPE_HEADER = "x-array-dtype"
+SHAPE_HEADER = "x-array-shape"
+PROBA_DTYPE_HEADER = "x-proba-dtype"
+PROBA_SHAPE_HEADER = "x-proba-shape"
+
+# Вход всегда little-endian: так его без перестановки байт читают x86 и ARM
+INPUT_DTYPES = {
+    "float32": np.dtype("<f4"),
+    "float64": np.dtype("<f8"),
+}
+
+def media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";")[0].strip().lower()
+
+def parse_shape(value: Optional[str]) -> Tuple[int, ...]:
+    if not value:
+        raise ValueError(f"Не указан заголовок {SHAPE_HEADER}")
+
+    try:
+        shape = tuple(int(dim) for dim in value.split(","))
+    except ValueError:
+        raise ValueError(f"Некорректный заголовок {SHAPE_HEADER}: {value}")
+
+    if any(dim < 0 for dim in shape):
+        raise ValueError(f"Некорректный заголовок {SHAPE_HEADER}: {value}")
+
+    return shape
+
+def format_shape(shape: Tuple[int, ...]) -> str:
+    return ",".join(str(dim) for dim in shape)
+
+def decode_ndarray(body: bytes, dtype: Optional[str], shape: Optional[str]) -> np.ndarray:
+    """
+    Сырые little-endian float32/float64 с формой в заголовке.
+
+    Массив ссылается на буфер тела запроса без копирования.
+    """
+    if dtype not in INPUT_DTYPES:
+        raise ValueError(f"Заголовок {DTYPE_HEADER} должен быть float32 или float64")
+
+    dims = parse_shape(shape)
+    array_dtype = INPUT_DTYPES[dtype]
+
+    if int(np.prod(dims)) * array_dtype.itemsize != len(body):
+        raise ValueError("Размер тела запроса не совпадает с формой массива")
+
+    return np.frombuffer(body, dtype=array_dtype).reshape(dims)
+
+def decode_npy(body: bytes) -> np.ndarray:
+    """
+    Массив в формате .npy. Заголовок разбирается отдельно, данные читаются
+    из буфера тела запроса без копирования.
+    """
+    stream = io.BytesIO(body)
+
+    try:
+        version = np.lib.format.read_magic(stream)
+
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(stream)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(stream)
+        else:
+            raise ValueError(f"версия формата {version} не поддерживается")
+    except ValueError as e:
+        raise ValueError(f"Некорректный .npy: {str(e)}")
+
+    if dtype.kind != "f" or dtype.itemsize not in (4, 8):
+        raise ValueError("Поддерживаются только массивы float32 и float64")
+
+    count = int(np.prod(shape))
+
+    if count * dtype.itemsize != len(body) - stream.tell():
+        raise ValueError("Размер данных .npy не совпадает с формой массива")
+
+    array = np.frombuffer(body, dtype=dtype, count=count, offset=stream.tell())
+
+    if fortran_order:
+        return array.reshape(shape[::-1]).T
+
+    return array.reshape(shape)
+
+def decode_array(body: bytes, content_type: Optional[str], headers: Mapping[str, str]) -> np.ndarray:
+    """
+    Двумерный массив признаков из бинарного тела запроса.
+    """
+    kind = media_type(content_type)
+
+    if kind == CONTENT_TYPE_NDARRAY:
+        X = decode_ndarray(body, headers.get(DTYPE_HEADER), headers.get(SHAPE_HEADER))
+    elif kind == CONTENT_TYPE_NPY:
+        X = decode_npy(body)
+    else:
+        raise ValueError(f"Неподдерживаемый тип содержимого: {kind or 'не указан'}")
+
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+
+    if X.ndim != 2:
+        raise ValueError("Ожидается двумерный массив признаков")
+
+    return X
+
+def _numeric(array: np.ndarray) -> np.ndarray:
+    if array.dtype.kind not in "biuf":
+        raise ValueError("Бинарный ответ поддерживает только числовые метки, используйте JSON")
+
+    # Порядок байт ответа фиксирован так же, как у входа
+    return array.astype(array.dtype.newbyteorder("<"), copy=False)
+
+def encode_arrays(
+    content_type: str,
+    labels: Optional[np.ndarray],
+    probabilities: Optional[np.ndarray],
+) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Бинарный ответ: метки, затем вероятности.
+
+    В application/x-ndarray это сырые байты массивов подряд, их форма и тип
+    передаются заголовками. В application/x-npy это массивы .npy подряд,
+    которые читаются последовательными вызовами np.load из одного потока.
+    """
+    arrays: List[np.ndarray] = []
+    headers: Dict[str, str] = {}
+
+    for array, dtype_header, shape_header in (
+        (labels, DTYPE_HEADER, SHAPE_HEADER),
+        (probabilities, PROBA_DTYPE_HEADER, PROBA_SHAPE_HEADER),
+    ):
+        if array is None:
+            continue
+
+        array = np.ascontiguousarray(_numeric(array))
+        arrays.append(array)
+
+        headers[dtype_header] = array.dtype.name
+        headers[shape_header] = format_shape(array.shape)
+
+    if content_type == CONTENT_TYPE_NDARRAY:
+        return b"".join(array.data for array in arrays), headers
+
+    buffer = io.BytesIO()
+
+    for array in arrays:
+        np.lib.format.write_array(buffer, array, allow_pickle=False)
+
+    return buffer.getvalue(), headers
@@ -0,0 +1,135 @@
+import bisect
+import hashlib
+import itertools
+import math
+from typing import Dict, Iterator, List, Sequence
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+class WorkerInfo:
+    def __init__(self, worker_id: str, url: str, weight: float = 1.0):
+        self.worker_id = worker_id
+        self.url = url
+        self.weight = weight
+
+class ModelLoad:
+    """
+    Вес модели при распределении: объем в памяти и число запросов за окно.
+    """
+
+    def __init__(self, model_id: int, size: int, requests: int = 0):
+        self.model_id = model_id
+        self.size = size
+        self.requests = requests
+
+class HashRing:
+    """
+    Кольцо консистентного хеширования с виртуальными узлами.
+
+    Число виртуальных узлов воркера пропорционально его весу. При
+    добавлении или удалении воркера меняется владелец только у ключей
+    соседних с ним участков кольца.
+    """
+
+    def __init__(self, workers: Sequence[WorkerInfo], vnodes: int):
+        points = []
+
+        for worker in workers:
+            for i in range(max(1, round(vnodes * worker.weight))):
+                points.append((_hash(f"{worker.worker_id}#{i}"), worker.worker_id))
+
+        points.sort()
+
+        self._hashes = [point for point, _ in points]
+        self._owners = [owner for _, owner in points]
+        self.size = len({worker.worker_id for worker in workers})
+
+    def walk(self, key: str) -> Iterator[str]:
+        """
+        Различные воркеры по часовой стрелке от позиции ключа.
+        """
+        if not self._hashes:
+            return
+
+        start = bisect.bisect(self._hashes, _hash(key))
+        seen = set()
+
+        for index in itertools.chain(range(start, len(self._owners)), range(start)):
+            owner = self._owners[index]
+
+            if owner not in seen:
+                seen.add(owner)
+                yield owner
+
+                if len(seen) == self.size:
+                    return
+
+def replica_count(load: ModelLoad, workers: int, requests_per_replica: int, max_replicas: int) -> int:
+    if not requests_per_replica:
+        return 1
+
+    replicas = max(1, math.ceil(load.requests / requests_per_replica))
+
+    return min(replicas, max_replicas, workers)
+
+def assign_models(
+    workers: Sequence[WorkerInfo],
+    models: Sequence[ModelLoad],
+    vnodes: int = 64,
+    requests_per_replica: int = 0,
+    max_replicas: int = 1,
+    load_factor: float = 1.25,
+) -> Dict[int, List[str]]:
+    """
+    Назначает каждой модели список воркеров-владельцев.
+
+    Консистентное хеширование с ограниченной нагрузкой: воркер пропускается,
+    если с моделью его доля по объему превысит load_factor от средней с
+    учетом веса. Популярные модели получают дополнительные реплики.
+    Результат детерминирован: все воркеры, видящие одни и те же данные,
+    вычисляют одинаковое назначение.
+    """
+    if not workers:
+        return {}
+
+    ring = HashRing(workers, vnodes)
+    weights = {worker.worker_id: worker.weight for worker in workers}
+    total_weight = sum(weights.values())
+
+    ordered = sorted(models, key=lambda load: (-load.requests, -load.size, load.model_id))
+    replicas = {
+        load.model_id: replica_count(load, len(workers), requests_per_replica, max_replicas)
+        for load in ordered
+    }
+
+    total_bytes = sum(max(1, load.size) * replicas[load.model_id] for load in ordered)
+    capacity = {
+        worker_id: load_factor * total_bytes * weight / total_weight
+        for worker_id, weight in weights.items()
+    }
+    assigned_bytes = {worker_id: 0 for worker_id in weights}
+    assignment: Dict[int, List[str]] = {}
+
+    for load in ordered:
+        size = max(1, load.size)
+        candidates = list(ring.walk(str(load.model_id)))
+        owners = [
+            worker_id for worker_id in candidates
+            if assigned_bytes[worker_id] + size <= capacity[worker_id]
+        ][:replicas[load.model_id]]
+
+        # Модель, которая никуда не помещается, получает владельцев по кольцу без учета нагрузки
+        for worker_id in candidates:
+            if len(owners) >= replicas[load.model_id]:
+                break
+
+            if worker_id not in owners:
+                owners.append(worker_id)
+
+        for worker_id in owners:
+            assigned_bytes[worker_id] += size
+
+        assignment[load.model_id] = owners
+
+    return assignment
@@ -0,0 +1,155 @@
+from typing import Any, BinaryIO, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+INPUT_FORMAT_CSV = "csv"
+INPUT_FORMAT_PARQUET = "parquet"
+INPUT_FORMAT_ARROW = "arrow"
+
+PARQUET_MAGIC = b"PAR1"
+ARROW_FILE_MAGIC = b"ARROW1"
+# Поток Arrow IPC начинается с маркера продолжения сообщения
+ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"
+
+CONTENT_TYPES = {
+    "application/vnd.apache.parquet": INPUT_FORMAT_PARQUET,
+    "application/x-parquet": INPUT_FORMAT_PARQUET,
+    "application/vnd.apache.arrow.file": INPUT_FORMAT_ARROW,
+    "application/vnd.apache.arrow.stream": INPUT_FORMAT_ARROW,
+    "application/x-feather": INPUT_FORMAT_ARROW,
+}
+
+class PredictionInput:
+    """
+    Признаки из входного файла: непрерывный float64 массив в порядке columns.
+    """
+
+    def __init__(self, columns: List[str], values: np.ndarray, input_format: str):
+        self.columns = columns
+        self.values = values
+        self.input_format = input_format
+
+    def __len__(self) -> int:
+        return self.values.shape[0]
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.values, columns=self.columns, copy=False)
+
+def detect_input_format(file: BinaryIO, content_type: Optional[str] = None) -> str:
+    # Сигнатура файла надежнее заголовка: браузеры часто отправляют application/octet-stream
+    head = file.read(len(ARROW_FILE_MAGIC))
+    file.seek(0)
+
+    if head.startswith(PARQUET_MAGIC):
+        return INPUT_FORMAT_PARQUET
+
+    if head.startswith(ARROW_FILE_MAGIC) or head.startswith(ARROW_STREAM_MAGIC):
+        return INPUT_FORMAT_ARROW
+
+    if content_type:
+        return CONTENT_TYPES.get(content_type.split(";")[0].strip().lower(), INPUT_FORMAT_CSV)
+
+    return INPUT_FORMAT_CSV
+
+def select_columns(available: Sequence[str], feature_names: Optional[Sequence[Any]]) -> List[str]:
+    """
+    Колонки в порядке признаков модели. Без имен признаков сохраняется порядок файла.
+    """
+    if feature_names is None:
+        return list(available)
+
+    feature_names = [str(name) for name in feature_names]
+    available = set(available)
+    missing = [name for name in feature_names if name not in available]
+
+    if missing:
+        raise ValueError(f"В файле отсутствуют признаки: {', '.join(missing)}")
+
+    return feature_names
+
+def validate_feature_count(n_columns: int, n_features: Optional[int]) -> None:
+    if n_features is not None and n_columns != n_features:
+        raise ValueError(f"Модель ожидает {n_features} признаков, получено {n_columns}")
+
+def _read_csv(file: BinaryIO, feature_names: Optional[Sequence[Any]]) -> PredictionInput:
+    if feature_names is None:
+        df = pd.read_csv(file)
+        columns = [str(column) for column in df.columns]
+
+        return PredictionInput(columns, np.ascontiguousarray(df.to_numpy(dtype=np.float64)), INPUT_FORMAT_CSV)
+
+    header = [str(column) for column in pd.read_csv(file, nrows=0).columns]
+    file.seek(0)
+
+    columns = select_columns(header, feature_names)
+    positions = pd.Index(header).get_indexer(columns)
+
+    # Разбираются только колонки модели; read_csv возвращает их в порядке файла,
+    # и перестановка в порядок признаков делается одним take по индексам
+    df = pd.read_csv(file, usecols=positions)
+    order = np.argsort(np.argsort(positions))
+    values = np.take(df.to_numpy(dtype=np.float64), order, axis=1)
+
+    return PredictionInput(columns, values, INPUT_FORMAT_CSV)
+
+def _read_arrow_table(file: BinaryIO, input_format: str, feature_names: Optional[Sequence[Any]]) -> Tuple[Any, List[str]]:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+
+    if input_format == INPUT_FORMAT_PARQUET:
+        parquet_file = pq.ParquetFile(file)
+        columns = select_columns(parquet_file.schema_arrow.names, feature_names)
+
+        # Читаются только нужные колонки
+        return parquet_file.read(columns=columns), columns
+
+    head = file.read(len(ARROW_FILE_MAGIC))
+    file.seek(0)
+
+    if head.startswith(ARROW_FILE_MAGIC):
+        table = pa.ipc.open_file(file).read_all()
+    else:
+        table = pa.ipc.open_stream(file).read_all()
+
+    columns = select_columns(table.column_names, feature_names)
+
+    return table.select(columns), columns
+
+def _read_columnar(file: BinaryIO, input_format: str, feature_names: Optional[Sequence[Any]]) -> PredictionInput:
+    import pyarrow as pa
+
+    table, columns = _read_arrow_table(file, input_format, feature_names)
+
+    values = np.empty((table.num_rows, len(columns)), dtype=np.float64)
+
+    # Колонки копируются сразу в итоговый массив, по одному чанку, без промежуточного DataFrame
+    for j, name in enumerate(columns):
+        offset = 0
+
+        for chunk in table.column(name).chunks:
+            if chunk.type != pa.float64():
+                chunk = chunk.cast(pa.float64())
+
+            values[offset:offset + len(chunk), j] = chunk.to_numpy(zero_copy_only=False)
+            offset += len(chunk)
+
+    return PredictionInput(columns, values, input_format)
+
+def read_prediction_input(
+    file: BinaryIO,
+    content_type: Optional[str] = None,
+    feature_names: Optional[Sequence[Any]] = None,
+    n_features: Optional[int] = None,
+) -> PredictionInput:
+    input_format = detect_input_format(file, content_type)
+
+    if input_format == INPUT_FORMAT_CSV:
+        prediction_input = _read_csv(file, feature_names)
+    else:
+        prediction_input = _read_columnar(file, input_format, feature_names)
+
+    validate_feature_count(len(prediction_input.columns), n_features)
+
+    return prediction_input
@@ -0,0 +1,368 @@
+import logging
+import os
+import posixpath
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+from fastapi import HTTPException
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import (
+    PREDICTION_JOBS,
+    PREDICTION_JOBS_RUNNING,
+    SYSTEM_ERRORS,
+    record_prediction_metrics,
+)
+from app.crud.crud_job import (
+    JOB_STATUS_CANCELLED,
+    JOB_STATUS_FAILED,
+    crud_job,
+)
+from app.crud.crud_model import crud_model
+from app.crud.crud_prediction import crud_prediction
+from app.db.session import SessionLocal
+from app.models.models import PredictionJob
+from app.schemas.schemas import PredictionCreate, PredictionUpdate
+from app.services.input_service import read_prediction_input
+from app.services.model_registry import model_registry
+from app.services.model_service import PredictionOutput, concat_prediction_outputs, run_prediction
+from app.services.parallel_scoring import sharded_scorer
+from app.services.result_service import INPUT_EXTENSIONS, delete_prediction_files, store_result_file
+from app.services.storage_service import storage_service
+
+logger = logging.getLogger(__name__)
+
+class JobCancelled(Exception):
+    pass
+
+class JobLeaseLost(Exception):
+    pass
+
+class JobLease:
+    """
+    Продлевает аренду задачи из фонового потока, пока она выполняется.
+
+    heartbeat обновляется каждые interval секунд независимо от того, чем
+    занят обработчик: скачиванием файла, загрузкой модели или расчетом
+    одного большого блока. Если задача перешла к другому обработчику,
+    lost становится True и продление прекращается.
+    """
+
+    def __init__(self, job_id: int, started_at: datetime, interval: float):
+        self.job_id = job_id
+        self.started_at = started_at
+        self.interval = interval
+        self.lost = False
+
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "JobLease":
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"prediction-job-lease-{self.job_id}",
+            daemon=True,
+        )
+        self._thread.start()
+
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stopping.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            # Сессии SQLAlchemy не потокобезопасны, у потока продления своя
+            db = SessionLocal()
+
+            try:
+                if not crud_job.heartbeat(db, job_id=self.job_id, started_at=self.started_at):
+                    self.lost = True
+                    return
+            except Exception as e:
+                logger.error(f"Prediction job {self.job_id} lease renewal failed: {str(e)}")
+            finally:
+                db.close()
+
+def score_in_chunks(
+    loaded_model: Any,
+    X: np.ndarray,
+    output_mode: str,
+    chunk_rows: int,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> PredictionOutput:
+    if not len(X):
+        raise ValueError("Файл не содержит строк")
+
+    outputs: List[PredictionOutput] = []
+
+    for start in range(0, len(X), chunk_rows):
+        outputs.append(run_prediction(loaded_model, X[start:start + chunk_rows], output_mode))
+
+        if on_progress is not None:
+            on_progress(min(start + chunk_rows, len(X)))
+
+    return concat_prediction_outputs(outputs)
+
+def process_job(db: Session, job: PredictionJob, lease: JobLease) -> None:
+    model = crud_model.get(db, id=job.model_id)
+
+    if model is None:
+        raise ValueError("Модель не найдена")
+
+    user = job.user
+    loaded_model = None
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, posixpath.basename(job.input_file_path))
+        storage_service.download_file(job.input_file_path, input_path)
+
+        if model.n_features is None:
+            loaded_model = model_registry.get(model)
+            feature_names = getattr(loaded_model.model, "feature_names_in_", None)
+        else:
+            feature_names = model.feature_names
+
+        with open(input_path, "rb") as f:
+            prediction_input = read_prediction_input(
+                f,
+                INPUT_EXTENSIONS[job.input_format][1],
+                feature_names,
+                model.n_features,
+            )
+
+    rows = len(prediction_input)
+    cost = model.cost_per_prediction * rows
+
+    job.rows_total = rows
+    db.commit()
+
+    if user.credits < cost:
+        raise ValueError("Недостаточно кредитов для выполнения предсказания")
+
+    sharded = job.parallel and sharded_scorer.applies(model, rows)
+
+    if loaded_model is None and not sharded:
+        loaded_model = model_registry.get(model)
+
+    def on_progress(rows_processed: int) -> None:
+        owned = crud_job.update_progress(
+            db,
+            job=job,
+            started_at=lease.started_at,
+            rows_processed=rows_processed,
+        )
+
+        if lease.lost or not owned:
+            raise JobLeaseLost()
+
+        if job.cancel_requested:
+            raise JobCancelled()
+
+    start_time = time.time()
+
+    if sharded:
+        output = sharded_scorer.score(model, prediction_input.values, job.output_mode, on_progress)
+    else:
+        output = score_in_chunks(
+            loaded_model,
+            prediction_input.values,
+            job.output_mode,
+            settings.PREDICTION_JOB_CHUNK_ROWS,
+            on_progress,
+        )
+
+    if lease.lost:
+        raise JobLeaseLost()
+
+    # Результат кладется рядом с входным файлом: predictions/{user_id}/{uuid}/
+    result_object = store_result_file(
+        posixpath.dirname(job.input_file_path),
+        prediction_input,
+        output,
+        job.output_format,
+    )
+    input_object = job.input_file_path if job.store_input else None
+
+    # Входы и результаты лежат в файлах хранилища, в базе только пути к ним
+    prediction = crud_prediction.build(
+        obj_in=PredictionCreate(
+            model_id=model.id,
+            input_data=[],
+            cost=cost,
+            user_id=user.id,
+        ),
+        obj_out=PredictionUpdate(
+            model_id=model.id,
+            input_data=[],
+            cost=cost,
+            prediction_result=[],
+            output_mode=job.output_mode,
+        ),
+        user=user,
+        model=model,
+        input_file_path=input_object,
+        result_file_path=result_object,
+    )
+
+    try:
+        # Списание и запись о предсказании происходят, только если задача все еще наша
+        completed = crud_job.complete(
+            db,
+            job=job,
+            started_at=lease.started_at,
+            prediction=prediction,
+            user=user,
+            cost=cost,
+            result_file_path=result_object,
+            input_file_path=input_object,
+        )
+    except Exception:
+        delete_prediction_files(result_object)
+        raise
+
+    if not completed:
+        delete_prediction_files(result_object)
+        raise JobLeaseLost()
+
+    record_prediction_metrics(model, user, rows, time.time() - start_time)
+
+    if not job.store_input:
+        delete_prediction_files(job.input_file_path)
+
+class PredictionJobRunner:
+    """
+    Пул потоков, разбирающий очередь задач из таблицы prediction_jobs.
+
+    Очередь живет в Postgres: задачи забираются через SELECT ... FOR UPDATE
+    SKIP LOCKED, поэтому несколько процессов сервиса могут работать с ней
+    одновременно. Новая задача будит пул текущего процесса сразу, остальные
+    процессы замечают ее при очередном опросе.
+    """
+
+    def __init__(self, workers: int, poll_interval: float, lease_timeout: float):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+
+        self._threads: List[threading.Thread] = []
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+
+        self._stopping.clear()
+
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run,
+                name=f"prediction-job-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+
+        for thread in self._threads:
+            thread.join(timeout)
+
+        self._threads = []
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"Prediction job worker error: {str(e)}")
+                processed = False
+
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def run_once(self) -> bool:
+        db = SessionLocal()
+
+        try:
+            crud_job.requeue_stale(db, lease_timeout=self.lease_timeout)
+            job = crud_job.claim_next(db)
+
+            if job is None:
+                return False
+
+            self._execute(db, job)
+
+            return True
+        finally:
+            db.close()
+
+    def _execute(self, db: Session, job: PredictionJob) -> None:
+        PREDICTION_JOBS_RUNNING.inc()
+
+        # Аренда продлевается втрое чаще, чем истекает
+        lease = JobLease(job.id, job.started_at, self.lease_timeout / 3)
+        lost = False
+
+        try:
+            with lease:
+                process_job(db, job, lease)
+        except JobLeaseLost:
+            db.rollback()
+            lost = True
+
+            logger.warning(f"Prediction job {job.id} was taken over by another worker")
+        except JobCancelled:
+            db.rollback()
+
+            cancelled = crud_job.finish(
+                db,
+                job=job,
+                started_at=lease.started_at,
+                status=JOB_STATUS_CANCELLED,
+                input_file_path=job.input_file_path if job.store_input else None,
+            )
+
+            if cancelled and not job.store_input:
+                delete_prediction_files(job.input_file_path)
+        except Exception as e:
+            db.rollback()
+
+            logger.error(f"Prediction job {job.id} failed: {str(e)}")
+            SYSTEM_ERRORS.labels(error_type="prediction_job_error").inc()
+
+            crud_job.finish(
+                db,
+                job=job,
+                started_at=lease.started_at,
+                status=JOB_STATUS_FAILED,
+                error=e.detail if isinstance(e, HTTPException) else str(e),
+                input_file_path=job.input_file_path,
+            )
+        finally:
+            PREDICTION_JOBS_RUNNING.dec()
+
+            # Задачу, перешедшую к другому обработчику, учтет он
+            if not lost:
+                PREDICTION_JOBS.labels(status=job.status).inc()
+
+prediction_job_runner = PredictionJobRunner(
+    workers=settings.PREDICTION_JOB_WORKERS,
+    poll_interval=settings.PREDICTION_JOB_POLL_INTERVAL,
+    lease_timeout=settings.PREDICTION_JOB_LEASE_TIMEOUT,
+)
@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import MODEL_ALIAS_SWAPS
+from app.crud.crud_alias import crud_alias
+from app.crud.crud_model import crud_model
+from app.db.session import SessionLocal
+from app.models.models import MLModel, ModelAlias
+from app.services.affinity import affinity_router
+from app.services.model_registry import model_registry
+from app.services.model_service import run_prediction
+
+logger = logging.getLogger(__name__)
+
+def warm_model(model: MLModel) -> None:
+    """
+    Загружает модель, затем делает пробное предсказание, чтобы первый
+    запрос не платил за ленивую инициализацию.
+
+    Модель не закрепляется: текущие версии вытесняются по LRU, как любые
+    другие, иначе при большом числе имен лимиты кэша перестали бы действовать.
+    """
+    entry = model_registry.get(model)
+
+    if not model.n_features:
+        return
+
+    X = np.zeros((1, model.n_features), dtype=model.input_dtype or np.float64)
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            run_prediction(entry, X)
+    except Exception as e:
+        # Модель загружена, а нулевой вход допустим не для всех моделей
+        logger.warning(f"Warm-up prediction for model {model.id} failed: {str(e)}")
+
+class ModelAliasManager:
+    """
+    Текущие версии моделей по имени в памяти воркера.
+
+    Воркер раз в refresh_interval читает таблицу model_aliases. Новую
+    версию он сначала загружает и прогревает и только потом переключает
+    имя на нее, поэтому запросы по имени не попадают на холодную загрузку.
+    Прежняя версия, если она в памяти, остается закрепленной еще
+    drain_seconds, чтобы запросы, которые уже выбрали ее, не загружали ее
+    заново. Других закреплений нет, поэтому число закрепленных версий
+    ограничено переключениями за drain_seconds.
+    """
+
+    def __init__(self, refresh_interval: float, drain_seconds: float):
+        self.refresh_interval = refresh_interval
+        self.drain_seconds = drain_seconds
+
+        self._current: Dict[str, int] = {}
+        self._versions: Dict[str, int] = {}
+        self._failed: Dict[str, int] = {}
+        self._draining: List[Tuple[float, int]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._stopping.clear()
+
+        # Воркер начинает принимать запросы с уже прогретыми текущими версиями
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Model alias refresh failed: {str(e)}")
+
+        self._thread = threading.Thread(target=self._run, name="model-aliases", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(self.refresh_interval)
+        self._thread = None
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.refresh_interval)
+            self._wakeup.clear()
+
+            if self._stopping.is_set():
+                return
+
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Model alias refresh failed: {str(e)}")
+
+    def refresh(self) -> None:
+        db = SessionLocal()
+
+        try:
+            for alias in crud_alias.get_all(db):
+                if self._versions.get(alias.name) == alias.version or self._failed.get(alias.name) == alias.version:
+                    continue
+
+                self._activate(db, alias)
+        finally:
+            db.close()
+
+        self._release_drained()
+
+    def _activate(self, db: Session, alias: ModelAlias) -> None:
+        model = crud_model.get(db, id=alias.model_id)
+
+        if model is None:
+            self._failed[alias.name] = alias.version
+            MODEL_ALIAS_SWAPS.labels(status="failed").inc()
+            return
+
+        # При маршрутизации по моделям версию прогревают только ее владельцы
+        if affinity_router.is_local(model.id):
+            try:
+                warm_model(model)
+            except Exception as e:
+                logger.error(f"Model alias {alias.name} warm-up of model {model.id} failed: {str(e)}")
+                # Имя продолжает указывать на прежнюю версию, попытка повторится после нового продвижения
+                self._failed[alias.name] = alias.version
+                MODEL_ALIAS_SWAPS.labels(status="failed").inc()
+                return
+
+        with self._lock:
+            previous = self._current.get(alias.name)
+            self._current[alias.name] = model.id
+            self._versions[alias.name] = alias.version
+
+            # Закрепление, сделанное не здесь (например, администратором), не снимается по истечении срока
+            if previous is not None and previous != model.id and model_registry.pin_resident(previous):
+                self._draining.append((time.monotonic() + self.drain_seconds, previous))
+
+        self._failed.pop(alias.name, None)
+        MODEL_ALIAS_SWAPS.labels(status="success").inc()
+        logger.info(f"Model alias {alias.name} switched to model {model.id} (version {alias.version})")
+
+    def _release_drained(self) -> None:
+        now = time.monotonic()
+
+        with self._lock:
+            expired = [model_id for deadline, model_id in self._draining if deadline <= now]
+            self._draining = [(deadline, model_id) for deadline, model_id in self._draining if deadline > now]
+
+        for model_id in expired:
+            model_registry.unpin(model_id)
+
+    def current(self, name: str) -> Optional[int]:
+        with self._lock:
+            return self._current.get(name)
+
+    def resolve(self, db: Session, name: str) -> Optional[int]:
+        """
+        Id модели, которую обслуживает имя на этом воркере.
+
+        Если воркер еще не видел имя (например, оно только что создано),
+        берется версия из базы.
+        """
+        model_id = self.current(name)
+
+        if model_id is not None:
+            return model_id
+
+        alias = crud_alias.get_by_name(db, name=name)
+
+        return alias.model_id if alias is not None else None
+
+model_alias_manager = ModelAliasManager(
+    refresh_interval=settings.MODEL_ALIAS_REFRESH_INTERVAL,
+    drain_seconds=settings.MODEL_ALIAS_DRAIN_SECONDS,
+)
@@ -0,0 +1,105 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.crud.crud_catalog import CATALOG_KEY, crud_catalog
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+class ModelCatalogVersions:
+    """
+    Версии каталога моделей в памяти воркера.
+
+    Из них строятся ETag и Last-Modified для GET /models/ и
+    GET /models/{id}, поэтому условный запрос с актуальной версией получает
+    304 без обращения к базе. Счетчики хранятся в таблице catalog_versions
+    и увеличиваются в одной транзакции с созданием и удалением модели.
+    Воркер раз в refresh_interval читает счетчик всего каталога и
+    перечитывает остальные, только если тот изменился.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+
+        self._versions: Dict[str, Tuple[int, datetime]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+
+        self._stopping.clear()
+
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Model catalog refresh failed: {str(e)}")
+
+        self._thread = threading.Thread(target=self._run, name="model-catalog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+        self._wakeup.set()
+        self._thread.join(self.refresh_interval)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.refresh_interval)
+            self._wakeup.clear()
+
+            if self._stopping.is_set():
+                return
+
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Model catalog refresh failed: {str(e)}")
+
+    def refresh(self) -> None:
+        db = SessionLocal()
+
+        try:
+            catalog = crud_catalog.get(db, name=CATALOG_KEY)
+
+            if self._loaded and catalog is not None and self.get(CATALOG_KEY) == (catalog.version, catalog.updated_at):
+                return
+
+            versions = {row.name: (row.version, row.updated_at) for row in crud_catalog.get_all(db)}
+        finally:
+            db.close()
+
+        with self._lock:
+            self._versions = versions
+            self._loaded = True
+
+    def changed(self) -> None:
+        # После изменения каталога этим воркером: его следующие ответы сразу получают новую версию
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.error(f"Model catalog refresh failed: {str(e)}")
+
+    def get(self, name: str) -> Optional[Tuple[int, datetime]]:
+        """
+        Версия и время изменения ресурса или None, если воркер их не знает:
+        тогда запрос обслуживается из базы без валидаторов.
+        """
+        with self._lock:
+            if not self._loaded:
+                return None
+
+            return self._versions.get(name)
+
+model_catalog = ModelCatalogVersions(refresh_interval=settings.MODEL_CATALOG_REFRESH_INTERVAL)
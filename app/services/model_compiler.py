@@ -0,0 +1,258 @@
+import logging
+from typing import Any, Optional
+
+import numpy as np
+from scipy.special import expit
+from sklearn.ensemble import (
+    ExtraTreesClassifier,
+    ExtraTreesRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+from sklearn.linear_model import ElasticNet, Lasso, LinearRegression, LogisticRegression, Ridge
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+from sklearn.utils.extmath import softmax
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_ENGINE_NATIVE = "native"
+INFERENCE_ENGINE_COMPILED = "compiled"
+
+TREE_CLASSIFIERS = (RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)
+TREE_REGRESSORS = (RandomForestRegressor, ExtraTreesRegressor, DecisionTreeRegressor)
+LINEAR_REGRESSORS = (LinearRegression, Ridge, Lasso, ElasticNet)
+
+# Векторный обход выгоднее sklearn, пока строки x деревья x глубина не превышают этот объем.
+# На больших батчах цикл sklearn на Cython быстрее, и вызов уходит в исходную модель.
+TREE_MAX_STEPS = 512 * 1024
+
+VERIFICATION_ROWS = 512
+
+class CompiledModel:
+    """
+    Модель, сведенная к плоским numpy массивам.
+
+    Повторяет арифметику sklearn, но без проверки входа и диспетчеризации по
+    отдельным деревьям. Вход, который не прошел бы быстрый путь (NaN, inf,
+    другая ширина), отклоняется через accepts, и вызывающий использует
+    исходную модель.
+    """
+
+    n_features_in_: int
+
+    def accepts(self, X: Any) -> bool:
+        return (
+            isinstance(X, np.ndarray)
+            and X.ndim == 2
+            and X.shape[1] == self.n_features_in_
+            and X.dtype.kind in "fiu"
+            and bool(np.isfinite(X).all())
+        )
+
+class CompiledTreeEnsemble(CompiledModel):
+    def __init__(self, model: Any):
+        estimators = getattr(model, "estimators_", [model])
+        trees = [estimator.tree_ for estimator in estimators]
+
+        self.n_features_in_ = model.n_features_in_
+        self.n_trees = len(trees)
+        self.is_classifier = isinstance(model, TREE_CLASSIFIERS)
+        self.classes_ = getattr(model, "classes_", None)
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        self.roots = offsets[:-1].astype(np.intp)
+
+        left = np.concatenate([tree.children_left for tree in trees]).astype(np.intp)
+        right = np.concatenate([tree.children_right for tree in trees]).astype(np.intp)
+
+        for tree_index in range(self.n_trees):
+            block = slice(offsets[tree_index], offsets[tree_index + 1])
+            left[block][left[block] >= 0] += offsets[tree_index]
+            right[block][right[block] >= 0] += offsets[tree_index]
+
+        # Листья ссылаются сами на себя: фиксированное число шагов обхода для всех строк
+        is_leaf = left < 0
+        nodes = np.arange(len(left), dtype=np.intp)
+        left[is_leaf] = nodes[is_leaf]
+        right[is_leaf] = nodes[is_leaf]
+
+        feature = np.concatenate([tree.feature for tree in trees]).astype(np.intp)
+        feature[is_leaf] = 0
+
+        # children[2 * node] - левый потомок, children[2 * node + 1] - правый
+        self.children = np.stack([left, right], axis=1).ravel()
+        self.feature = feature
+        self.threshold = np.concatenate([tree.threshold for tree in trees])
+        self.max_depth = max(tree.max_depth for tree in trees)
+
+        if self.is_classifier:
+            n_classes = len(self.classes_)
+            self.value = np.concatenate([tree.value[:, 0, :n_classes] for tree in trees])
+        else:
+            self.value = np.concatenate([tree.value[:, :, 0] for tree in trees])
+
+        self.n_outputs = model.n_outputs_
+
+    def accepts(self, X: Any) -> bool:
+        if not super().accepts(X):
+            return False
+
+        return X.shape[0] * self.n_trees * max(1, self.max_depth) <= TREE_MAX_STEPS
+
+    def _leaves(self, X: np.ndarray) -> np.ndarray:
+        # Как и sklearn, сравниваем float32 признаки с float64 порогами
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        flat = X.ravel()
+        row_offsets = np.arange(X.shape[0], dtype=np.intp) * X.shape[1]
+        nodes = np.repeat(self.roots[:, None], X.shape[0], axis=1)
+
+        for _ in range(self.max_depth):
+            go_right = flat[row_offsets + self.feature[nodes]] > self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_right]
+
+        return nodes
+
+    def _sum_values(self, X: np.ndarray) -> np.ndarray:
+        out = np.zeros((X.shape[0], self.value.shape[1]), dtype=np.float64)
+
+        # Суммирование по деревьям в том же порядке, что и в sklearn
+        for tree_leaves in self._leaves(X):
+            out += self.value[tree_leaves]
+
+        if self.n_trees > 1:
+            out /= self.n_trees
+
+        return out
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return self._sum_values(X)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        values = self._sum_values(X)
+
+        if self.is_classifier:
+            return self.classes_.take(np.argmax(values, axis=1), axis=0)
+
+        if self.n_outputs == 1:
+            return values[:, 0]
+
+        return values
+
+class CompiledLinearModel(CompiledModel):
+    def __init__(self, model: Any):
+        self.n_features_in_ = model.n_features_in_
+        self.coef_ = np.asarray(model.coef_, dtype=np.float64)
+        self.intercept_ = model.intercept_
+        self.is_classifier = isinstance(model, LogisticRegression)
+        self.classes_ = getattr(model, "classes_", None)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        scores = X @ self.coef_.T + self.intercept_
+
+        if self.is_classifier and scores.ndim == 2 and scores.shape[1] == 1:
+            return scores.reshape(-1)
+
+        return scores
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        decision = self.decision_function(X)
+
+        if decision.ndim == 1:
+            prob = expit(decision)
+            return np.vstack([1 - prob, prob]).T
+
+        return softmax(decision, copy=False)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        scores = self.decision_function(X)
+
+        if not self.is_classifier:
+            return scores
+
+        if scores.ndim == 1:
+            indices = (scores > 0).astype(int)
+        else:
+            indices = scores.argmax(axis=1)
+
+        return self.classes_[indices]
+
+def _supported(model: Any) -> Optional[type]:
+    if not hasattr(model, "n_features_in_"):
+        return None
+
+    if isinstance(model, TREE_CLASSIFIERS):
+        # Многовыходные классификаторы возвращают список массивов, их не компилируем
+        return CompiledTreeEnsemble if model.n_outputs_ == 1 else None
+
+    if isinstance(model, TREE_REGRESSORS):
+        return CompiledTreeEnsemble
+
+    if isinstance(model, LINEAR_REGRESSORS):
+        return CompiledLinearModel
+
+    if isinstance(model, LogisticRegression):
+        # ovr-нормализация старых версий sklearn не повторяется
+        if getattr(model, "multi_class", "auto") == "ovr" and len(model.classes_) > 2:
+            return None
+
+        return CompiledLinearModel
+
+    return None
+
+def compile_model(model: Any) -> Optional[CompiledModel]:
+    compiled_class = _supported(model)
+
+    if compiled_class is None:
+        return None
+
+    return compiled_class(model)
+
+def _verification_sample(compiled: CompiledModel) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    n_features = compiled.n_features_in_
+
+    X = rng.normal(scale=3.0, size=(VERIFICATION_ROWS, n_features))
+
+    if isinstance(compiled, CompiledTreeEnsemble):
+        # Значения ровно на порогах проверяют границу сравнения <=
+        split = compiled.children[::2] != np.arange(len(compiled.feature))
+
+        for j in range(n_features):
+            thresholds = compiled.threshold[split & (compiled.feature == j)]
+
+            if len(thresholds):
+                X[: VERIFICATION_ROWS // 2, j] = rng.choice(thresholds, size=VERIFICATION_ROWS // 2)
+
+    return X
+
+def verify_compiled_model(model: Any, compiled: CompiledModel, rtol: float = 1e-9, atol: float = 1e-12) -> bool:
+    X = _verification_sample(compiled)
+
+    expected = model.predict(X)
+    actual = compiled.predict(X)
+
+    if expected.dtype.kind in "fc":
+        if not np.allclose(expected, actual, rtol=rtol, atol=atol):
+            return False
+    elif not np.array_equal(expected, actual):
+        return False
+
+    if hasattr(model, "predict_proba") and getattr(compiled, "is_classifier", False):
+        if not np.allclose(model.predict_proba(X), compiled.predict_proba(X), rtol=rtol, atol=atol):
+            return False
+
+    return True
+
+def select_inference_engine(model: Any) -> str:
+    """
+    Компилирует модель и сверяет результат с исходной. При расхождении остается исходная модель.
+    """
+    try:
+        compiled = compile_model(model)
+
+        if compiled is not None and verify_compiled_model(model, compiled):
+            return INFERENCE_ENGINE_COMPILED
+    except Exception as e:
+        logger.warning("Model compilation failed: %s", e)
+
+    return INFERENCE_ENGINE_NATIVE
@@ -0,0 +1,321 @@
+import io
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import joblib
+
+from app.core.config import settings
+from app.core.metrics import (
+    MODEL_LOAD_TIME,
+    MODEL_MEMORY_BYTES,
+    MODEL_PREDICT_CALLS,
+    MODEL_PREDICT_ROWS,
+    MODEL_PREDICT_CPU_SECONDS,
+    MODEL_RESIDENT,
+    MODEL_RESIDENT_BYTES,
+    MODEL_CACHE_EVENTS,
+)
+from app.models.models import MLModel
+from app.services.model_compiler import CompiledModel, INFERENCE_ENGINE_COMPILED, INFERENCE_ENGINE_NATIVE, compile_model
+from app.services.model_service import estimate_memory_footprint, fetch_artifact
+from app.services.single_flight import SingleFlight
+from app.services.storage_service import storage_service
+from app.services.thread_policy import thread_policy
+
+def artifact_key(model: MLModel) -> str:
+    # Модели, загруженные до появления контентной адресации, идентифицируются путем в хранилище
+    return model.artifact_sha256 or model.model_path
+
+class LoadedModel:
+    def __init__(
+        self,
+        key: str,
+        model_name: str,
+        model: Any,
+        memory_bytes: int,
+        load_time: float,
+        engine: Optional[CompiledModel] = None,
+        threads: Optional[int] = None,
+    ):
+        self.key = key
+        self.model_name = model_name
+        self.model = model
+        self.engine = engine
+        self.threads = threads
+        self.memory_bytes = memory_bytes
+        self.load_time = load_time
+        self.loaded_at = datetime.utcnow()
+        self.last_used_at = self.loaded_at
+        self.pinned = False
+
+        self.predict_calls = 0
+        self.predict_rows = 0
+        self.predict_cpu_time = 0.0
+
+        self._model_ids = set()
+        self._lock = threading.Lock()
+
+    @property
+    def artifact(self) -> str:
+        return self.key
+
+    @property
+    def model_ids(self) -> List[int]:
+        return sorted(self._model_ids)
+
+    @property
+    def labels(self) -> dict:
+        return {"artifact": self.key[:16], "model_name": self.model_name}
+
+    @property
+    def inference_engine(self) -> str:
+        return INFERENCE_ENGINE_COMPILED if self.engine is not None else INFERENCE_ENGINE_NATIVE
+
+    @property
+    def cpu_time_per_row(self) -> float:
+        if not self.predict_rows:
+            return 0.0
+
+        return self.predict_cpu_time / self.predict_rows
+
+    def predict(self, X: Any) -> Any:
+        if self.engine is not None and self.engine.accepts(X):
+            return self._call(self.engine.predict, X)
+
+        return self._call(self.model.predict, X)
+
+    def predict_proba(self, X: Any) -> Any:
+        if self.engine is not None and self.engine.is_classifier and self.engine.accepts(X):
+            return self._call(self.engine.predict_proba, X)
+
+        return self._call(self.model.predict_proba, X)
+
+    def _call(self, method: Any, X: Any) -> Any:
+        # thread_time учитывает только текущий поток: нативные потоки BLAS/joblib не попадают в оценку
+        cpu_start = time.thread_time()
+
+        with thread_policy.limit(self.threads):
+            result = method(X)
+
+        cpu_time = time.thread_time() - cpu_start
+
+        rows = len(X)
+
+        with self._lock:
+            self.predict_calls += 1
+            self.predict_rows += rows
+            self.predict_cpu_time += cpu_time
+            self.last_used_at = datetime.utcnow()
+
+        MODEL_PREDICT_CALLS.labels(**self.labels).inc()
+        MODEL_PREDICT_ROWS.labels(**self.labels).inc(rows)
+        MODEL_PREDICT_CPU_SECONDS.labels(**self.labels).inc(cpu_time)
+
+        return result
+
+class ModelRegistry:
+    """
+    Кэш десериализованных моделей в памяти процесса.
+
+    Вытесняет давно не использованные модели при превышении лимитов по
+    количеству или суммарному объему. Закрепленные модели не вытесняются.
+    """
+
+    def __init__(self, max_models: int, max_bytes: int):
+        self.max_models = max_models
+        self.max_bytes = max_bytes
+
+        self._entries: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._model_keys: Dict[int, str] = {}
+        self._lock = threading.RLock()
+        self._loads = SingleFlight()
+
+    def get(self, model: MLModel) -> LoadedModel:
+        key = artifact_key(model)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._attach(entry, model)
+                MODEL_CACHE_EVENTS.labels(event="hit").inc()
+
+                return entry
+
+        # Одновременные промахи по одному артефакту ждут одну загрузку и разделяют ее ошибку
+        entry, shared = self._loads.do(key, lambda: self._load_entry(model, key))
+
+        MODEL_CACHE_EVENTS.labels(event="coalesced" if shared else "miss").inc()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+            self._attach(entry, model)
+
+            return entry
+
+    def _load_entry(self, model: MLModel, key: str) -> LoadedModel:
+        loaded = self._load(model, key)
+
+        # Запись попадает в кэш до завершения single-flight, иначе новый промах начал бы вторую загрузку
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                entry = loaded
+                self._entries[key] = entry
+                MODEL_MEMORY_BYTES.labels(**entry.labels).set(entry.memory_bytes)
+
+            self._entries.move_to_end(key)
+            self._attach(entry, model)
+            self._enforce_limits(keep=key)
+
+            return entry
+
+    def _attach(self, entry: LoadedModel, model: MLModel) -> None:
+        threads = thread_policy.threads_for(model.inference_threads)
+
+        # Один артефакт могут использовать модели с разной политикой потоков: действует последняя
+        if threads != entry.threads:
+            thread_policy.apply(entry.model, threads)
+            entry.threads = threads
+
+        entry._model_ids.add(model.id)
+        self._model_keys[model.id] = entry.key
+
+    def _load(self, model: MLModel, key: str) -> LoadedModel:
+        load_start = time.perf_counter()
+
+        if model.artifact_sha256:
+            ml_model = joblib.load(fetch_artifact(model.model_path))
+        else:
+            model_data = storage_service.load_model(model.model_path)
+            ml_model = joblib.load(io.BytesIO(model_data))
+
+        # Компиляция проверена при загрузке артефакта, здесь только строятся массивы
+        engine = None
+
+        if model.inference_engine == INFERENCE_ENGINE_COMPILED and settings.MODEL_COMPILATION_ENABLED:
+            engine = compile_model(ml_model)
+
+        threads = thread_policy.threads_for(model.inference_threads)
+        thread_policy.apply(ml_model, threads)
+        thread_policy.configure_process()
+
+        load_time = time.perf_counter() - load_start
+        MODEL_LOAD_TIME.labels(model_name=model.name).observe(load_time)
+
+        return LoadedModel(
+            key=key,
+            model_name=model.name,
+            model=ml_model,
+            memory_bytes=estimate_memory_footprint((ml_model, engine)),
+            load_time=load_time,
+            engine=engine,
+            threads=threads,
+        )
+
+    def _entry_for(self, model_id: int) -> Optional[LoadedModel]:
+        key = self._model_keys.get(model_id)
+
+        if key is None:
+            return None
+
+        return self._entries.get(key)
+
+    def peek(self, model_id: int) -> Optional[LoadedModel]:
+        with self._lock:
+            return self._entry_for(model_id)
+
+    def resident(self) -> List[LoadedModel]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def pin(self, model: MLModel) -> LoadedModel:
+        entry = self.get(model)
+        entry.pinned = True
+
+        return entry
+
+    def pin_resident(self, model_id: int) -> bool:
+        """
+        Закрепляет модель, только если она уже в памяти, не загружая ее.
+
+        Возвращает True, если закрепление сделано этим вызовом: снимать его
+        должен тот же вызывающий код.
+        """
+        with self._lock:
+            entry = self._entry_for(model_id)
+
+            if entry is None or entry.pinned:
+                return False
+
+            entry.pinned = True
+
+            return True
+
+    def unpin(self, model_id: int) -> Optional[LoadedModel]:
+        with self._lock:
+            entry = self._entry_for(model_id)
+
+            if entry is not None:
+                entry.pinned = False
+                self._enforce_limits()
+
+            return entry
+
+    def evict(self, model_id: int) -> Optional[LoadedModel]:
+        with self._lock:
+            entry = self._entry_for(model_id)
+
+            if entry is not None:
+                del self._entries[entry.key]
+                self._forget(entry)
+
+            return entry
+
+    def _forget(self, entry: LoadedModel) -> None:
+        MODEL_CACHE_EVENTS.labels(event="eviction").inc()
+
+        for model_id in entry.model_ids:
+            self._model_keys.pop(model_id, None)
+
+        for metric in (MODEL_MEMORY_BYTES, MODEL_PREDICT_CALLS, MODEL_PREDICT_ROWS, MODEL_PREDICT_CPU_SECONDS):
+            try:
+                metric.remove(*entry.labels.values())
+            except KeyError:
+                pass
+
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        MODEL_RESIDENT.set(len(self._entries))
+        MODEL_RESIDENT_BYTES.set(sum(entry.memory_bytes for entry in self._entries.values()))
+
+    def _enforce_limits(self, keep: Optional[str] = None) -> None:
+        total_bytes = sum(entry.memory_bytes for entry in self._entries.values())
+
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_models and total_bytes <= self.max_bytes:
+                break
+
+            entry = self._entries[key]
+
+            if entry.pinned or key == keep:
+                continue
+
+            del self._entries[key]
+            total_bytes -= entry.memory_bytes
+            self._forget(entry)
+
+        self._update_gauges()
+
+model_registry = ModelRegistry(
+    max_models=settings.MODEL_CACHE_MAX_MODELS,
+    max_bytes=settings.MODEL_CACHE_MAX_BYTES,
+)
@@ -1,70 +1,639 @@
 import os
-import io
+import sys
+import logging
+import hashlib
+import tempfile
+import threading
+import time
+import warnings
 import joblib
-from typing import Tuple, Any, List
+from collections import OrderedDict
+from typing import Tuple, Any, Callable, List, Optional
 
 import numpy as np
 
-from fastapi import HTTPException
+from fastapi import HTTPException, UploadFile
+
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.models.models import User
+from app.crud.crud_artifact import crud_artifact
+from app.models.models import ModelArtifact
+from app.schemas.schemas import ModelArtifactCreate
+from app.services.model_compiler import (
+    INFERENCE_ENGINE_COMPILED,
+    INFERENCE_ENGINE_NATIVE,
+    compile_model,
+    select_inference_engine,
+)
+from app.services.single_flight import SingleFlight
 from app.services.storage_service import storage_service
 
-MODELS_DIR = os.path.join(settings.BASE_DIR, "models")
+logger = logging.getLogger(__name__)
+
+MODELS_DIR = str(settings.MODEL_CACHE_DIR)
 os.makedirs(MODELS_DIR, exist_ok=True)
 
-def save_model(model_data: bytes, user: User, model_name: str, version: str) -> str:
-    try:
-        object_name = f"models/{user.id}/{model_name}_{version}.joblib"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-        storage_service.save_model(
-            model_data=model_data,
-            user_id=user.id,
-            model_name=model_name,
-            version=version
-        )
+MODEL_COMPRESSION_ORIGINAL = "original"
 
-        return object_name
-    except Exception as e:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Ошибка при сохранении модели: {str(e)}"
-        )
+class ModelUpload:
+    """
+    Загруженный файл модели, сохраненный во временный файл на диске.
+    """
+
+    def __init__(self, path: str, sha256: str, size: int):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+
+    def cleanup(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+async def spool_model_upload(model_file: UploadFile) -> ModelUpload:
+    digest = hashlib.sha256()
+    size = 0
+
+    with tempfile.NamedTemporaryFile(prefix="model_", suffix=".joblib", delete=False) as spool:
+        try:
+            while True:
+                chunk = await model_file.read(UPLOAD_CHUNK_SIZE)
+
+                if not chunk:
+                    break
+
+                digest.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+        except Exception:
+            os.unlink(spool.name)
+            raise
+
+    return ModelUpload(path=spool.name, sha256=digest.hexdigest(), size=size)
+
+def artifact_object_name(sha256: str) -> str:
+    return f"artifacts/{sha256[:2]}/{sha256}.joblib"
+
+def artifact_digest(object_name: str) -> str:
+    return os.path.basename(object_name)[:-len(".joblib")]
+
+def artifact_cache_path(sha256: str) -> str:
+    return os.path.join(MODELS_DIR, f"{sha256}.joblib")
+
+def _file_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+def _prune_artifact_cache(keep: str) -> None:
+    entries = []
+
+    for entry in os.scandir(MODELS_DIR):
+        if entry.is_file() and entry.name.endswith(".joblib"):
+            stat = entry.stat()
+            entries.append((stat.st_atime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, path in sorted(entries):
+        if total <= settings.MODEL_DISK_CACHE_MAX_BYTES:
+            break
+
+        if path == keep:
+            continue
+
+        try:
+            os.unlink(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+_artifact_fetches = SingleFlight()
+
+def fetch_artifact(object_name: str) -> str:
+    """
+    Возвращает путь к локальной копии артефакта, скачивая его из хранилища при необходимости.
+
+    Одновременные запросы одного артефакта в процессе ждут одно скачивание.
+    """
+    sha256 = artifact_digest(object_name)
+    path = artifact_cache_path(sha256)
+
+    if os.path.exists(path):
+        return path
+
+    path, _ = _artifact_fetches.do(sha256, lambda: _download_artifact(object_name, sha256, path))
+
+    return path
+
+def _download_artifact(object_name: str, sha256: str, path: str) -> str:
+    # Пока этот поток ждал, артефакт мог скачать предыдущий вызов
+    if os.path.exists(path):
+        return path
+
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{sha256}.", suffix=".part", dir=MODELS_DIR)
+    os.close(fd)
 
-def load_model(model_data: bytes) -> Tuple[Any, float]:
     try:
-        model = joblib.load(io.BytesIO(model_data))
+        storage_service.download_model(object_name, tmp_path)
 
-        if not hasattr(model, 'predict'):
+        if _file_sha256(tmp_path) != sha256:
             raise HTTPException(
-                status_code=400,
-                detail="Неподдерживаемый тип модели. Модель должна иметь метод predict"
+                status_code=500,
+                detail="Контрольная сумма артефакта модели не совпадает"
             )
 
-        model_size = len(model_data)
-        cost = max(0.1, model_size / (1024 * 1024))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    _prune_artifact_cache(keep=path)
+
+    return path
 
-        return model, cost
+def save_model(model_upload: ModelUpload) -> str:
+    try:
+        return storage_service.save_model(
+            file_path=model_upload.path,
+            object_name=artifact_object_name(model_upload.sha256),
+        )
     except Exception as e:
         raise HTTPException(
             status_code=400,
-            detail=f"Ошибка при загрузке модели: {str(e)}"
+            detail=f"Ошибка при сохранении модели: {str(e)}"
         )
 
-def make_prediction(model: Any, input_data: List[float]) -> dict:
+def load_model(model_upload: ModelUpload) -> Tuple[Any, float]:
+    load_start = time.perf_counter()
+
     try:
-        X = np.array(input_data).reshape(1, -1)
-        prediction = model.predict(X)[0]
-
-        result = {"prediction": float(prediction)}
-        if hasattr(model, 'predict_proba'):
-            probabilities = model.predict_proba(X)[0]
-            result["probabilities"] = probabilities.tolist()
-            
-        return result
+        model = joblib.load(model_upload.path)
     except Exception as e:
         raise HTTPException(
             status_code=400,
-            detail=f"Ошибка при выполнении предсказания: {str(e)}"
+            detail=f"Ошибка при загрузке модели: {str(e)}"
+        )
+
+    if not hasattr(model, 'predict'):
+        raise HTTPException(
+            status_code=400,
+            detail="Неподдерживаемый тип модели. Модель должна иметь метод predict"
+        )
+
+    return model, time.perf_counter() - load_start
+
+def resolve_compression() -> str:
+    codec = settings.MODEL_COMPRESSION
+
+    if codec == "lz4":
+        try:
+            import lz4.frame  # noqa: F401
+        except ImportError:
+            logger.warning("lz4 is not installed, falling back to zlib compression")
+            return "zlib"
+
+    return codec
+
+def recompress_model(model: Any, codec: str, level: int) -> ModelUpload:
+    fd, path = tempfile.mkstemp(prefix="model_", suffix=".joblib")
+    os.close(fd)
+
+    try:
+        joblib.dump(model, path, compress=0 if codec == "none" else (codec, level))
+    except Exception:
+        os.unlink(path)
+        raise
+
+    return ModelUpload(path=path, sha256=_file_sha256(path), size=os.path.getsize(path))
+
+class FeatureSchema:
+    """
+    Описание входа и выхода модели: число и имена признаков, тип, к которому
+    модель приводит вход, и классы.
+    """
+
+    def __init__(
+        self,
+        n_features: Optional[int] = None,
+        feature_names: Optional[List[str]] = None,
+        input_dtype: Optional[str] = None,
+        classes: Optional[list] = None,
+    ):
+        self.n_features = n_features
+        self.feature_names = feature_names
+        self.input_dtype = input_dtype
+        self.classes = classes
+
+def _input_dtype(model: Any) -> str:
+    from sklearn.ensemble import BaseEnsemble
+    from sklearn.tree import BaseDecisionTree
+
+    # Деревья sklearn сравнивают признаки в float32, остальные оценщики работают в float64
+    estimator = getattr(model, "steps", [(None, model)])[0][1]
+
+    return "float32" if isinstance(estimator, (BaseDecisionTree, BaseEnsemble)) else "float64"
+
+def extract_feature_schema(model: Any) -> FeatureSchema:
+    n_features = getattr(model, "n_features_in_", None)
+    feature_names = getattr(model, "feature_names_in_", None)
+    classes = getattr(model, "classes_", None)
+
+    if isinstance(classes, list):
+        classes = [np.asarray(output_classes).tolist() for output_classes in classes]
+    elif classes is not None:
+        classes = np.asarray(classes).tolist()
+
+    return FeatureSchema(
+        n_features=None if n_features is None else int(n_features),
+        feature_names=None if feature_names is None else [str(name) for name in feature_names],
+        input_dtype=_input_dtype(model) if n_features is not None else None,
+        classes=classes,
+    )
+
+PROFILE_BATCH_ROWS = 1000
+
+class ModelProfile:
+    """
+    Замеры модели при загрузке: время десериализации, объем в памяти и
+    медианная задержка predict на синтетическом входе из 1 и
+    PROFILE_BATCH_ROWS строк. Задержки равны None, если схема входа
+    неизвестна или модель не смогла предсказать на синтетических данных.
+    """
+
+    def __init__(
+        self,
+        load_time: float,
+        memory_bytes: int,
+        latency_single: Optional[float] = None,
+        latency_batch: Optional[float] = None,
+    ):
+        self.load_time = load_time
+        self.memory_bytes = memory_bytes
+        self.latency_single = latency_single
+        self.latency_batch = latency_batch
+
+    @property
+    def row_time(self) -> Optional[float]:
+        if self.latency_batch is None:
+            return None
+
+        return self.latency_batch / PROFILE_BATCH_ROWS
+
+def _median_latency(predict: Callable[[np.ndarray], Any], X: np.ndarray, repeat: int) -> float:
+    predict(X)
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+
+    return float(np.median(timings))
+
+def profile_model(
+    model: Any,
+    load_time: float,
+    feature_schema: FeatureSchema,
+    inference_engine: str,
+) -> ModelProfile:
+    engine = compile_model(model) if inference_engine == INFERENCE_ENGINE_COMPILED else None
+    profile = ModelProfile(
+        load_time=load_time,
+        memory_bytes=estimate_memory_footprint((model, engine)),
+    )
+
+    if feature_schema.n_features is None:
+        return profile
+
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((PROFILE_BATCH_ROWS, feature_schema.n_features)).astype(feature_schema.input_dtype)
+
+    def predict(rows: np.ndarray) -> Any:
+        # Так же, как LoadedModel: скомпилированный движок, если он принимает вход
+        if engine is not None and engine.accepts(rows):
+            return engine.predict(rows)
+
+        return model.predict(rows)
+
+    try:
+        with warnings.catch_warnings():
+            # Модели, обученные на DataFrame, предупреждают о входе без имен признаков
+            warnings.simplefilter("ignore")
+
+            profile.latency_single = _median_latency(predict, X[:1], settings.MODEL_PROFILE_REPEAT)
+            profile.latency_batch = _median_latency(predict, X, max(1, settings.MODEL_PROFILE_REPEAT // 5))
+    except Exception as e:
+        logger.warning("Model profiling on synthetic input failed: %s", e)
+
+    return profile
+
+def estimate_cost(model_size: int, profile: Optional[ModelProfile] = None) -> float:
+    """
+    Стоимость одной строки предсказания.
+
+    Складывается из процессорного времени на строку в батче и объема модели
+    в памяти. Без замера задержки стоимость считается по размеру артефакта.
+    """
+    if profile is None or profile.row_time is None:
+        return max(0.1, model_size / (1024 * 1024))
+
+    cost = (
+        profile.row_time * settings.MODEL_PRICE_PER_CPU_SECOND
+        + profile.memory_bytes / (1024 ** 3) * settings.MODEL_PRICE_PER_GB
+    )
+
+    return max(settings.MODEL_PRICE_MIN, cost)
+
+class ModelInspection:
+    """
+    Результат анализа десериализованной модели при загрузке.
+    """
+
+    def __init__(
+        self,
+        cost: float,
+        inference_engine: str,
+        feature_schema: FeatureSchema,
+        profile: ModelProfile,
+    ):
+        self.cost = cost
+        self.inference_engine = inference_engine
+        self.feature_schema = feature_schema
+        self.profile = profile
+
+def inspect_model(model: Any, model_upload: ModelUpload, load_time: float) -> ModelInspection:
+    inference_engine = INFERENCE_ENGINE_NATIVE
+
+    if settings.MODEL_COMPILATION_ENABLED:
+        inference_engine = select_inference_engine(model)
+
+    feature_schema = extract_feature_schema(model)
+    profile = profile_model(model, load_time, feature_schema, inference_engine)
+
+    return ModelInspection(
+        cost=estimate_cost(model_upload.size, profile),
+        inference_engine=inference_engine,
+        feature_schema=feature_schema,
+        profile=profile,
+    )
+
+INSPECTION_CACHE_SIZE = 1024
+
+_inspections: "OrderedDict[str, ModelInspection]" = OrderedDict()
+_inspections_lock = threading.Lock()
+
+def _cached_inspection(sha256: str) -> Optional[ModelInspection]:
+    with _inspections_lock:
+        inspection = _inspections.get(sha256)
+
+        if inspection is not None:
+            _inspections.move_to_end(sha256)
+
+        return inspection
+
+def _remember_inspection(sha256: str, inspection: ModelInspection) -> None:
+    with _inspections_lock:
+        _inspections[sha256] = inspection
+        _inspections.move_to_end(sha256)
+
+        while len(_inspections) > INSPECTION_CACHE_SIZE:
+            _inspections.popitem(last=False)
+
+def estimate_upload_cost(db: Session, model_upload: ModelUpload) -> float:
+    artifact = crud_artifact.get_by_sha256(db, sha256=model_upload.sha256)
+
+    if artifact is not None:
+        return artifact.cost_per_prediction
+
+    inspection = _cached_inspection(model_upload.sha256)
+
+    if inspection is None:
+        model, load_time = load_model(model_upload)
+        inspection = inspect_model(model, model_upload, load_time)
+        _remember_inspection(model_upload.sha256, inspection)
+
+    return inspection.cost
+
+def store_model_artifact(db: Session, model_upload: ModelUpload) -> ModelArtifact:
+    artifact = crud_artifact.get_by_sha256(db, sha256=model_upload.sha256)
+
+    if artifact is not None:
+        return artifact
+
+    compression = resolve_compression()
+
+    # Результат анализа в кэше означает, что артефакт уже успешно десериализовался
+    inspection = _cached_inspection(model_upload.sha256)
+    stored = model_upload
+
+    if inspection is None or compression != MODEL_COMPRESSION_ORIGINAL:
+        model, load_time = load_model(model_upload)
+
+        if inspection is None:
+            inspection = inspect_model(model, model_upload, load_time)
+
+        if compression != MODEL_COMPRESSION_ORIGINAL:
+            stored = recompress_model(model, compression, settings.MODEL_COMPRESSION_LEVEL)
+
+    try:
+        object_name = save_model(stored)
+    finally:
+        if stored is not model_upload:
+            stored.cleanup()
+
+    return crud_artifact.create(
+        db,
+        obj_in=ModelArtifactCreate(
+            sha256=model_upload.sha256,
+            object_name=object_name,
+            size=model_upload.size,
+            stored_size=stored.size,
+            compression=compression,
+            inference_engine=inspection.inference_engine,
+            n_features=inspection.feature_schema.n_features,
+            feature_names=inspection.feature_schema.feature_names,
+            input_dtype=inspection.feature_schema.input_dtype,
+            classes=inspection.feature_schema.classes,
+            profile_load_time=inspection.profile.load_time,
+            profile_memory_bytes=inspection.profile.memory_bytes,
+            profile_latency_single=inspection.profile.latency_single,
+            profile_latency_batch=inspection.profile.latency_batch,
+            cost_per_prediction=round(inspection.cost, 3),
+        ),
+    )
+
+_ATOMIC_TYPES = (str, bytes, bytearray, int, float, complex, bool, type(None), type)
+
+def estimate_memory_footprint(model: Any) -> int:
+    total = 0
+    # Храним ссылки на посещенные объекты, иначе временные объекты из __reduce_ex__ переиспользуют id
+    seen = {}
+    stack = [model]
+
+    while stack:
+        obj = stack.pop()
+
+        if id(obj) in seen:
+            continue
+
+        seen[id(obj)] = obj
+
+        if isinstance(obj, np.ndarray):
+            total += sys.getsizeof(obj)
+
+            if isinstance(obj.base, np.ndarray):
+                stack.append(obj.base)
+            elif obj.dtype.hasobject:
+                stack.extend(obj.ravel())
+            else:
+                total += obj.nbytes
+
+            continue
+
+        total += sys.getsizeof(obj)
+
+        if isinstance(obj, _ATOMIC_TYPES):
+            continue
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+        else:
+            # Cython-объекты (например, sklearn Tree) отдают массивы через состояние pickle
+            try:
+                reduced = obj.__reduce_ex__(4)
+            except Exception:
+                continue
+
+            if isinstance(reduced, tuple) and len(reduced) > 2:
+                stack.append(reduced[2])
+
+    return total
+
+OUTPUT_MODE_LABEL = "label"
+OUTPUT_MODE_PROBA = "proba"
+OUTPUT_MODE_BOTH = "both"
+OUTPUT_MODES = (OUTPUT_MODE_LABEL, OUTPUT_MODE_PROBA, OUTPUT_MODE_BOTH)
+
+class PredictionOutput:
+    """
+    Метки и вероятности для батча строк.
+
+    labels: (n,) или (n, n_outputs); probabilities: (n, n_classes) или
+    (n, n_outputs, n_classes). Отсутствующая часть равна None.
+    """
+
+    def __init__(self, labels: Optional[np.ndarray], probabilities: Optional[np.ndarray], classes: Optional[Any]):
+        self.labels = labels
+        self.probabilities = probabilities
+        self.classes = classes
+
+    def __len__(self) -> int:
+        data = self.labels if self.labels is not None else self.probabilities
+
+        return len(data)
+
+    def classes_list(self) -> Optional[list]:
+        if self.classes is None:
+            return None
+
+        if isinstance(self.classes, list):
+            return [np.asarray(classes).tolist() for classes in self.classes]
+
+        return np.asarray(self.classes).tolist()
+
+def _final_estimator(model: Any) -> Any:
+    # У sklearn Pipeline вероятности и классы берутся у последнего шага
+    return getattr(model, "_final_estimator", model)
+
+def supports_probabilities(model: Any) -> bool:
+    return hasattr(model, "predict_proba") and hasattr(model, "classes_")
+
+def labels_match_probabilities(model: Any) -> bool:
+    from sklearn.svm import SVC, NuSVC
+
+    # У SVC вероятности из калибровки Платта и могут не совпадать с predict
+    return not isinstance(_final_estimator(model), (SVC, NuSVC))
+
+def _labels_from_probabilities(classes: Any, probabilities: np.ndarray) -> np.ndarray:
+    if isinstance(classes, list):
+        return np.stack(
+            [
+                np.asarray(classes[k]).take(np.argmax(probabilities[:, k], axis=1))
+                for k in range(len(classes))
+            ],
+            axis=1,
         )
+
+    return np.asarray(classes).take(np.argmax(probabilities, axis=1))
+
+def run_prediction(loaded_model: Any, X: np.ndarray, output_mode: str = OUTPUT_MODE_LABEL) -> PredictionOutput:
+    """
+    Выполняет предсказание в заданном режиме.
+
+    Метки и вероятности получаются одним вызовом predict_proba. Для моделей
+    без predict_proba режим both возвращает только метки.
+    """
+    model = loaded_model.model
+
+    if output_mode == OUTPUT_MODE_BOTH and not supports_probabilities(model):
+        output_mode = OUTPUT_MODE_LABEL
+
+    if output_mode == OUTPUT_MODE_LABEL:
+        return PredictionOutput(loaded_model.predict(X), None, getattr(model, "classes_", None))
+
+    if not supports_probabilities(model):
+        raise ValueError("Модель не поддерживает вывод вероятностей")
+
+    classes = model.classes_
+    probabilities = loaded_model.predict_proba(X)
+
+    if isinstance(probabilities, list):
+        # Многовыходной классификатор: список (n, n_classes_k) сводится в один массив (n, n_outputs, max_classes).
+        # Недостающие классы дополняются нулями, реальные классы каждого выхода перечислены в classes.
+        max_classes = max(p.shape[1] for p in probabilities)
+        stacked = np.zeros((len(X), len(probabilities), max_classes), dtype=np.float64)
+
+        for k, output_probabilities in enumerate(probabilities):
+            stacked[:, k, :output_probabilities.shape[1]] = output_probabilities
+
+        probabilities = stacked
+        classes = list(classes)
+
+    labels = None
+
+    if output_mode == OUTPUT_MODE_BOTH:
+        if labels_match_probabilities(model):
+            labels = _labels_from_probabilities(classes, probabilities)
+        else:
+            labels = loaded_model.predict(X)
+
+    return PredictionOutput(labels, probabilities, classes)
+
+def concat_prediction_outputs(outputs: List[PredictionOutput]) -> PredictionOutput:
+    """
+    Склеивает результаты последовательных частей входа в исходном порядке строк.
+    """
+    first = outputs[0]
+
+    if len(outputs) == 1:
+        return first
+
+    return PredictionOutput(
+        labels=None if first.labels is None else np.concatenate([output.labels for output in outputs]),
+        probabilities=None if first.probabilities is None else np.concatenate([output.probabilities for output in outputs]),
+        classes=first.classes,
+    )
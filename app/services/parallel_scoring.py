@@ -0,0 +1,215 @@
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from app.core.config import settings
+from app.models.models import MLModel
+from app.services.model_compiler import INFERENCE_ENGINE_COMPILED, compile_model
+from app.services.model_registry import LoadedModel
+from app.services.model_service import (
+    PROFILE_BATCH_ROWS,
+    PredictionOutput,
+    concat_prediction_outputs,
+    fetch_artifact,
+    run_prediction,
+)
+from app.services.thread_policy import set_n_jobs
+
+# Модели, загруженные в дочернем процессе: ключ - путь к артефакту в дисковом кэше
+_worker_models: "OrderedDict[Tuple[str, str], LoadedModel]" = OrderedDict()
+
+def _init_worker() -> None:
+    from threadpoolctl import threadpool_limits
+
+    # Параллелизм дают процессы: внутри шарда BLAS/OpenMP работают в один поток
+    threadpool_limits(1)
+
+def _worker_model(artifact_path: str, inference_engine: Optional[str]) -> LoadedModel:
+    key = (artifact_path, inference_engine or "")
+    entry = _worker_models.get(key)
+
+    if entry is not None:
+        _worker_models.move_to_end(key)
+        return entry
+
+    ml_model = joblib.load(artifact_path)
+    # Сохраненный n_jobs=-1 запустил бы по потоку на ядро в каждом процессе пула
+    set_n_jobs(ml_model, 1)
+    engine = None
+
+    if inference_engine == INFERENCE_ENGINE_COMPILED and settings.MODEL_COMPILATION_ENABLED:
+        engine = compile_model(ml_model)
+
+    entry = LoadedModel(
+        key=os.path.basename(artifact_path),
+        model_name=os.path.basename(artifact_path),
+        model=ml_model,
+        memory_bytes=0,
+        load_time=0.0,
+        engine=engine,
+    )
+
+    _worker_models[key] = entry
+
+    while len(_worker_models) > settings.MODEL_CACHE_MAX_MODELS:
+        _worker_models.popitem(last=False)
+
+    return entry
+
+def _score_shard(
+    artifact_path: str,
+    inference_engine: Optional[str],
+    shm_name: str,
+    shape: Tuple[int, int],
+    start: int,
+    stop: int,
+    output_mode: str,
+) -> PredictionOutput:
+    loaded_model = _worker_model(artifact_path, inference_engine)
+    shm = SharedMemory(name=shm_name)
+
+    try:
+        X = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)[start:stop]
+        output = run_prediction(loaded_model, X, output_mode)
+        # Ссылки на разделяемую память должны исчезнуть до close
+        del X
+    finally:
+        shm.close()
+
+    return output
+
+class ShardedScorer:
+    """
+    Предсказание для большого массива строк на нескольких процессах.
+
+    Вход копируется один раз в разделяемую память, дочерние процессы читают
+    свои шарды без сериализации. Модель загружается в каждом процессе один
+    раз из дискового кэша артефактов и переиспользуется между запросами.
+    Результаты шардов склеиваются в исходном порядке строк.
+    """
+
+    def __init__(self, workers: int, shard_rows: int):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_rows = shard_rows
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    # spawn: fork многопоточного сервера может унаследовать захваченные блокировки
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                    )
+
+        return self._pool
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+    def applies(self, model: MLModel, rows: int) -> bool:
+        # Артефакты без контентной адресации не лежат в дисковом кэше, а один шард проще посчитать на месте
+        if not model.artifact_sha256 or rows <= self.shard_rows:
+            return False
+
+        if model.profile_latency_batch is None:
+            return True
+
+        # Пул окупается, если расчет на месте дольше порога и загрузки модели в процессах пула
+        estimated = rows * model.profile_latency_batch / PROFILE_BATCH_ROWS
+
+        return estimated >= max(settings.PREDICTION_PARALLEL_MIN_SECONDS, model.profile_load_time or 0.0)
+
+    def shards(self, rows: int) -> List[Tuple[int, int]]:
+        return [(start, min(start + self.shard_rows, rows)) for start in range(0, rows, self.shard_rows)]
+
+    def score_artifact(
+        self,
+        artifact_path: str,
+        inference_engine: Optional[str],
+        X: np.ndarray,
+        output_mode: str,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> PredictionOutput:
+        if not len(X):
+            raise ValueError("Файл не содержит строк")
+
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        shm = SharedMemory(create=True, size=X.nbytes)
+
+        try:
+            np.ndarray(X.shape, dtype=np.float64, buffer=shm.buf)[:] = X
+
+            shards = self.shards(len(X))
+            futures = {
+                self.pool.submit(
+                    _score_shard,
+                    artifact_path,
+                    inference_engine,
+                    shm.name,
+                    X.shape,
+                    start,
+                    stop,
+                    output_mode,
+                ): index
+                for index, (start, stop) in enumerate(shards)
+            }
+
+            results: List[Optional[PredictionOutput]] = [None] * len(shards)
+            rows_processed = 0
+
+            try:
+                for future in as_completed(futures):
+                    index = futures[future]
+                    results[index] = future.result()
+
+                    rows_processed += shards[index][1] - shards[index][0]
+
+                    if on_progress is not None:
+                        on_progress(rows_processed)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+
+                raise
+
+            return concat_prediction_outputs(results)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def score(
+        self,
+        model: MLModel,
+        X: np.ndarray,
+        output_mode: str,
+        on_progress: Optional[Callable[[int], None]] = None,
+    ) -> PredictionOutput:
+        # Процессы читают артефакт из общего дискового кэша, куда его кладет fetch_artifact
+        return self.score_artifact(
+            fetch_artifact(model.model_path),
+            model.inference_engine,
+            X,
+            output_mode,
+            on_progress,
+        )
+
+sharded_scorer = ShardedScorer(
+    workers=settings.PREDICTION_PARALLEL_WORKERS,
+    shard_rows=settings.PREDICTION_SHARD_ROWS,
+)
@@ -0,0 +1,289 @@
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import RATE_LIMIT_DECISIONS
+from app.crud.crud_rate_limit import crud_rate_limit
+from app.crud.crud_user import crud_user
+from app.db.session import SessionLocal
+from app.models.models import User
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_COORDINATION_POSTGRES = "postgres"
+
+class Quota:
+    def __init__(self, plan: str, rate: float, burst: int, concurrency: int):
+        self.plan = plan
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+
+    @classmethod
+    def for_user(cls, user: User) -> "Quota":
+        # Личные значения пользователя перекрывают значения его тарифа
+        plan = user.plan if user.plan in settings.RATE_LIMIT_PLANS else settings.RATE_LIMIT_DEFAULT_PLAN
+        limits = settings.RATE_LIMIT_PLANS[plan]
+
+        return cls(
+            plan=plan,
+            rate=user.rate_limit if user.rate_limit is not None else limits["rate"],
+            burst=user.rate_burst if user.rate_burst is not None else int(limits["burst"]),
+            concurrency=(
+                user.max_concurrent_predictions
+                if user.max_concurrent_predictions is not None
+                else int(limits["concurrency"])
+            ),
+        )
+
+class TokenBucket:
+    """
+    Запас из burst запросов, который пополняется со скоростью rate в секунду.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+
+    def take(self, now: float) -> float:
+        """
+        Забирает один запрос. Возвращает 0, если запрос разрешен, иначе
+        сколько секунд ждать до следующего разрешенного запроса.
+        """
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        if self.rate <= 0:
+            return math.inf
+
+        return (1 - self._tokens) / self.rate
+
+class UserLimits:
+    def __init__(self, quota: Quota, expires_at: float):
+        self.quota = quota
+        self.expires_at = expires_at
+        self.bucket = TokenBucket(quota.rate, quota.burst)
+        self.in_flight = 0
+        # До этого момента пользователь исчерпал общий лимит всех воркеров
+        self.blocked_until = 0.0
+
+class RateLimitExceeded(Exception):
+    def __init__(self, limit: str, retry_after: float):
+        super().__init__(limit)
+        self.limit = limit
+        self.retry_after = retry_after
+
+class RateLimiter:
+    """
+    Лимиты запросов и одновременных предсказаний пользователей.
+
+    Решения принимаются в памяти воркера без обращения к базе: у каждого
+    пользователя свой token bucket и счетчик выполняемых предсказаний.
+    Лимиты пользователя (тариф и личные значения) читаются из базы и
+    хранятся quota_ttl секунд.
+
+    С координацией через Postgres воркер раз в sync_interval добавляет
+    принятые запросы в общее окно длиной window секунд в таблице
+    rate_limit_usage. Если пользователь превысил rate * window + burst
+    запросов в окне по всем воркерам, воркер отклоняет его запросы до конца
+    окна. Общий лимит соблюдается с точностью до sync_interval.
+
+    Координируется только частота запросов. Лимит concurrency действует на
+    каждый воркер отдельно: при N воркерах пользователь может выполнять до
+    N * concurrency предсказаний одновременно.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        quota_ttl: float,
+        coordination: str,
+        sync_interval: float,
+        window: float,
+    ):
+        self.enabled = enabled
+        self.quota_ttl = quota_ttl
+        self.coordination = coordination
+        self.sync_interval = sync_interval
+        self.window = window
+
+        self._users: Dict[int, UserLimits] = {}
+        self._pending: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def coordinated(self) -> bool:
+        return self.enabled and self.coordination == RATE_LIMIT_COORDINATION_POSTGRES
+
+    def limits_for(self, user_id: int) -> Optional[UserLimits]:
+        with self._lock:
+            limits = self._users.get(user_id)
+
+            if limits is None or limits.expires_at <= time.monotonic():
+                return None
+
+            return limits
+
+    def load(self, user_id: int) -> Optional[UserLimits]:
+        """
+        Читает лимиты пользователя из базы. Вызывается из пула потоков при
+        первом запросе пользователя и после истечения quota_ttl.
+        """
+        db = SessionLocal()
+
+        try:
+            user = crud_user.get(db, id=user_id)
+        finally:
+            db.close()
+
+        if user is None:
+            return None
+
+        return self.update(user)
+
+    def update(self, user: User) -> UserLimits:
+        """
+        Применяет текущие лимиты пользователя. Вызывается и сразу после их
+        изменения администратором: остальные воркеры увидят их через quota_ttl.
+        """
+        quota = Quota.for_user(user)
+        user_id = user.id
+
+        with self._lock:
+            limits = self._users.get(user_id)
+
+            # Состояние bucket и счетчики сохраняются, если лимиты не изменились
+            if limits is not None and vars(limits.quota) == vars(quota):
+                limits.expires_at = time.monotonic() + self.quota_ttl
+                return limits
+
+            fresh = UserLimits(quota, time.monotonic() + self.quota_ttl)
+
+            if limits is not None:
+                fresh.in_flight = limits.in_flight
+                fresh.blocked_until = limits.blocked_until
+
+            self._users[user_id] = fresh
+
+            return fresh
+
+    def check_rate(self, user_id: int, limits: UserLimits) -> None:
+        now = time.monotonic()
+
+        with self._lock:
+            if limits.blocked_until > now:
+                self._reject(limits, "global", limits.blocked_until - now)
+
+            wait = limits.bucket.take(now)
+
+            if wait:
+                self._reject(limits, "rate", wait)
+
+            if self.coordinated:
+                self._pending[user_id] += 1
+
+        RATE_LIMIT_DECISIONS.labels(plan=limits.quota.plan, limit="rate", decision="allowed").inc()
+
+    def acquire_inference(self, limits: UserLimits) -> None:
+        with self._lock:
+            if limits.in_flight >= limits.quota.concurrency:
+                self._reject(limits, "concurrency", 1.0)
+
+            limits.in_flight += 1
+
+        RATE_LIMIT_DECISIONS.labels(plan=limits.quota.plan, limit="concurrency", decision="allowed").inc()
+
+    def release_inference(self, user_id: int) -> None:
+        with self._lock:
+            # Лимиты могли перечитаться за время предсказания: счетчик перенесен в новую запись
+            limits = self._users.get(user_id)
+
+            if limits is not None:
+                limits.in_flight -= 1
+
+    def _reject(self, limits: UserLimits, limit: str, retry_after: float) -> None:
+        RATE_LIMIT_DECISIONS.labels(plan=limits.quota.plan, limit=limit, decision="rejected").inc()
+
+        raise RateLimitExceeded(limit, retry_after)
+
+    def start(self) -> None:
+        if not self.coordinated or self._thread is not None:
+            return
+
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="rate-limit-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+
+        self._stopping.set()
+        self._thread.join(self.sync_interval)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"Rate limit sync failed: {str(e)}")
+
+    def _window(self) -> Tuple[datetime, float]:
+        # Окна выровнены по времени UTC, поэтому у всех воркеров совпадают
+        epoch = time.time()
+        start = epoch - epoch % self.window
+
+        return datetime.utcfromtimestamp(start), start + self.window - epoch
+
+    def sync(self) -> None:
+        with self._lock:
+            pending = dict(self._pending)
+            self._pending.clear()
+
+        window_start, remaining = self._window()
+        db = SessionLocal()
+
+        try:
+            totals = crud_rate_limit.add_usage(db, window_start=window_start, requests=pending) if pending else {}
+            crud_rate_limit.delete_before(db, window_start=window_start - timedelta(seconds=self.window))
+        except Exception:
+            # Запросы вернутся в следующую попытку
+            with self._lock:
+                for user_id, count in pending.items():
+                    self._pending[user_id] += count
+
+            raise
+        finally:
+            db.close()
+
+        blocked_until = time.monotonic() + remaining
+
+        with self._lock:
+            for user_id, total in totals.items():
+                limits = self._users.get(user_id)
+
+                if limits is not None and total >= limits.quota.rate * self.window + limits.quota.burst:
+                    limits.blocked_until = blocked_until
+
+rate_limiter = RateLimiter(
+    enabled=settings.RATE_LIMIT_ENABLED,
+    quota_ttl=settings.RATE_LIMIT_QUOTA_TTL,
+    coordination=settings.RATE_LIMIT_COORDINATION,
+    sync_interval=settings.RATE_LIMIT_SYNC_INTERVAL,
+    window=settings.RATE_LIMIT_WINDOW,
+)
@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+import uuid
+from typing import Any, BinaryIO, Optional, Tuple
+
+from app.services.input_service import PredictionInput
+from app.services.model_service import PredictionOutput
+from app.services.storage_service import storage_service
+
+OUTPUT_FORMAT_CSV = "csv"
+
+# Расширение файла, тип содержимого и кодек сжатия для каждого формата результата
+OUTPUT_FORMATS = {
+    "csv": (".csv", "text/csv", None),
+    "csv.gz": (".csv.gz", "application/gzip", "gzip"),
+    "csv.zst": (".csv.zst", "application/zstd", "zstd"),
+    "parquet": (".parquet", "application/vnd.apache.parquet", None),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file", None),
+}
+
+INPUT_EXTENSIONS = {
+    "csv": (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+def prediction_object_prefix(user_id: int) -> str:
+    # uuid вместо временной метки: одновременные запросы не перезаписывают файлы друг друга
+    return f"predictions/{user_id}/{uuid.uuid4().hex}"
+
+def download_filename(prediction_id: int, object_name: str) -> str:
+    # predictions/1/<uuid>/predictions.csv.gz -> predictions_42.csv.gz
+    name, _, extension = os.path.basename(object_name).partition(".")
+
+    return f"{name}_{prediction_id}.{extension}" if extension else f"{name}_{prediction_id}"
+
+def build_result_table(prediction_input: PredictionInput, output: PredictionOutput) -> Any:
+    import pyarrow as pa
+
+    columns = {
+        name: prediction_input.values[:, j]
+        for j, name in enumerate(prediction_input.columns)
+    }
+
+    if output.labels is not None:
+        if output.labels.ndim == 1:
+            columns["prediction"] = output.labels
+        else:
+            for k in range(output.labels.shape[1]):
+                columns[f"prediction_{k}"] = output.labels[:, k]
+
+    if output.probabilities is not None:
+        classes = output.classes_list()
+
+        if output.probabilities.ndim == 2:
+            for j, label in enumerate(classes):
+                columns[f"proba_{label}"] = output.probabilities[:, j]
+        else:
+            for k, output_classes in enumerate(classes):
+                for j, label in enumerate(output_classes):
+                    columns[f"proba_{k}_{label}"] = output.probabilities[:, k, j]
+
+    return pa.table(columns)
+
+def write_result_file(path: str, table: Any, output_format: str) -> None:
+    import pyarrow as pa
+    import pyarrow.csv
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+
+    if output_format == "parquet":
+        pq.write_table(table, path)
+    elif output_format == "arrow":
+        with pa.OSFile(path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        codec = OUTPUT_FORMATS[output_format][2]
+
+        if codec:
+            with pa.CompressedOutputStream(path, codec) as sink:
+                pa.csv.write_csv(table, sink)
+        else:
+            pa.csv.write_csv(table, path)
+
+def store_input_file(prefix: str, input_file: BinaryIO, input_format: str) -> str:
+    """
+    Сохраняет исходный входной файл как есть, без повторной сериализации.
+    """
+    input_extension, input_content_type = INPUT_EXTENSIONS[input_format]
+    input_object = f"{prefix}/input{input_extension}"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, f"input{input_extension}")
+
+        input_file.seek(0)
+
+        with open(input_path, "wb") as f:
+            shutil.copyfileobj(input_file, f)
+
+        storage_service.save_file(input_path, input_object, content_type=input_content_type)
+
+    return input_object
+
+def store_result_file(
+    prefix: str,
+    prediction_input: PredictionInput,
+    output: PredictionOutput,
+    output_format: str = OUTPUT_FORMAT_CSV,
+) -> str:
+    extension, content_type, _ = OUTPUT_FORMATS[output_format]
+    result_object = f"{prefix}/predictions{extension}"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result_path = os.path.join(tmp_dir, f"predictions{extension}")
+
+        write_result_file(result_path, build_result_table(prediction_input, output), output_format)
+        storage_service.save_file(result_path, result_object, content_type=content_type)
+
+    return result_object
+
+def store_prediction_files(
+    user_id: int,
+    input_file: Optional[BinaryIO],
+    prediction_input: PredictionInput,
+    output: PredictionOutput,
+    output_format: str = OUTPUT_FORMAT_CSV,
+) -> Tuple[Optional[str], str]:
+    """
+    Сохраняет результаты и, если передан input_file, исходный входной файл.
+
+    Возвращает ключи объектов входного файла и файла с результатами.
+    """
+    prefix = prediction_object_prefix(user_id)
+    input_object = None
+
+    if input_file is not None:
+        input_object = store_input_file(prefix, input_file, prediction_input.input_format)
+
+    try:
+        result_object = store_result_file(prefix, prediction_input, output, output_format)
+    except Exception:
+        delete_prediction_files(input_object)
+        raise
+
+    return input_object, result_object
+
+def delete_prediction_files(*object_names: Optional[str]) -> None:
+    for object_name in object_names:
+        if not object_name:
+            continue
+
+        try:
+            storage_service.delete_file(object_name)
+        except Exception:
+            pass
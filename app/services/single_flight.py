@@ -0,0 +1,55 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """
+    Не больше одного одновременного вызова на ключ.
+
+    Первый поток выполняет функцию, остальные с тем же ключом ждут его
+    результата и получают то же значение или то же исключение. Результат
+    не кэшируется: после завершения вызова следующий запрос выполнит
+    функцию заново, поэтому ошибка не закрепляется.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Возвращает результат и признак того, что он получен чужим вызовом.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+            call.done.set()
+
+        return call.result, False
@@ -0,0 +1,314 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
+from urllib.parse import quote, urlencode
+
+import urllib3
+from minio import Minio
+from minio.error import S3Error
+
+from app.core.config import settings
+from app.core.security import create_download_signature
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+class StorageBackend(ABC):
+    @abstractmethod
+    def put_file(self, object_name: str, file_path: str, content_type: str = "application/octet-stream") -> None:
+        ...
+
+    @abstractmethod
+    def get_file(self, object_name: str, file_path: str) -> None:
+        ...
+
+    @abstractmethod
+    def get_bytes(self, object_name: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def exists(self, object_name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, object_name: str) -> None:
+        ...
+
+    @abstractmethod
+    def presigned_url(self, object_name: str, expires: int, filename: Optional[str] = None) -> str:
+        ...
+
+class MinioStorageBackend(StorageBackend):
+    """
+    Хранилище в MinIO/S3 с общим пулом соединений.
+
+    Объекты больше range_threshold скачиваются параллельными ranged GET
+    запросами частями по range_part_size.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        access_key: str,
+        secret_key: str,
+        bucket: str,
+        secure: bool = False,
+        pool_size: int = 32,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 60.0,
+        max_retries: int = 3,
+        part_size: int = 16 * 1024 * 1024,
+        range_threshold: int = 64 * 1024 * 1024,
+        range_part_size: int = 16 * 1024 * 1024,
+        range_concurrency: int = 8,
+        public_endpoint: Optional[str] = None,
+        region: str = "us-east-1",
+    ):
+        self.bucket = bucket
+        self.part_size = part_size
+        self.range_threshold = range_threshold
+        self.range_part_size = range_part_size
+        self.range_concurrency = range_concurrency
+
+        http_client = urllib3.PoolManager(
+            maxsize=pool_size,
+            block=True,
+            timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+            retries=urllib3.Retry(
+                total=max_retries,
+                backoff_factor=0.2,
+                status_forcelist=[500, 502, 503, 504],
+            ),
+        )
+
+        self.client = Minio(
+            endpoint,
+            access_key=access_key,
+            secret_key=secret_key,
+            secure=secure,
+            http_client=http_client,
+            region=region,
+        )
+
+        # Подпись ссылки включает хост, поэтому для внешнего адреса нужен отдельный клиент.
+        # Регион задан явно, чтобы генерация ссылки не делала запрос к хранилищу.
+        if public_endpoint:
+            self.presign_client = Minio(
+                public_endpoint,
+                access_key=access_key,
+                secret_key=secret_key,
+                secure=secure,
+                region=region,
+            )
+        else:
+            self.presign_client = self.client
+
+        self._bucket_ready = False
+        self._bucket_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "MinioStorageBackend":
+        return cls(
+            endpoint=settings.MINIO_ENDPOINT,
+            access_key=settings.MINIO_ACCESS_KEY,
+            secret_key=settings.MINIO_SECRET_KEY,
+            bucket=settings.MINIO_BUCKET,
+            secure=settings.MINIO_SECURE,
+            pool_size=settings.STORAGE_POOL_SIZE,
+            connect_timeout=settings.STORAGE_CONNECT_TIMEOUT,
+            read_timeout=settings.STORAGE_READ_TIMEOUT,
+            max_retries=settings.STORAGE_MAX_RETRIES,
+            part_size=settings.MINIO_PART_SIZE,
+            range_threshold=settings.STORAGE_RANGE_THRESHOLD,
+            range_part_size=settings.STORAGE_RANGE_PART_SIZE,
+            range_concurrency=settings.STORAGE_RANGE_CONCURRENCY,
+            public_endpoint=settings.MINIO_PUBLIC_ENDPOINT,
+            region=settings.MINIO_REGION,
+        )
+
+    def _ensure_bucket_exists(self) -> None:
+        if self._bucket_ready:
+            return
+
+        with self._bucket_lock:
+            if not self._bucket_ready:
+                if not self.client.bucket_exists(self.bucket):
+                    self.client.make_bucket(self.bucket)
+
+                self._bucket_ready = True
+
+    def put_file(self, object_name: str, file_path: str, content_type: str = "application/octet-stream") -> None:
+        self._ensure_bucket_exists()
+
+        # При размере больше part_size клиент выполняет multipart-загрузку, читая файл частями
+        self.client.fput_object(
+            bucket_name=self.bucket,
+            object_name=object_name,
+            file_path=file_path,
+            content_type=content_type,
+            part_size=self.part_size,
+        )
+
+    def get_file(self, object_name: str, file_path: str) -> None:
+        self._ensure_bucket_exists()
+
+        size = self.client.stat_object(self.bucket, object_name).size
+
+        if size <= self.range_threshold:
+            self._get_range(object_name, file_path, 0, size, truncate=True)
+            return
+
+        with open(file_path, "wb") as f:
+            f.truncate(size)
+
+        ranges = [
+            (offset, min(self.range_part_size, size - offset))
+            for offset in range(0, size, self.range_part_size)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.range_concurrency) as executor:
+            futures = [
+                executor.submit(self._get_range, object_name, file_path, offset, length)
+                for offset, length in ranges
+            ]
+
+            for future in futures:
+                future.result()
+
+    def _get_range(self, object_name: str, file_path: str, offset: int, length: int, truncate: bool = False) -> None:
+        response = self.client.get_object(self.bucket, object_name, offset=offset, length=length)
+
+        try:
+            with open(file_path, "wb" if truncate else "r+b") as f:
+                f.seek(offset)
+
+                for chunk in response.stream(COPY_CHUNK_SIZE):
+                    f.write(chunk)
+        finally:
+            response.close()
+            response.release_conn()
+
+    def get_bytes(self, object_name: str) -> bytes:
+        self._ensure_bucket_exists()
+
+        response = self.client.get_object(self.bucket, object_name)
+
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def exists(self, object_name: str) -> bool:
+        self._ensure_bucket_exists()
+
+        try:
+            self.client.stat_object(self.bucket, object_name)
+        except S3Error as e:
+            if e.code in ("NoSuchKey", "NoSuchObject", "ResourceNotFound"):
+                return False
+
+            raise
+
+        return True
+
+    def delete(self, object_name: str) -> None:
+        self._ensure_bucket_exists()
+        self.client.remove_object(self.bucket, object_name)
+
+    def presigned_url(self, object_name: str, expires: int, filename: Optional[str] = None) -> str:
+        response_headers = None
+
+        if filename:
+            response_headers = {"response-content-disposition": f'attachment; filename="{filename}"'}
+
+        return self.presign_client.presigned_get_object(
+            self.bucket,
+            object_name,
+            expires=timedelta(seconds=expires),
+            response_headers=response_headers,
+        )
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Хранилище в локальной файловой системе для одноузловых установок и тестов.
+
+    Подписанные ссылки ведут на эндпоинт /storage API и проверяются по HMAC.
+    """
+
+    def __init__(self, root: str, public_url: str = ""):
+        self.root = os.path.abspath(root)
+        self.public_url = public_url.rstrip("/")
+        os.makedirs(self.root, exist_ok=True)
+
+    @classmethod
+    def from_settings(cls) -> "LocalStorageBackend":
+        return cls(
+            root=str(settings.LOCAL_STORAGE_ROOT),
+            public_url=f"{settings.PUBLIC_API_URL}{settings.API_V1_STR}/storage",
+        )
+
+    def path(self, object_name: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, object_name))
+
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError(f"Недопустимое имя объекта: {object_name}")
+
+        return path
+
+    def put_file(self, object_name: str, file_path: str, content_type: str = "application/octet-stream") -> None:
+        path = self.path(object_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        os.close(fd)
+
+        try:
+            shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def get_file(self, object_name: str, file_path: str) -> None:
+        shutil.copyfile(self.path(object_name), file_path)
+
+    def get_bytes(self, object_name: str) -> bytes:
+        with open(self.path(object_name), "rb") as f:
+            return f.read()
+
+    def exists(self, object_name: str) -> bool:
+        return os.path.isfile(self.path(object_name))
+
+    def delete(self, object_name: str) -> None:
+        try:
+            os.unlink(self.path(object_name))
+        except FileNotFoundError:
+            pass
+
+    def presigned_url(self, object_name: str, expires: int, filename: Optional[str] = None) -> str:
+        self.path(object_name)
+
+        expires_at = int(time.time()) + expires
+        query = {
+            "expires": expires_at,
+            "signature": create_download_signature(object_name, expires_at, filename or None),
+        }
+
+        if filename:
+            query["filename"] = filename
+
+        return f"{self.public_url}/{quote(object_name)}?{urlencode(query)}"
+
+STORAGE_BACKENDS = {
+    "minio": MinioStorageBackend,
+    "local": LocalStorageBackend,
+}
+
+def create_storage_backend(name: str) -> StorageBackend:
+    return STORAGE_BACKENDS[name].from_settings()
@@ -1,44 +1,31 @@
-import io
-from minio import Minio
-from minio.error import S3Error
+import threading
+from typing import Optional
+
 from fastapi import HTTPException
 from app.core.config import settings
+from app.services.storage_backends import StorageBackend, create_storage_backend
 
 class StorageService:
-    def __init__(self):
-        self.client = Minio(
-            settings.MINIO_ENDPOINT,
-            access_key=settings.MINIO_ACCESS_KEY,
-            secret_key=settings.MINIO_SECRET_KEY,
-            secure=settings.MINIO_SECURE
-        )
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        # Бэкенд создается при первом обращении, чтобы импорт модуля не ходил в сеть
+        self._backend = backend
+        self._backend_lock = threading.Lock()
 
-        self._ensure_bucket_exists()
+    @property
+    def backend(self) -> StorageBackend:
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = create_storage_backend(settings.STORAGE_BACKEND)
 
-    def _ensure_bucket_exists(self):
-        try:
-            if not self.client.bucket_exists(settings.MINIO_BUCKET):
-                self.client.make_bucket(settings.MINIO_BUCKET)
-        except S3Error as e:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Ошибка при создании бакета: {str(e)}"
-            )
+        return self._backend
 
-    def save_model(self, model_data: bytes, user_id: int, model_name: str, version: str) -> str:
+    def save_model(self, file_path: str, object_name: str) -> str:
         try:
-            object_name = f"models/{user_id}/{model_name}_{version}.joblib"
-
-            self.client.put_object(
-                bucket_name=settings.MINIO_BUCKET,
-                object_name=object_name,
-                data=io.BytesIO(model_data),
-                length=len(model_data),
-                content_type='application/octet-stream'
-            )
+            self.backend.put_file(object_name, file_path)
 
             return object_name
-        except S3Error as e:
+        except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Ошибка при сохранении модели: {str(e)}"
@@ -46,18 +33,25 @@ class StorageService:
 
     def load_model(self, object_name: str) -> bytes:
         try:
-            try:
-                self.client.stat_object(settings.MINIO_BUCKET, object_name)
-            except S3Error as e:
+            if not self.backend.exists(object_name):
                 raise HTTPException(
                     status_code=404,
-                    detail=f"Модель не найдена: {str(e)}"
+                    detail=f"Модель не найдена: {object_name}"
                 )
 
-            response = self.client.get_object(settings.MINIO_BUCKET, object_name)
+            return self.backend.get_bytes(object_name)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Ошибка при загрузке модели: {str(e)}"
+            )
 
-            return response.read()
-        except S3Error as e:
+    def download_model(self, object_name: str, file_path: str) -> None:
+        try:
+            self.backend.get_file(object_name, file_path)
+        except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Ошибка при загрузке модели: {str(e)}"
@@ -65,21 +59,49 @@ class StorageService:
 
     def delete_model(self, object_name: str) -> None:
         try:
-            self.client.remove_object(settings.MINIO_BUCKET, object_name)
-        except S3Error as e:
+            self.backend.delete(object_name)
+        except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Ошибка при удалении модели: {str(e)}"
             )
 
-    def get_model_url(self, object_name: str, expires: int = 3600) -> str:
+    def save_file(self, file_path: str, object_name: str, content_type: str = "application/octet-stream") -> str:
         try:
-            return self.client.presigned_get_object(
-                settings.MINIO_BUCKET,
-                object_name,
-                expires=expires
+            self.backend.put_file(object_name, file_path, content_type=content_type)
+
+            return object_name
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Ошибка при сохранении файла: {str(e)}"
             )
-        except S3Error as e:
+
+    def download_file(self, object_name: str, file_path: str) -> None:
+        try:
+            self.backend.get_file(object_name, file_path)
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Ошибка при загрузке файла: {str(e)}"
+            )
+
+    def delete_file(self, object_name: str) -> None:
+        try:
+            self.backend.delete(object_name)
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Ошибка при удалении файла: {str(e)}"
+            )
+
+    def get_model_url(self, object_name: str, expires: int = 3600) -> str:
+        return self.get_file_url(object_name, expires)
+
+    def get_file_url(self, object_name: str, expires: int = 3600, filename: Optional[str] = None) -> str:
+        try:
+            return self.backend.presigned_url(object_name, expires, filename=filename)
+        except Exception as e:
             raise HTTPException(
                 status_code=400,
                 detail=f"Ошибка при генерации ссылки: {str(e)}"
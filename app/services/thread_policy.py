@@ -0,0 +1,181 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Iterator, Optional, Tuple
+
+from threadpoolctl import ThreadpoolController
+
+from app.core.config import settings
+from app.core.metrics import THREAD_BUDGET_IN_USE, THREAD_BUDGET_WAIT
+
+class ThreadBudget:
+    """
+    Общий на процесс запас потоков для одновременно выполняемых предсказаний.
+
+    Вызов резервирует столько потоков, сколько использует модель, и ждет,
+    пока запас не освободится. Так параллельные модели не запускают больше
+    потоков, чем есть ядер, даже при многих одновременных запросах.
+    Ожидающие получают потоки в порядке очереди, иначе хвост задержек
+    растет из-за вызовов, которые раз за разом проигрывают гонку.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+
+        self._in_use = 0
+        self._waiters: Deque[Tuple[int, threading.Event]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def acquire(self, threads: int) -> int:
+        # Запрос больше всего запаса ждал бы вечно
+        threads = min(threads, self.total)
+
+        with self._lock:
+            if not self._waiters and self._in_use + threads <= self.total:
+                self._in_use += threads
+                THREAD_BUDGET_IN_USE.set(self._in_use)
+                THREAD_BUDGET_WAIT.observe(0.0)
+
+                return threads
+
+            granted = threading.Event()
+            self._waiters.append((threads, granted))
+
+        wait_start = time.perf_counter()
+        granted.wait()
+        THREAD_BUDGET_WAIT.observe(time.perf_counter() - wait_start)
+
+        return threads
+
+    def release(self, threads: int) -> None:
+        with self._lock:
+            self._in_use -= threads
+
+            # Потоки передаются ожидающим под блокировкой, поэтому новый вызов не может их перехватить
+            while self._waiters and self._in_use + self._waiters[0][0] <= self.total:
+                waiter_threads, granted = self._waiters.popleft()
+                self._in_use += waiter_threads
+                granted.set()
+
+            THREAD_BUDGET_IN_USE.set(self._in_use)
+
+    @contextmanager
+    def reserve(self, threads: int) -> Iterator[int]:
+        threads = self.acquire(threads)
+
+        try:
+            yield threads
+        finally:
+            self.release(threads)
+
+def set_n_jobs(model: Any, n_jobs: Optional[int]) -> int:
+    """
+    Переопределяет n_jobs у модели и всех вложенных оценщиков.
+
+    Возвращает число измененных параметров.
+    """
+    if not hasattr(model, "get_params"):
+        if hasattr(model, "n_jobs"):
+            model.n_jobs = n_jobs
+            return 1
+
+        return 0
+
+    params = {
+        name: n_jobs for name, value in model.get_params(deep=True).items()
+        if (name == "n_jobs" or name.endswith("__n_jobs")) and value != n_jobs
+    }
+
+    if params:
+        model.set_params(**params)
+
+    changed = len(params)
+
+    # Обученные ансамбли (VotingClassifier, StackingClassifier) держат копии оценщиков вне get_params,
+    # в том числе составные (Pipeline), поэтому обходим их рекурсивно
+    for estimator in getattr(model, "estimators_", None) or []:
+        changed += set_n_jobs(estimator, n_jobs)
+
+    return changed
+
+class ThreadPolicy:
+    """
+    Политика потоков для предсказаний.
+
+    threads_per_call - потоков на один вызов модели: значение n_jobs,
+    выставляемое при загрузке, и лимит пулов OpenMP на время вызова.
+    Модель может задать свое значение в поле inference_threads. Пулы BLAS
+    (OpenBLAS, MKL) общие на процесс, поэтому их лимит threads_per_call
+    выставляется для процесса целиком. 0 отключает политику: модели
+    работают с сохраненным n_jobs.
+    """
+
+    def __init__(self, threads_per_call: int, budget: int):
+        self.threads_per_call = threads_per_call
+        self.budget = ThreadBudget(budget or os.cpu_count() or 1)
+
+        self._controller = None
+        self._controller_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threads_per_call > 0
+
+    @property
+    def controller(self) -> Any:
+        # Создание контроллера перечисляет загруженные библиотеки и стоит миллисекунды
+        if self._controller is None:
+            with self._controller_lock:
+                if self._controller is None:
+                    self._controller = ThreadpoolController()
+
+        return self._controller
+
+    def configure_process(self) -> None:
+        """
+        Выставляет лимит пулов BLAS на процесс.
+
+        Вызывается после загрузки каждой модели: десериализация может
+        подгрузить библиотеки со своими пулами потоков, которых еще нет в
+        кэшированном контроллере.
+        """
+        if not self.enabled:
+            return
+
+        controller = ThreadpoolController()
+        controller.limit(limits=self.threads_per_call, user_api="blas")
+
+        with self._controller_lock:
+            self._controller = controller
+
+    def threads_for(self, inference_threads: Optional[int]) -> Optional[int]:
+        if not self.enabled:
+            return None
+
+        return inference_threads or self.threads_per_call
+
+    def apply(self, model: Any, threads: Optional[int]) -> None:
+        if threads is not None:
+            set_n_jobs(model, threads)
+
+    @contextmanager
+    def limit(self, threads: Optional[int]) -> Iterator[None]:
+        if threads is None:
+            yield
+            return
+
+        with self.budget.reserve(threads) as reserved:
+            # Число потоков OpenMP хранится на уровне вызывающего потока, поэтому лимит не мешает соседним запросам
+            with self.controller.limit(limits=reserved, user_api="openmp"):
+                yield
+
+thread_policy = ThreadPolicy(
+    threads_per_call=settings.MODEL_INFERENCE_THREADS,
+    budget=settings.MODEL_THREAD_BUDGET,
+)
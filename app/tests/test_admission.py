@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.services.admission import AdmissionController
+
+async def start_waiters(controller, count):
+    tasks = [asyncio.create_task(controller.acquire()) for _ in range(count)]
+    # Ожидающие встают в очередь в порядке создания задач
+    await asyncio.sleep(0)
+
+    return tasks
+
+def test_full_queue_is_shed_with_retry_after():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue_size=1, max_queue_wait=5.0)
+        started_at = await controller.acquire()
+        [waiter] = await start_waiters(controller, 1)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await controller.acquire()
+
+        controller.release(started_at)
+        await waiter
+
+        return exc_info.value
+
+    exc = asyncio.run(scenario())
+
+    assert exc.status_code == 503
+    assert exc.headers["Retry-After"] == "1"
+
+def test_slots_are_handed_off_in_fifo_order():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue_size=3, max_queue_wait=5.0)
+        started_at = await controller.acquire()
+        first, second, third = await start_waiters(controller, 3)
+
+        # Отмененный ожидающий пропускается, слот достается следующему по очереди
+        first.cancel()
+        await asyncio.sleep(0)
+        controller.release(started_at)
+        second_started_at = await asyncio.wait_for(second, 1.0)
+
+        assert not third.done()
+        assert controller.in_flight == 1
+        assert controller.queue_size == 1
+
+        controller.release(second_started_at)
+        controller.release(await asyncio.wait_for(third, 1.0))
+
+        assert controller.in_flight == 0
+        assert controller.queue_size == 0
+
+    asyncio.run(scenario())
+
+def test_waiter_is_shed_after_timeout():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queue_size=1, max_queue_wait=0.01)
+        started_at = await controller.acquire()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await controller.acquire()
+
+        assert controller.queue_size == 0
+        controller.release(started_at)
+        assert controller.in_flight == 0
+
+        return exc_info.value
+
+    assert asyncio.run(scenario()).status_code == 503
+
+def test_shed_request_gets_retry_after_header(monkeypatch):
+    monkeypatch.setattr(deps, "prediction_admission", AdmissionController(0, 0, 1.0))
+
+    app = FastAPI()
+
+    @app.get("/predict", dependencies=[Depends(deps.admit_prediction)])
+    def predict():
+        return {}
+
+    response = TestClient(app).get("/predict")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
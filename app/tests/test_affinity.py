@@ -0,0 +1,71 @@
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.api.affinity import FORWARDED_HEADER, WORKER_HEADER, AffinityMiddleware
+from app.core.config import settings
+from app.core.security import create_forward_signature
+from app.services.affinity import AFFINITY_MODE_REDIRECT
+from app.services.hash_ring import WorkerInfo
+
+PATH = f"{settings.API_V1_STR}/models/5/predict"
+
+def make_app(worker_id):
+    async def predict(request):
+        return JSONResponse({"served_by": worker_id})
+
+    return Starlette(routes=[Route(PATH, predict, methods=["POST"])])
+
+def make_middleware(worker_id, owner, mode="forward"):
+    router = SimpleNamespace(
+        enabled=True,
+        mode=mode,
+        worker_id=worker_id,
+        pick=lambda model_id: WorkerInfo(owner, f"http://{owner}:8000", 1.0),
+    )
+
+    return AffinityMiddleware(make_app(worker_id), router=router)
+
+def test_unsigned_forwarded_header_is_ignored():
+    client = TestClient(make_middleware("worker-0", "worker-1", mode=AFFINITY_MODE_REDIRECT))
+    expires_at = int(time.time()) + 30
+    signature = create_forward_signature("worker-1", "POST", PATH, expires_at)
+
+    forged = client.post(PATH, headers={FORWARDED_HEADER: "worker-1"}, follow_redirects=False)
+    other_path = client.post(
+        PATH + "?model_id=6",
+        headers={FORWARDED_HEADER: f"worker-1:{expires_at}:{signature}"},
+        follow_redirects=False,
+    )
+    signed = client.post(PATH, headers={FORWARDED_HEADER: f"worker-1:{expires_at}:{signature}"})
+
+    assert forged.status_code == 307
+    assert forged.headers[WORKER_HEADER] == "worker-1"
+    assert other_path.status_code == 307
+    assert signed.json() == {"served_by": "worker-0"}
+
+def test_forwarded_request_is_served_by_owner():
+    # Владелец сам отправил бы запрос дальше, если бы не принял подпись
+    owner = make_middleware("worker-1", "worker-2")
+    middleware = make_middleware("worker-0", "worker-1")
+    middleware._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=owner))
+
+    response = TestClient(middleware).post(PATH, json={"input_data": [1.0]})
+
+    assert response.status_code == 200
+    assert response.json() == {"served_by": "worker-1"}
+    assert response.headers[WORKER_HEADER] == "worker-1"
+
+def test_client_is_closed_on_shutdown():
+    middleware = make_middleware("worker-0", "worker-1")
+
+    with TestClient(middleware):
+        client = middleware.client
+
+    assert client.is_closed
+    assert middleware._client is None
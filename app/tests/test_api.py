@@ -1,19 +1,24 @@
 import io
 import joblib
+import uuid
+from contextlib import contextmanager
+from types import SimpleNamespace
 
 import pytest
 
 from fastapi.testclient import TestClient
 
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
 import numpy as np
 
 from app.main import app
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, engine
 from app.core.config import settings
-from app.models.models import User
+from app.models.models import MLModel, ModelAlias, Prediction, PredictionJob, User
 from app.core.security import get_password_hash
+from app.services.rate_limit import rate_limiter
 
 client = TestClient(app)
 
@@ -217,6 +222,46 @@ def test_create_prediction_from_file(test_user_token, test_model_file):
     assert "predictions" in data
     assert "file_path" in data
 
+def test_create_prediction_job_from_file(test_user_token, test_model_file):
+    model_response = client.post(
+        "/api/v1/models/",
+        headers={"Authorization": f"Bearer {test_user_token}"},
+        files={"model_file": ("model.joblib", test_model_file, "application/octet-stream")},
+        data={
+            "name": "Test Model",
+            "description": "Test Description",
+            "version": "1.0",
+            "model_type": "regression"
+        }
+    )
+
+    model_id = model_response.json()["id"]
+
+    csv_content = "feature1,feature2,feature3\n1.0,2.0,3.0\n4.0,5.0,6.0"
+    csv_file = io.BytesIO(csv_content.encode())
+
+    response = client.post(
+        "/api/v1/predictions/file",
+        headers={"Authorization": f"Bearer {test_user_token}"},
+        files={"file": ("test.csv", csv_file, "text/csv")},
+        data={"model_id": model_id, "run_async": "true"}
+    )
+
+    assert response.status_code == 202
+
+    job = response.json()
+
+    assert job["status"] in ("queued", "running", "succeeded", "failed")
+    assert job["rows_processed"] == 0
+
+    response = client.get(
+        f"/api/v1/predictions/jobs/{job['id']}",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["id"] == job["id"]
+
 def test_estimate_model_cost(test_user_token, test_model_file):
     response = client.post(
         "/api/v1/models/estimate-cost",
@@ -257,3 +302,201 @@ def test_delete_model(test_user_token, test_model_file):
 
     assert data["is_deleted"] == True
     assert data["is_active"] == False
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+def list_query_count(path: str, token: str) -> int:
+    with count_queries() as statements:
+        response = client.get(path, headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+
+    return len(statements)
+
+def seed_list_rows(db: Session, user: User, count: int) -> None:
+    # У каждой строки своя модель и свой владелец: ленивая загрузка связей дала бы запрос на строку
+    for _ in range(count):
+        owner = User(email=f"{uuid.uuid4().hex}@example.com", hashed_password="x", full_name="Owner")
+        db.add(owner)
+        db.flush()
+
+        model = MLModel(
+            name="Test Model",
+            description="Test Description",
+            version="1.0",
+            model_type="regression",
+            cost_per_prediction=1.0,
+            owner_id=owner.id,
+            is_active=True,
+            is_deleted=False,
+        )
+        db.add(model)
+        db.flush()
+
+        prediction = Prediction(
+            user_id=user.id,
+            model_id=model.id,
+            input_data=[1.0, 2.0, 3.0],
+            prediction_result=[1.0],
+            cost=1.0,
+        )
+        db.add(prediction)
+        db.flush()
+
+        db.add(PredictionJob(
+            user_id=user.id,
+            model_id=model.id,
+            status="succeeded",
+            input_format="csv",
+            output_format="csv",
+            output_mode="label",
+            prediction_id=prediction.id,
+        ))
+        db.add(ModelAlias(name=uuid.uuid4().hex, owner_id=owner.id, model_id=model.id))
+
+    db.commit()
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/models/?limit=1000",
+    "/api/v1/predictions/?limit=1000",
+    "/api/v1/predictions/jobs/?limit=1000",
+    "/api/v1/models/aliases/",
+])
+def test_list_query_count_does_not_grow_with_rows(db, test_user, test_user_token, path):
+    seed_list_rows(db, test_user, 2)
+    before = list_query_count(path, test_user_token)
+
+    seed_list_rows(db, test_user, 10)
+    after = list_query_count(path, test_user_token)
+
+    assert after == before
+
+def test_model_catalog_conditional_requests(test_user_token, test_model_file):
+    model_response = client.post(
+        "/api/v1/models/",
+        headers={"Authorization": f"Bearer {test_user_token}"},
+        files={"model_file": ("model.joblib", test_model_file, "application/octet-stream")},
+        data={
+            "name": "Test Model",
+            "description": "Test Description",
+            "version": "1.0",
+            "model_type": "regression"
+        }
+    )
+
+    model_id = model_response.json()["id"]
+
+    response = client.get("/api/v1/models/")
+    etag = response.headers["etag"]
+
+    assert "last-modified" in response.headers
+
+    with count_queries() as statements:
+        response = client.get("/api/v1/models/", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert statements == []
+
+    model_etag = client.get(f"/api/v1/models/{model_id}").headers["etag"]
+
+    assert client.get(f"/api/v1/models/{model_id}", headers={"If-None-Match": model_etag}).status_code == 304
+
+    client.delete(
+        f"/api/v1/models/{model_id}",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+
+    assert client.get("/api/v1/models/", headers={"If-None-Match": etag}).status_code == 200
+    assert client.get(f"/api/v1/models/{model_id}", headers={"If-None-Match": model_etag}).status_code == 404
+
+def test_predictions_by_model_alias(test_user_token, test_model_file):
+    name = f"Alias Model {uuid.uuid4().hex}"
+
+    model_response = client.post(
+        "/api/v1/models/",
+        headers={"Authorization": f"Bearer {test_user_token}"},
+        files={"model_file": ("model.joblib", test_model_file, "application/octet-stream")},
+        data={
+            "name": name,
+            "description": "Test Description",
+            "version": "1.0",
+            "model_type": "regression"
+        }
+    )
+
+    model_id = model_response.json()["id"]
+
+    response = client.post(
+        f"/api/v1/models/{model_id}/promote",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+
+    assert response.status_code == 202
+
+    response = client.post(
+        "/api/v1/predictions/",
+        headers={"Authorization": f"Bearer {test_user_token}"},
+        json={"model_alias": name, "input_data": [1.0, 2.0, 3.0]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["model_id"] == model_id
+
+    csv_content = "feature1,feature2,feature3\n1.0,2.0,3.0\n4.0,5.0,6.0"
+    csv_file = io.BytesIO(csv_content.encode())
+
+    response = client.post(
+        "/api/v1/predictions/file",
+        headers={"Authorization": f"Bearer {test_user_token}"},
+        files={"file": ("test.csv", csv_file, "text/csv")},
+        data={"model_alias": name}
+    )
+
+    assert response.status_code == 200
+
+    prediction_id = response.json()["prediction_id"]
+
+    response = client.get(
+        f"/api/v1/predictions/{prediction_id}",
+        headers={"Authorization": f"Bearer {test_user_token}"}
+    )
+
+    assert response.json()["model_id"] == model_id
+
+def test_rate_limited_response_has_cors_headers(test_user, test_user_token):
+    origin = "http://localhost:3001"
+    rate_limiter.update(SimpleNamespace(
+        id=test_user.id,
+        plan=None,
+        rate_limit=0.001,
+        rate_burst=1,
+        max_concurrent_predictions=None,
+    ))
+
+    try:
+        responses = [
+            client.post(
+                "/api/v1/predictions/",
+                headers={"Authorization": f"Bearer {test_user_token}", "Origin": origin},
+                json={}
+            )
+            for _ in range(2)
+        ]
+    finally:
+        rate_limiter.update(test_user)
+
+    # Ответ 429 формирует RateLimitMiddleware, до маршрутизатора приложения
+    assert responses[1].status_code == 429
+    assert responses[1].headers["access-control-allow-origin"] == origin
@@ -0,0 +1,38 @@
+import time
+
+from app.core.security import api_key_prefix, create_api_key, hash_api_key
+from app.services.api_keys import ApiKeyCache, ApiKeyEntry
+
+def test_api_key_prefix():
+    key, prefix = create_api_key()
+
+    assert api_key_prefix(key) == prefix
+    assert api_key_prefix(f"ik_{prefix}_") is None
+    # JWT не принимается за API-ключ
+    assert api_key_prefix("eyJhbGciOiJIUzI1NiJ9.e30.sig") is None
+
+def test_cached_key_is_verified_without_database():
+    key, prefix = create_api_key()
+    cache = ApiKeyCache(ttl=60)
+    cache._entries[prefix] = ApiKeyEntry(7, hash_api_key(key), True, time.monotonic() + 60)
+    loads = []
+    cache.load = lambda prefix, db=None: loads.append(prefix)
+
+    assert cache.verify(key) == 7
+    assert cache.verify(key[:-1] + ("A" if key[-1] != "A" else "B")) is None
+    assert loads == []
+
+    cache.invalidate(prefix)
+
+    assert cache.verify(key) is None
+    assert loads == [prefix]
+
+def test_key_of_inactive_owner_is_rejected_from_cache():
+    key, prefix = create_api_key()
+    cache = ApiKeyCache(ttl=60)
+    cache._entries[prefix] = ApiKeyEntry(7, hash_api_key(key), False, time.monotonic() + 60)
+    loads = []
+    cache.load = lambda prefix, db=None: loads.append(prefix)
+
+    assert cache.verify(key) is None
+    assert loads == []
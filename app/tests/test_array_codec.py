@@ -0,0 +1,52 @@
+import io
+
+import numpy as np
+import pytest
+
+from app.services.array_codec import CONTENT_TYPE_NDARRAY, CONTENT_TYPE_NPY, decode_array, encode_arrays
+
+def test_raw_input_is_read_without_copy():
+    X = np.arange(6, dtype="<f4").reshape(2, 3)
+    body = X.tobytes()
+
+    decoded = decode_array(body, CONTENT_TYPE_NDARRAY, {"x-array-dtype": "float32", "x-array-shape": "2,3"})
+
+    assert np.array_equal(decoded, X)
+    assert np.shares_memory(decoded, np.frombuffer(body, dtype=np.uint8))
+
+def test_npy_input_keeps_fortran_order():
+    X = np.asfortranarray(np.random.rand(4, 3))
+    buffer = io.BytesIO()
+    np.save(buffer, X)
+
+    assert np.array_equal(decode_array(buffer.getvalue(), CONTENT_TYPE_NPY, {}), X)
+
+def test_invalid_input_is_rejected():
+    with pytest.raises(ValueError):
+        decode_array(b"\0" * 10, CONTENT_TYPE_NDARRAY, {"x-array-dtype": "float32", "x-array-shape": "2,3"})
+
+    buffer = io.BytesIO()
+    np.save(buffer, np.array([["a"]], dtype=object), allow_pickle=True)
+
+    with pytest.raises(ValueError):
+        decode_array(buffer.getvalue(), CONTENT_TYPE_NPY, {})
+
+def test_output_round_trip():
+    labels = np.array([1, 0, 1])
+    probabilities = np.random.rand(3, 2)
+
+    content, headers = encode_arrays(CONTENT_TYPE_NDARRAY, labels, probabilities)
+    split = labels.nbytes
+
+    assert headers["x-array-shape"] == "3" and headers["x-proba-shape"] == "3,2"
+    assert np.array_equal(np.frombuffer(content[:split], dtype=headers["x-array-dtype"]), labels)
+    assert np.array_equal(np.frombuffer(content[split:], dtype=headers["x-proba-dtype"]).reshape(3, 2), probabilities)
+
+    content, _ = encode_arrays(CONTENT_TYPE_NPY, labels, probabilities)
+    stream = io.BytesIO(content)
+
+    assert np.array_equal(np.load(stream), labels)
+    assert np.array_equal(np.load(stream), probabilities)
+
+    with pytest.raises(ValueError):
+        encode_arrays(CONTENT_TYPE_NPY, np.array(["a", "b"]), None)
@@ -0,0 +1,51 @@
+from app.services.hash_ring import ModelLoad, WorkerInfo, assign_models
+
+def make_workers(count, weight=1.0):
+    return [WorkerInfo(f"worker-{i}", f"http://worker-{i}:8000", weight) for i in range(count)]
+
+def make_models(count, size=100):
+    return [ModelLoad(model_id, size) for model_id in range(1, count + 1)]
+
+def test_assignment_is_deterministic():
+    workers = make_workers(3)
+    models = make_models(50)
+
+    assert assign_models(workers, models) == assign_models(list(reversed(workers)), list(reversed(models)))
+
+def test_joining_worker_moves_few_models():
+    models = make_models(200)
+
+    before = assign_models(make_workers(4), models, load_factor=10.0)
+    after = assign_models(make_workers(5), models, load_factor=10.0)
+
+    moved = [model_id for model_id in before if before[model_id] != after[model_id]]
+
+    # Новый воркер забирает примерно пятую часть моделей, остальные остаются на месте
+    assert 0 < len(moved) < len(models) / 2
+    assert all(after[model_id] == ["worker-4"] for model_id in moved)
+
+def test_weight_and_load_factor_bound_assigned_bytes():
+    workers = [WorkerInfo("big", "http://big:8000", 3.0), WorkerInfo("small", "http://small:8000", 1.0)]
+    models = make_models(100)
+
+    assignment = assign_models(workers, models, load_factor=1.1)
+    owned = {worker.worker_id: 0 for worker in workers}
+
+    for owners in assignment.values():
+        owned[owners[0]] += 1
+
+    assert owned["big"] > owned["small"]
+    assert owned["small"] <= 100 * 1.1 / 4
+
+def test_popular_models_get_replicas():
+    workers = make_workers(4)
+    models = [ModelLoad(1, 100, requests=2500), ModelLoad(2, 100, requests=10)]
+
+    assignment = assign_models(workers, models, requests_per_replica=1000, max_replicas=2)
+
+    assert len(assignment[1]) == 2
+    assert len(set(assignment[1])) == 2
+    assert len(assignment[2]) == 1
+
+def test_no_workers_means_no_assignment():
+    assert assign_models([], make_models(3)) == {}
@@ -0,0 +1,83 @@
+import io
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+import pytest
+
+from app.services.input_service import (
+    INPUT_FORMAT_ARROW,
+    INPUT_FORMAT_CSV,
+    INPUT_FORMAT_PARQUET,
+    detect_input_format,
+    read_prediction_input,
+)
+
+TABLE = pa.table({
+    "b": pa.array([2.0, 5.0, 8.0]),
+    "extra": pa.array(["x", "y", "z"]),
+    "a": pa.array([1, 4, 7], type=pa.int32()),
+})
+
+EXPECTED = np.array([[1.0, 2.0], [4.0, 5.0], [7.0, 8.0]])
+
+def parquet_file():
+    buffer = io.BytesIO()
+    pq.write_table(TABLE, buffer)
+    buffer.seek(0)
+
+    return buffer
+
+def arrow_file(stream=False):
+    buffer = io.BytesIO()
+    open_writer = pa.ipc.new_stream if stream else pa.ipc.new_file
+
+    # Две записи: колонки читаются по чанкам
+    with open_writer(buffer, TABLE.schema) as writer:
+        for batch in TABLE.to_batches(max_chunksize=2):
+            writer.write_batch(batch)
+
+    buffer.seek(0)
+
+    return buffer
+
+def csv_file():
+    return io.BytesIO(b"b,extra,a\n2.0,x,1\n5.0,y,4\n8.0,z,7\n")
+
+def test_format_is_detected_by_signature_before_content_type():
+    assert detect_input_format(parquet_file(), "text/csv") == INPUT_FORMAT_PARQUET
+    assert detect_input_format(arrow_file(), "application/octet-stream") == INPUT_FORMAT_ARROW
+    assert detect_input_format(arrow_file(stream=True)) == INPUT_FORMAT_ARROW
+    assert detect_input_format(csv_file(), "application/vnd.apache.parquet; charset=binary") == INPUT_FORMAT_PARQUET
+    assert detect_input_format(csv_file(), "application/octet-stream") == INPUT_FORMAT_CSV
+    assert detect_input_format(csv_file()) == INPUT_FORMAT_CSV
+
+@pytest.mark.parametrize("make_file, input_format", [
+    (csv_file, INPUT_FORMAT_CSV),
+    (parquet_file, INPUT_FORMAT_PARQUET),
+    (arrow_file, INPUT_FORMAT_ARROW),
+    (lambda: arrow_file(stream=True), INPUT_FORMAT_ARROW),
+])
+def test_columns_are_selected_in_model_order(make_file, input_format):
+    prediction_input = read_prediction_input(make_file(), feature_names=["a", "b"], n_features=2)
+
+    assert prediction_input.input_format == input_format
+    assert prediction_input.columns == ["a", "b"]
+    assert prediction_input.values.dtype == np.float64
+    assert prediction_input.values.flags.c_contiguous
+    np.testing.assert_array_equal(prediction_input.values, EXPECTED)
+
+@pytest.mark.parametrize("make_file", [csv_file, parquet_file, arrow_file])
+def test_missing_feature_is_rejected(make_file):
+    with pytest.raises(ValueError, match="missing_feature"):
+        read_prediction_input(make_file(), feature_names=["a", "missing_feature"])
+
+def test_feature_count_is_checked_without_names():
+    prediction_input = read_prediction_input(io.BytesIO(b"x,y\n1,2\n3,4\n"), n_features=2)
+
+    assert prediction_input.columns == ["x", "y"]
+    np.testing.assert_array_equal(prediction_input.values, [[1.0, 2.0], [3.0, 4.0]])
+
+    with pytest.raises(ValueError, match="3"):
+        read_prediction_input(io.BytesIO(b"x,y\n1,2\n"), n_features=3)
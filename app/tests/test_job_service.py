@@ -0,0 +1,45 @@
+import threading
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from app.services import job_service
+from app.services.job_service import JobLease
+
+def test_lease_is_renewed_until_taken_over(monkeypatch):
+    started_at = datetime.utcnow()
+    calls = []
+    taken_over = threading.Event()
+
+    def heartbeat(db, *, job_id, started_at):
+        calls.append((job_id, started_at))
+
+        if len(calls) < 3:
+            return True
+
+        taken_over.set()
+        return False
+
+    monkeypatch.setattr(job_service, "SessionLocal", MagicMock)
+    monkeypatch.setattr(job_service.crud_job, "heartbeat", heartbeat)
+
+    with JobLease(7, started_at, 0.01) as lease:
+        assert taken_over.wait(5)
+
+    assert lease.lost
+    assert calls == [(7, started_at)] * 3
+
+def test_lease_survives_heartbeat_errors(monkeypatch):
+    calls = []
+
+    def heartbeat(db, *, job_id, started_at):
+        calls.append(job_id)
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(job_service, "SessionLocal", MagicMock)
+    monkeypatch.setattr(job_service.crud_job, "heartbeat", heartbeat)
+
+    with JobLease(7, datetime.utcnow(), 0.01) as lease:
+        while len(calls) < 2:
+            threading.Event().wait(0.01)
+
+    assert not lease.lost
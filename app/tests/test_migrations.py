@@ -0,0 +1,47 @@
+import io
+import re
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+from app.db.base import Base
+
+ROOT = Path(__file__).resolve().parents[2]
+
+def migration_sql() -> str:
+    output = io.StringIO()
+    config = Config(str(ROOT / "alembic.ini"), stdout=output)
+    config.set_main_option("script_location", str(ROOT / "alembic"))
+    config.output_buffer = output
+
+    command.upgrade(config, "head", sql=True)
+
+    return output.getvalue()
+
+def migrated_columns(sql: str) -> set:
+    columns = set()
+
+    for table, body in re.findall(r"CREATE TABLE (\w+) \((.*?)\n\);", sql, re.S):
+        for line in body.splitlines():
+            match = re.match(r"\s+(\w+) ", line)
+
+            if match and match.group(1) not in ("PRIMARY", "FOREIGN", "UNIQUE", "CONSTRAINT"):
+                columns.add((table, match.group(1)))
+
+    columns.update(re.findall(r"ALTER TABLE (\w+) ADD COLUMN (\w+)", sql))
+
+    return columns
+
+def test_migrations_cover_every_mapped_column():
+    # Колонка, добавленная в модель без миграции, сломает существующие установки
+    columns = migrated_columns(migration_sql())
+
+    missing = [
+        f"{table.name}.{column.name}"
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if (table.name, column.name) not in columns
+    ]
+
+    assert missing == []
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestClassifier, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, LogisticRegression, Ridge
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
+
+from app.services import model_compiler
+from app.services.model_compiler import (
+    INFERENCE_ENGINE_COMPILED,
+    INFERENCE_ENGINE_NATIVE,
+    CompiledLinearModel,
+    CompiledTreeEnsemble,
+    compile_model,
+    select_inference_engine,
+)
+
+rng = np.random.default_rng(0)
+X_TRAIN = rng.normal(size=(300, 5))
+Y_BINARY = (X_TRAIN[:, 0] + X_TRAIN[:, 1] > 0).astype(int)
+Y_MULTICLASS = np.digitize(X_TRAIN[:, 0], [-0.5, 0.5])
+Y_REGRESSION = X_TRAIN @ np.arange(1, 6) + rng.normal(size=300)
+
+def threshold_rows(compiled: CompiledTreeEnsemble) -> np.ndarray:
+    # Каждая строка попадает ровно на порог какого-то узла: проверяется сравнение <=
+    split = compiled.children[::2] != np.arange(len(compiled.feature))
+    X = rng.normal(size=(int(split.sum()), compiled.n_features_in_))
+    X[np.arange(len(X)), compiled.feature[split]] = compiled.threshold[split]
+
+    return X
+
+def assert_same_predictions(model, compiled, X):
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+
+    if compiled.is_classifier:
+        np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=1e-12, atol=0)
+
+@pytest.mark.parametrize("model, y", [
+    (DecisionTreeClassifier(random_state=0), Y_BINARY),
+    (RandomForestClassifier(n_estimators=10, random_state=0), Y_MULTICLASS),
+    (DecisionTreeRegressor(random_state=0), Y_REGRESSION),
+    (RandomForestRegressor(n_estimators=10, random_state=0), Y_REGRESSION),
+    (ExtraTreesRegressor(n_estimators=5, random_state=0), np.stack([Y_REGRESSION, -Y_REGRESSION], axis=1)),
+])
+def test_tree_ensembles_match_sklearn(model, y):
+    model.fit(X_TRAIN, y)
+    compiled = compile_model(model)
+
+    assert isinstance(compiled, CompiledTreeEnsemble)
+
+    X = np.vstack([rng.normal(scale=3.0, size=(200, 5)), threshold_rows(compiled)])
+
+    assert compiled.accepts(X)
+    assert_same_predictions(model, compiled, X)
+    assert select_inference_engine(model) == INFERENCE_ENGINE_COMPILED
+
+@pytest.mark.parametrize("model, y", [
+    (LogisticRegression(), Y_BINARY),
+    (LogisticRegression(), Y_MULTICLASS),
+    (LinearRegression(), Y_REGRESSION),
+    (Ridge(), Y_REGRESSION),
+])
+def test_linear_models_match_sklearn(model, y):
+    model.fit(X_TRAIN, y)
+    compiled = compile_model(model)
+
+    assert isinstance(compiled, CompiledLinearModel)
+
+    X = rng.normal(scale=3.0, size=(200, 5))
+
+    if compiled.is_classifier:
+        assert_same_predictions(model, compiled, X)
+    else:
+        np.testing.assert_allclose(compiled.predict(X), model.predict(X), rtol=1e-12)
+
+    assert select_inference_engine(model) == INFERENCE_ENGINE_COMPILED
+
+def test_non_finite_and_wrong_width_input_is_left_to_sklearn():
+    compiled = compile_model(RandomForestClassifier(n_estimators=3, random_state=0).fit(X_TRAIN, Y_BINARY))
+    X = rng.normal(size=(4, 5))
+
+    assert compiled.accepts(X)
+    assert not compiled.accepts(X[:, :4])
+
+    X[0, 0] = np.nan
+
+    assert not compiled.accepts(X)
+
+def test_mismatch_falls_back_to_native(monkeypatch):
+    model = RandomForestClassifier(n_estimators=3, random_state=0).fit(X_TRAIN, Y_BINARY)
+
+    monkeypatch.setattr(CompiledTreeEnsemble, "predict", lambda self, X: np.zeros(len(X), dtype=int))
+
+    assert select_inference_engine(model) == INFERENCE_ENGINE_NATIVE
+
+def test_compilation_error_falls_back_to_native(monkeypatch):
+    model = LinearRegression().fit(X_TRAIN, Y_REGRESSION)
+
+    def fail(model):
+        raise RuntimeError("unexpected model layout")
+
+    monkeypatch.setattr(model_compiler, "compile_model", fail)
+
+    assert select_inference_engine(model) == INFERENCE_ENGINE_NATIVE
+
+def test_unsupported_model_stays_native():
+    model = SVC().fit(X_TRAIN, Y_BINARY)
+
+    assert compile_model(model) is None
+    assert select_inference_engine(model) == INFERENCE_ENGINE_NATIVE
@@ -0,0 +1,161 @@
+import io
+import threading
+import time
+from types import SimpleNamespace
+
+import joblib
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from app.services import model_registry as registry_module
+from app.services import model_service
+from app.services.model_registry import ModelRegistry
+
+CONCURRENT_REQUESTS = 16
+
+class SlowStorage:
+    """
+    Хранилище, которое отдает артефакт с задержкой, чтобы все запросы успели прийти во время загрузки.
+    """
+
+    def __init__(self, data: bytes, error: Exception = None):
+        self.data = data
+        self.error = error
+        self.fetches = 0
+        self._lock = threading.Lock()
+
+    def _fetch(self) -> bytes:
+        with self._lock:
+            self.fetches += 1
+
+        time.sleep(0.2)
+
+        if self.error is not None:
+            raise self.error
+
+        return self.data
+
+    def download_model(self, object_name, file_path):
+        data = self._fetch()
+
+        with open(file_path, "wb") as f:
+            f.write(data)
+
+    def load_model(self, object_name):
+        return self._fetch()
+
+@pytest.fixture
+def artifact():
+    model = LinearRegression().fit([[0.0], [1.0]], [0.0, 1.0])
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+
+    return buffer.getvalue()
+
+def make_model(model_id, sha256=None):
+    return SimpleNamespace(
+        id=model_id,
+        name="model",
+        model_path=f"artifacts/{sha256}.joblib" if sha256 else "models/legacy.joblib",
+        artifact_sha256=sha256,
+        inference_engine=None,
+        inference_threads=None,
+    )
+
+def request_concurrently(registry, models):
+    results = [None] * len(models)
+    barrier = threading.Barrier(len(models))
+
+    def request(index):
+        barrier.wait()
+
+        try:
+            results[index] = registry.get(models[index])
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=request, args=(index,)) for index in range(len(models))]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    return results
+
+def test_concurrent_cold_requests_fetch_artifact_once(artifact, tmp_path, monkeypatch):
+    sha256 = model_service.hashlib.sha256(artifact).hexdigest()
+    storage = SlowStorage(artifact)
+
+    monkeypatch.setattr(model_service, "MODELS_DIR", str(tmp_path))
+    monkeypatch.setattr(model_service, "storage_service", storage)
+
+    registry = ModelRegistry(max_models=4, max_bytes=1024 ** 3)
+    models = [make_model(model_id, sha256) for model_id in range(1, CONCURRENT_REQUESTS + 1)]
+
+    results = request_concurrently(registry, models)
+
+    assert storage.fetches == 1
+    assert all(result is results[0] for result in results)
+    assert results[0].model_ids == list(range(1, CONCURRENT_REQUESTS + 1))
+    assert len(registry.resident()) == 1
+
+def test_concurrent_cold_requests_share_load_error(tmp_path, monkeypatch):
+    storage = SlowStorage(b"", error=RuntimeError("storage is down"))
+
+    monkeypatch.setattr(registry_module, "storage_service", storage)
+
+    registry = ModelRegistry(max_models=4, max_bytes=1024 ** 3)
+    models = [make_model(1) for _ in range(CONCURRENT_REQUESTS)]
+
+    results = request_concurrently(registry, models)
+
+    assert storage.fetches == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert registry.resident() == []
+
+    # Ошибка не кэшируется: следующий запрос пробует загрузить модель заново
+    with pytest.raises(RuntimeError):
+        registry.get(make_model(1))
+
+    assert storage.fetches == 2
+
+def test_pin_resident_does_not_load_or_take_over_pins(artifact, tmp_path, monkeypatch):
+    sha256 = model_service.hashlib.sha256(artifact).hexdigest()
+    storage = SlowStorage(artifact)
+
+    monkeypatch.setattr(model_service, "MODELS_DIR", str(tmp_path))
+    monkeypatch.setattr(model_service, "storage_service", storage)
+
+    registry = ModelRegistry(max_models=4, max_bytes=1024 ** 3)
+
+    assert not registry.pin_resident(1)
+    assert storage.fetches == 0
+
+    registry.get(make_model(1, sha256))
+
+    assert registry.pin_resident(1)
+    # Уже закрепленную модель снимать должен тот, кто ее закрепил
+    assert not registry.pin_resident(1)
+
+def test_warmed_alias_versions_stay_within_cache_limits(artifact, tmp_path, monkeypatch):
+    from app.services import model_aliases
+
+    storage = SlowStorage(artifact)
+    registry = ModelRegistry(max_models=2, max_bytes=1024 ** 3)
+
+    monkeypatch.setattr(registry_module, "storage_service", storage)
+    monkeypatch.setattr(model_aliases, "model_registry", registry)
+
+    for model_id in range(1, 5):
+        model = make_model(model_id)
+        model.model_path = f"models/{model_id}.joblib"
+        model.n_features = None
+
+        model_aliases.warm_model(model)
+
+    resident = registry.resident()
+
+    assert len(resident) == 2
+    assert not any(entry.pinned for entry in resident)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.svm import SVC
+
+from app.services.model_registry import LoadedModel
+from app.services.model_service import (
+    OUTPUT_MODE_BOTH,
+    OUTPUT_MODE_LABEL,
+    OUTPUT_MODE_PROBA,
+    run_prediction,
+)
+
+X, y = make_classification(n_samples=200, n_features=6, n_informative=4, n_classes=3, flip_y=0.2, random_state=0)
+
+def loaded(model):
+    return LoadedModel("artifact", "model", model, 0, 0.0)
+
+def test_label_and_proba_modes():
+    model = LogisticRegression(max_iter=1000).fit(X, y)
+
+    label_output = run_prediction(loaded(model), X, OUTPUT_MODE_LABEL)
+    proba_output = run_prediction(loaded(model), X, OUTPUT_MODE_PROBA)
+
+    np.testing.assert_array_equal(label_output.labels, model.predict(X))
+    assert label_output.probabilities is None
+    assert proba_output.labels is None
+    np.testing.assert_allclose(proba_output.probabilities, model.predict_proba(X))
+    assert proba_output.classes_list() == [0, 1, 2]
+
+def test_both_mode_takes_labels_from_probabilities():
+    model = LogisticRegression(max_iter=1000).fit(X, y)
+    loaded_model = loaded(model)
+    # Метки должны получаться из predict_proba без второго прохода модели
+    loaded_model.predict = None
+
+    output = run_prediction(loaded_model, X, OUTPUT_MODE_BOTH)
+
+    np.testing.assert_array_equal(output.labels, model.predict(X))
+    np.testing.assert_allclose(output.probabilities, model.predict_proba(X))
+
+def test_both_mode_keeps_svc_predict():
+    model = SVC(probability=True, random_state=0).fit(X, y)
+    argmax_labels = model.classes_.take(np.argmax(model.predict_proba(X), axis=1))
+
+    output = run_prediction(loaded(model), X, OUTPUT_MODE_BOTH)
+
+    # Калибровка Платта расходится с predict на части строк: метки берутся из predict
+    assert (argmax_labels != model.predict(X)).any()
+    np.testing.assert_array_equal(output.labels, model.predict(X))
+    np.testing.assert_allclose(output.probabilities, model.predict_proba(X))
+
+def test_multioutput_probabilities_are_stacked():
+    Y = np.stack([y, (y > 0).astype(int)], axis=1)
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, Y)
+
+    output = run_prediction(loaded(model), X, OUTPUT_MODE_BOTH)
+
+    assert output.probabilities.shape == (len(X), 2, 3)
+    np.testing.assert_array_equal(output.probabilities[:, 1, 2], 0.0)
+    np.testing.assert_array_equal(output.labels, model.predict(X))
+    assert output.classes_list() == [[0, 1, 2], [0, 1]]
+
+def test_regressor_without_probabilities():
+    model = LinearRegression().fit(X, y)
+
+    output = run_prediction(loaded(model), X, OUTPUT_MODE_BOTH)
+
+    np.testing.assert_allclose(output.labels, model.predict(X))
+    assert output.probabilities is None
+
+    with pytest.raises(ValueError):
+        run_prediction(loaded(model), X, OUTPUT_MODE_PROBA)
@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression, LogisticRegression
+
+from app.core.config import settings
+from app.services import parallel_scoring
+from app.services.model_service import OUTPUT_MODE_BOTH, OUTPUT_MODE_LABEL, PROFILE_BATCH_ROWS
+from app.services.parallel_scoring import ShardedScorer
+
+rng = np.random.default_rng(0)
+X_TRAIN = rng.normal(size=(200, 4))
+
+class RecordingSharedMemory(parallel_scoring.SharedMemory):
+    # Подменяется только в родительском процессе: дочерние открывают сегмент по имени
+    names = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.names.append(self.name)
+
+def assert_unlinked(name):
+    with pytest.raises(FileNotFoundError):
+        parallel_scoring.SharedMemory(name=name)
+
+@pytest.fixture(scope="module")
+def scorer():
+    scorer = ShardedScorer(workers=2, shard_rows=7)
+
+    yield scorer
+
+    scorer.shutdown()
+
+@pytest.fixture
+def recorded_shm(monkeypatch):
+    RecordingSharedMemory.names = []
+    monkeypatch.setattr(parallel_scoring, "SharedMemory", RecordingSharedMemory)
+
+    return RecordingSharedMemory.names
+
+def dump(model, tmp_path):
+    path = tmp_path / "model.joblib"
+    joblib.dump(model, path)
+
+    return str(path)
+
+def test_shards_are_merged_in_row_order(scorer, tmp_path, recorded_shm):
+    model = LinearRegression().fit(X_TRAIN, X_TRAIN @ np.arange(1, 5))
+    X = rng.normal(size=(50, 4))
+    progress = []
+
+    output = scorer.score_artifact(dump(model, tmp_path), None, X, OUTPUT_MODE_LABEL, progress.append)
+
+    np.testing.assert_allclose(output.labels, model.predict(X))
+    assert progress == sorted(progress)
+    assert progress[-1] == 50
+    assert_unlinked(recorded_shm[0])
+
+def test_classifier_probabilities_keep_row_order(scorer, tmp_path):
+    model = LogisticRegression().fit(X_TRAIN, (X_TRAIN[:, 0] > 0).astype(int))
+    X = rng.normal(size=(30, 4))
+
+    output = scorer.score_artifact(dump(model, tmp_path), None, X, OUTPUT_MODE_BOTH)
+
+    np.testing.assert_array_equal(output.labels, model.predict(X))
+    np.testing.assert_allclose(output.probabilities, model.predict_proba(X))
+
+def test_shared_memory_is_unlinked_when_a_shard_fails(scorer, tmp_path, recorded_shm):
+    with pytest.raises(FileNotFoundError):
+        scorer.score_artifact(str(tmp_path / "missing.joblib"), None, rng.normal(size=(20, 4)), OUTPUT_MODE_LABEL)
+
+    assert_unlinked(recorded_shm[0])
+
+def test_shared_memory_is_unlinked_when_progress_callback_fails(scorer, tmp_path, recorded_shm):
+    model = LinearRegression().fit(X_TRAIN, X_TRAIN[:, 0])
+
+    def cancel(rows_processed):
+        raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError):
+        scorer.score_artifact(dump(model, tmp_path), None, rng.normal(size=(20, 4)), OUTPUT_MODE_LABEL, cancel)
+
+    assert_unlinked(recorded_shm[0])
+
+def make_model(sha256="0" * 64, latency_batch=None, load_time=None):
+    return SimpleNamespace(
+        artifact_sha256=sha256,
+        profile_latency_batch=latency_batch,
+        profile_load_time=load_time,
+    )
+
+def test_applies_to_large_content_addressed_inputs():
+    scorer = ShardedScorer(workers=2, shard_rows=100)
+    # Время, за которое 1000 строк считались бы на месте ровно PREDICTION_PARALLEL_MIN_SECONDS
+    threshold_latency = settings.PREDICTION_PARALLEL_MIN_SECONDS * PROFILE_BATCH_ROWS / 1000
+
+    assert not scorer.applies(make_model(sha256=None), 1000)
+    assert not scorer.applies(make_model(), 100)
+    assert scorer.applies(make_model(), 101)
+
+    assert scorer.applies(make_model(latency_batch=threshold_latency), 1000)
+    assert not scorer.applies(make_model(latency_batch=threshold_latency / 2), 1000)
+    # Пул не окупается, если загрузка модели в процессах дольше самого расчета
+    assert not scorer.applies(
+        make_model(latency_batch=threshold_latency, load_time=settings.PREDICTION_PARALLEL_MIN_SECONDS * 2),
+        1000,
+    )
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import deps
+from app.api.endpoints import predictions
+
+def make_app(credits=100.0):
+    app = FastAPI()
+    app.include_router(predictions.router, prefix="/predictions")
+
+    @app.get("/health")
+    async def health():
+        return {}
+
+    def get_db():
+        yield None
+
+    app.dependency_overrides[deps.get_db] = get_db
+    app.dependency_overrides[deps.get_current_active_user] = lambda: SimpleNamespace(id=1, email="user@example.com", credits=credits)
+
+    return app
+
+def test_cold_model_load_does_not_block_other_requests(monkeypatch):
+    loading = threading.Event()
+    release = threading.Event()
+    loaded = threading.Event()
+
+    def slow_get(model):
+        loading.set()
+        release.wait(5)
+        loaded.set()
+
+        raise RuntimeError("артефакт недоступен")
+
+    model = SimpleNamespace(id=1, name="model", n_features=None, feature_names=None, cost_per_prediction=0.0)
+    monkeypatch.setattr(predictions, "get_prediction_model", lambda db, model_id, model_alias: model)
+    monkeypatch.setattr(predictions, "model_registry", SimpleNamespace(get=slow_get))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=make_app())
+
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            upload = asyncio.create_task(client.post(
+                "/predictions/file",
+                files={"file": ("input.csv", b"a,b\n1,2\n", "text/csv")},
+                data={"model_id": "1"},
+            ))
+
+            while not loading.is_set():
+                await asyncio.sleep(0.01)
+
+            # Пока модель загружается в другом потоке, event loop обслуживает остальные запросы
+            health = await asyncio.wait_for(client.get("/health"), 2)
+            still_loading = not loaded.is_set()
+
+            release.set()
+
+            return health, still_loading, await upload
+
+    health, still_loading, upload = asyncio.run(scenario())
+
+    assert health.status_code == 200
+    assert still_loading
+    assert upload.status_code == 500
+    assert "артефакт недоступен" in upload.json()["detail"]
+
+def test_credit_check_after_reading_file_keeps_its_reason(monkeypatch):
+    model = SimpleNamespace(id=1, name="model", n_features=None, feature_names=None, cost_per_prediction=1.0)
+    monkeypatch.setattr(predictions, "get_prediction_model", lambda db, model_id, model_alias: model)
+    monkeypatch.setattr(predictions, "model_registry", SimpleNamespace(get=lambda model: SimpleNamespace(model=object())))
+
+    # Кредитов хватает на одну строку, но не на весь файл
+    response = TestClient(make_app(credits=1.5)).post(
+        "/predictions/file",
+        files={"file": ("input.csv", b"a,b\n1,2\n3,4\n", "text/csv")},
+        data={"model_id": "1"},
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Недостаточно кредитов для выполнения предсказания"
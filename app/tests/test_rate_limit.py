@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.responses import JSONResponse
+
+from app.api.rate_limit import RateLimitMiddleware
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.services.rate_limit import Quota, RateLimitExceeded, RateLimiter, TokenBucket
+
+def make_user(user_id=1, plan=None, rate_limit=None, rate_burst=None, max_concurrent_predictions=None):
+    return SimpleNamespace(
+        id=user_id,
+        plan=plan,
+        rate_limit=rate_limit,
+        rate_burst=rate_burst,
+        max_concurrent_predictions=max_concurrent_predictions,
+    )
+
+def make_limiter():
+    return RateLimiter(enabled=True, quota_ttl=60, coordination="off", sync_interval=1.0, window=10.0)
+
+def test_token_bucket_allows_burst_then_refills():
+    bucket = TokenBucket(rate=2, burst=3)
+    now = bucket._updated_at
+
+    assert [bucket.take(now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(now) == 0.5
+    assert bucket.take(now + 0.5) == 0.0
+
+def test_quota_overrides_plan():
+    default = settings.RATE_LIMIT_PLANS[settings.RATE_LIMIT_DEFAULT_PLAN]
+    quota = Quota.for_user(make_user(plan="unknown", rate_burst=1))
+
+    assert quota.plan == settings.RATE_LIMIT_DEFAULT_PLAN
+    assert quota.rate == default["rate"]
+    assert quota.burst == 1
+
+def test_concurrency_survives_quota_reload():
+    limiter = make_limiter()
+    limits = limiter.update(make_user(max_concurrent_predictions=1))
+
+    limiter.acquire_inference(limits)
+
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        limiter.acquire_inference(limits)
+
+    assert exc_info.value.limit == "concurrency"
+
+    # Новые лимиты наследуют выполняемые предсказания, освобождение попадает в новую запись
+    fresh = limiter.update(make_user(max_concurrent_predictions=2))
+    assert fresh.in_flight == 1
+
+    limiter.release_inference(1)
+    assert limiter.limits_for(1).in_flight == 0
+
+def test_middleware_rejects_before_endpoint():
+    calls = []
+
+    async def endpoint(scope, receive, send):
+        calls.append(scope["path"])
+        await JSONResponse({"ok": True})(scope, receive, send)
+
+    limiter = make_limiter()
+    limiter.update(make_user(rate_limit=0.1, rate_burst=2))
+    client = TestClient(RateLimitMiddleware(endpoint, limiter=limiter))
+    headers = {"Authorization": f"Bearer {create_access_token(1)}"}
+    path = f"{settings.API_V1_STR}/predictions/"
+
+    statuses = [client.post(path, headers=headers, json={}).status_code for _ in range(3)]
+    rejected = client.post(path, headers=headers, json={})
+
+    assert statuses == [200, 200, 429]
+    assert int(rejected.headers["retry-after"]) >= 1
+    assert len(calls) == 2
+
+    # Без токена и вне API лимит не применяется
+    assert client.post(path, json={}).status_code == 200
+    assert client.get(path, headers=headers).status_code == 200
+    assert limiter.limits_for(1).in_flight == 0
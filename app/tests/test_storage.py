@@ -0,0 +1,72 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import storage
+from app.core.security import verify_download_signature
+from app.services.storage_backends import LocalStorageBackend
+from app.services.storage_service import storage_service
+
+@pytest.fixture
+def local_backend(tmp_path):
+    return LocalStorageBackend(str(tmp_path / "storage"))
+
+def test_local_backend_roundtrip(local_backend, tmp_path):
+    source = tmp_path / "source.bin"
+    source.write_bytes(b"model-bytes")
+
+    local_backend.put_file("artifacts/ab/abc.joblib", str(source))
+
+    assert local_backend.exists("artifacts/ab/abc.joblib")
+    assert local_backend.get_bytes("artifacts/ab/abc.joblib") == b"model-bytes"
+
+    target = tmp_path / "target.bin"
+    local_backend.get_file("artifacts/ab/abc.joblib", str(target))
+
+    assert target.read_bytes() == b"model-bytes"
+
+    local_backend.delete("artifacts/ab/abc.joblib")
+
+    assert not local_backend.exists("artifacts/ab/abc.joblib")
+
+def test_local_backend_rejects_paths_outside_root(local_backend):
+    with pytest.raises(ValueError):
+        local_backend.exists("../outside.joblib")
+
+def test_local_backend_presigned_url_is_verifiable(local_backend):
+    url = local_backend.presigned_url("predictions/1/abc/predictions.csv", expires=60)
+    query = parse_qs(urlparse(url).query)
+
+    expires_at = int(query["expires"][0])
+    signature = query["signature"][0]
+
+    assert verify_download_signature("predictions/1/abc/predictions.csv", expires_at, signature)
+    assert not verify_download_signature("predictions/2/abc/predictions.csv", expires_at, signature)
+    assert not verify_download_signature("predictions/1/abc/predictions.csv", expires_at - 3600, signature)
+
+def test_download_filename_is_signed(local_backend, tmp_path, monkeypatch):
+    source = tmp_path / "source.csv"
+    source.write_bytes(b"a,b\n1,2\n")
+    local_backend.put_file("predictions/1/abc/predictions.csv", str(source))
+    monkeypatch.setattr(storage_service, "_backend", local_backend)
+
+    app = FastAPI()
+    app.include_router(storage.router, prefix="/storage")
+    client = TestClient(app)
+
+    url = urlparse(local_backend.presigned_url("predictions/1/abc/predictions.csv", expires=60, filename="report.csv"))
+    query = {key: value[0] for key, value in parse_qs(url.query).items()}
+
+    response = client.get(f"/storage{url.path}", params=query)
+
+    assert response.status_code == 200
+    assert 'filename="report.csv"' in response.headers["content-disposition"]
+
+    # Подмена или удаление имени файла делает подпись недействительной
+    tampered = {**query, "filename": "payload.html"}
+    unnamed = {key: value for key, value in query.items() if key != "filename"}
+
+    for params in (tampered, unnamed):
+        assert client.get(f"/storage{url.path}", params=params).status_code == 403
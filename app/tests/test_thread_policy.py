@@ -0,0 +1,128 @@
+import threading
+import time
+
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from app.services.thread_policy import ThreadBudget, ThreadPolicy, set_n_jobs
+
+def wait_for_waiters(budget, count):
+    deadline = time.monotonic() + 5
+
+    while len(budget._waiters) < count:
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+def test_concurrent_limits_never_exceed_budget():
+    policy = ThreadPolicy(threads_per_call=2, budget=4)
+    peak = 0
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(16, timeout=5)
+
+    def call():
+        nonlocal peak
+
+        barrier.wait()
+
+        try:
+            with policy.limit(2):
+                with lock:
+                    peak = max(peak, policy.budget.in_use)
+
+                time.sleep(0.01)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call, daemon=True) for _ in range(16)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join(5)
+
+    assert errors == []
+    assert peak == 4
+    assert policy.budget.in_use == 0
+
+def test_waiters_are_granted_in_order():
+    budget = ThreadBudget(total=4)
+    budget.acquire(4)
+
+    granted = []
+    threads = []
+
+    # Второй запрос меньше первого и поместился бы раньше, но ждет своей очереди
+    for name, threads_needed in (("first", 3), ("second", 1), ("third", 2)):
+        def call(name=name, threads_needed=threads_needed):
+            budget.acquire(threads_needed)
+            granted.append(name)
+
+        thread = threading.Thread(target=call, daemon=True)
+        thread.start()
+        threads.append(thread)
+        wait_for_waiters(budget, len(threads))
+
+    budget.release(2)
+    time.sleep(0.05)
+
+    assert granted == []
+
+    budget.release(2)
+    threads[0].join(5)
+    threads[1].join(5)
+
+    # Оба запроса получают потоки одним освобождением, порядок записи в granted не определен
+    assert sorted(granted) == ["first", "second"]
+    assert budget.in_use == 4
+
+    budget.release(3)
+    threads[2].join(5)
+
+    assert granted[2] == "third"
+    assert budget.in_use == 3
+
+def test_request_larger_than_budget_is_capped():
+    budget = ThreadBudget(total=2)
+
+    with budget.reserve(8) as reserved:
+        assert reserved == 2
+        assert budget.in_use == 2
+
+    assert budget.in_use == 0
+
+def test_set_n_jobs_reaches_nested_and_fitted_estimators():
+    X = [[0.0, 1.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0]]
+    y = [0, 1, 1, 0]
+
+    model = VotingClassifier([
+        ("forest", RandomForestClassifier(n_estimators=2, n_jobs=-1)),
+        ("linear", make_pipeline(StandardScaler(), LogisticRegression())),
+    ], n_jobs=-1).fit(X, y)
+
+    assert set_n_jobs(model, 1) > 0
+    assert model.n_jobs == 1
+    assert model.estimators_[0].n_jobs == 1
+    assert model.estimators_[1][-1].n_jobs == 1
+    assert set_n_jobs(model, 1) == 0
+
+def test_policy_threads_and_apply():
+    model = RandomForestClassifier(n_jobs=-1)
+
+    policy = ThreadPolicy(threads_per_call=2, budget=4)
+    policy.apply(model, policy.threads_for(None))
+
+    assert model.n_jobs == 2
+    assert policy.threads_for(3) == 3
+
+    disabled = ThreadPolicy(threads_per_call=0, budget=4)
+    disabled.apply(model, disabled.threads_for(3))
+
+    assert disabled.threads_for(3) is None
+    assert model.n_jobs == 2
+
+    with disabled.limit(None):
+        assert disabled.budget.in_use == 0
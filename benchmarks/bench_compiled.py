@@ -0,0 +1,91 @@
+"""
+Задержка предсказания исходной модели sklearn и скомпилированного движка
+для одиночных строк и батчей.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_compiled.py
+    python benchmarks/bench_compiled.py --batches 1,10,100,1000,100000 --repeat 20
+
+Модели обучаются так же, как в ml_examples/model_train_example.py. Колонка
+auto показывает путь, который выберет сервис: скомпилированный движок, если
+батч для него выгоден, иначе исходная модель.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+from app.services.model_compiler import compile_model, verify_compiled_model
+
+def train_models() -> tuple:
+    X, y = make_classification(
+        n_samples=10000,
+        n_features=20,
+        n_informative=10,
+        n_redundant=5,
+        random_state=42,
+    )
+
+    models = {
+        "random forest": RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y),
+        "logistic regression": LogisticRegression(C=1.0, max_iter=10000, random_state=42).fit(X, y),
+    }
+
+    return models, X
+
+def measure(predict, X: np.ndarray, repeat: int) -> float:
+    predict(X)
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(X)
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batches", default="1,10,100,1000,100000")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    models, X = train_models()
+    rng = np.random.default_rng(0)
+
+    print(f"{'model':20} {'batch':>8} {'sklearn, ms':>12} {'compiled, ms':>13} {'auto, ms':>10} {'speedup':>8}")
+
+    for name, model in models.items():
+        compiled = compile_model(model)
+
+        if not verify_compiled_model(model, compiled):
+            print(f"{name:20} compiled output differs from sklearn, skipped")
+            continue
+
+        def auto(batch, compiled=compiled, model=model):
+            return compiled.predict(batch) if compiled.accepts(batch) else model.predict(batch)
+
+        for batch_size in (int(value) for value in args.batches.split(",")):
+            batch = X[rng.integers(0, len(X), size=batch_size)]
+            repeat = max(1, args.repeat if batch_size <= 1000 else args.repeat // 5)
+
+            native = measure(model.predict, batch, repeat)
+            fast = measure(compiled.predict, batch, repeat)
+            chosen = measure(auto, batch, repeat)
+
+            print(
+                f"{name:20} {batch_size:8} {native * 1000:12.3f} {fast * 1000:13.3f} "
+                f"{chosen * 1000:10.3f} {native / chosen:7.1f}x"
+            )
+
+if __name__ == "__main__":
+    main()
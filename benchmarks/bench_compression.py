@@ -0,0 +1,141 @@
+"""
+Сравнение кодеков сжатия артефактов моделей: размер в хранилище, время
+скачивания и время десериализации.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_compression.py
+    python benchmarks/bench_compression.py --train --fetch
+
+По умолчанию время скачивания оценивается по заданной пропускной
+способности сети. С флагом --fetch артефакты загружаются в хранилище,
+настроенное в .env, и время скачивания измеряется честно.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import joblib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+ML_EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "ml_examples")
+
+CODECS = [
+    ("none", 0),
+    ("zlib", 1),
+    ("zlib", 3),
+    ("zlib", 9),
+    ("lzma", 3),
+    ("lz4", 3),
+]
+
+def lz4_available() -> bool:
+    try:
+        import lz4.frame  # noqa: F401
+    except ImportError:
+        return False
+
+    return True
+
+def train_models() -> dict:
+    from sklearn.datasets import make_classification
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    X, y = make_classification(
+        n_samples=10000,
+        n_features=20,
+        n_informative=10,
+        n_redundant=5,
+        random_state=42,
+    )
+
+    return {
+        "random_forest (trained)": RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y),
+        "logistic_regression (trained)": LogisticRegression(max_iter=10000, random_state=42).fit(X, y),
+    }
+
+def collect_models(train: bool) -> dict:
+    models = {}
+
+    for path in sorted(glob.glob(os.path.join(ML_EXAMPLES_DIR, "*.pkl")) + glob.glob(os.path.join(ML_EXAMPLES_DIR, "*.joblib"))):
+        models[os.path.basename(path)] = joblib.load(path)
+
+    if train:
+        models.update(train_models())
+
+    return models
+
+def median_time(fn, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--train", action="store_true", help="добавить модели, обученные как в ml_examples/model_train_example.py")
+    parser.add_argument("--fetch", action="store_true", help="измерять скачивание через настроенное хранилище")
+    parser.add_argument("--bandwidth", type=float, default=100.0, help="пропускная способность сети в МБ/с для оценки скачивания")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    storage = None
+
+    if args.fetch:
+        from app.services.storage_service import storage_service as storage
+
+    models = collect_models(args.train)
+
+    if not models:
+        print("Нет моделей: положите .pkl/.joblib в ml_examples или используйте --train")
+        return
+
+    codecs = [codec for codec in CODECS if codec[0] != "lz4" or lz4_available()]
+
+    print(f"{'model':32} {'codec':10} {'size, KB':>10} {'fetch, ms':>10} {'load, ms':>10} {'total, ms':>10}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for model_name, model in models.items():
+            best = None
+
+            for codec, level in codecs:
+                path = os.path.join(tmp_dir, f"{codec}_{level}.joblib")
+                joblib.dump(model, path, compress=0 if codec == "none" else (codec, level))
+
+                size = os.path.getsize(path)
+
+                if storage is not None:
+                    object_name = f"benchmarks/compression/{codec}_{level}.joblib"
+                    storage.save_model(file_path=path, object_name=object_name)
+                    fetch_path = os.path.join(tmp_dir, "fetched.joblib")
+                    fetch_time = median_time(lambda: storage.download_model(object_name, fetch_path), args.repeat)
+                    storage.delete_model(object_name)
+                else:
+                    fetch_time = size / (args.bandwidth * 1024 * 1024)
+
+                load_time = median_time(lambda: joblib.load(path), args.repeat)
+                total = fetch_time + load_time
+                label = f"{codec}:{level}" if codec != "none" else "none"
+
+                print(
+                    f"{model_name:32} {label:10} {size / 1024:10.1f} "
+                    f"{fetch_time * 1000:10.2f} {load_time * 1000:10.2f} {total * 1000:10.2f}"
+                )
+
+                if best is None or total < best[1]:
+                    best = (label, total)
+
+            print(f"{model_name:32} -> лучший кодек по времени холодной загрузки: {best[0]}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Стоимость кодирования батча для /predictions/batch: JSON против бинарных
+application/x-ndarray и application/x-npy.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_encoding.py
+    python benchmarks/bench_encoding.py --rows 1 100 10000 --features 20 100 --repeat 5
+
+Вход: разбор тела запроса в массив признаков, который передается в predict
+(для JSON - json.loads, проверка BatchPredictionInput и np.array). Выход:
+сериализация меток и вероятностей в тело ответа (для JSON - через
+BatchPredictionResult, как это делает сервис).
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Callable
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from app.schemas.schemas import BatchPredictionInput, BatchPredictionResult
+from app.services.array_codec import CONTENT_TYPE_NDARRAY, CONTENT_TYPE_NPY, decode_array, encode_arrays
+
+def measure(fn: Callable, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+def json_decode(body: bytes) -> np.ndarray:
+    batch_in = BatchPredictionInput(**json.loads(body))
+
+    return np.array(batch_in.inputs, dtype=np.float64)
+
+def json_encode(labels: np.ndarray, probabilities: np.ndarray) -> bytes:
+    result = BatchPredictionResult(
+        prediction_id=1,
+        rows=len(labels),
+        output_mode="label",
+        predictions=labels.tolist(),
+        probabilities=probabilities.tolist(),
+        classes=[0, 1],
+    )
+
+    return json.dumps(result.dict()).encode()
+
+def run(rows: int, features: int, repeat: int) -> None:
+    rng = np.random.default_rng(42)
+    X = rng.random((rows, features))
+    labels = rng.integers(0, 2, size=rows)
+    probabilities = rng.random((rows, 2))
+
+    json_body = json.dumps({"model_id": 1, "inputs": X.tolist()}).encode()
+    raw_body = X.tobytes()
+    raw_headers = {"x-array-dtype": "float64", "x-array-shape": f"{rows},{features}"}
+    npy_buffer = io.BytesIO()
+    np.save(npy_buffer, X)
+    npy_body = npy_buffer.getvalue()
+
+    cases = [
+        (
+            "json",
+            json_body,
+            lambda: json_decode(json_body),
+            lambda: json_encode(labels, probabilities),
+        ),
+        (
+            "x-ndarray",
+            raw_body,
+            lambda: decode_array(raw_body, CONTENT_TYPE_NDARRAY, raw_headers),
+            lambda: encode_arrays(CONTENT_TYPE_NDARRAY, labels, probabilities),
+        ),
+        (
+            "x-npy",
+            npy_body,
+            lambda: decode_array(npy_body, CONTENT_TYPE_NPY, {}),
+            lambda: encode_arrays(CONTENT_TYPE_NPY, labels, probabilities),
+        ),
+    ]
+
+    for label, body, decode, encode in cases:
+        decode_time = measure(decode, repeat)
+        encode_time = measure(encode, repeat)
+
+        print(
+            f"{rows:>8} {features:>8} {label:10} {len(body) / 1024:12.1f} "
+            f"{decode_time * 1000:12.3f} {encode_time * 1000:12.3f}"
+        )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10_000, 100_000])
+    parser.add_argument("--features", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'features':>8} {'format':10} {'body, KB':>12} {'decode, ms':>12} {'encode, ms':>12}")
+
+    for features in args.features:
+        for rows in args.rows:
+            run(rows, features, args.repeat)
+
+if __name__ == "__main__":
+    main()
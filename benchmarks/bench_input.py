@@ -0,0 +1,93 @@
+"""
+Скорость чтения входного файла для /predictions/file: CSV против Parquet и
+Arrow IPC.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_input.py
+    python benchmarks/bench_input.py --rows 100000 --features 50 --repeat 5
+
+Данные генерируются так же, как в ml_examples/make_test_data.py. Время
+включает разбор файла и приведение к непрерывному float64 массиву, который
+передается в predict.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet as pq
+from sklearn.datasets import make_classification
+
+from app.services.input_service import read_prediction_input
+
+def make_data(rows: int, features: int) -> pd.DataFrame:
+    X, _ = make_classification(
+        n_samples=rows,
+        n_features=features,
+        n_informative=min(10, features),
+        n_redundant=min(5, max(0, features - 10)),
+        random_state=42,
+    )
+
+    return pd.DataFrame(X, columns=[f"feature_{i}" for i in range(features)])
+
+def write_files(df: pd.DataFrame, tmp_dir: str) -> dict:
+    paths = {
+        "csv": os.path.join(tmp_dir, "input.csv"),
+        "parquet": os.path.join(tmp_dir, "input.parquet"),
+        "arrow ipc": os.path.join(tmp_dir, "input.arrow"),
+    }
+
+    df.to_csv(paths["csv"], index=False)
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, paths["parquet"])
+
+    with pa.OSFile(paths["arrow ipc"], "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    return paths
+
+def measure(path: str, feature_names: list, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        with open(path, "rb") as f:
+            start = time.perf_counter()
+            read_prediction_input(f, feature_names=feature_names)
+            timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_data(args.rows, args.features)
+    feature_names = list(df.columns)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = write_files(df, tmp_dir)
+
+        print(f"{'format':10} {'size, MB':>10} {'time, ms':>10} {'rows/s':>14}")
+
+        for label, path in paths.items():
+            size = os.path.getsize(path) / (1024 * 1024)
+            elapsed = measure(path, feature_names, args.repeat)
+
+            print(f"{label:10} {size:10.1f} {elapsed * 1000:10.1f} {args.rows / elapsed:14,.0f}")
+
+if __name__ == "__main__":
+    main()
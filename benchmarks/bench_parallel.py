@@ -0,0 +1,92 @@
+"""
+Предсказание для большого файла: один вызов в текущем процессе против
+параллельного режима с шардами по процессам (ShardedScorer) при разном
+числе процессов.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_parallel.py
+    python benchmarks/bench_parallel.py --rows 1000000 --workers 1,2,4,8 --shard-rows 50000
+
+Первый прогон каждого пула прогревает процессы и загружает в них модель,
+в таблицу попадает медиана следующих прогонов. Ускорение ограничено числом
+доступных ядер.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import joblib
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.model_registry import LoadedModel
+from app.services.model_service import OUTPUT_MODE_LABEL, run_prediction
+from app.services.parallel_scoring import ShardedScorer
+
+def measure(score, repeat: int) -> float:
+    score()
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        score()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--trees", type=int, default=100)
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, 2, 4, os.cpu_count() or 1})))
+    parser.add_argument("--shard-rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    X, y = make_classification(n_samples=10000, n_features=args.features, n_informative=10, random_state=42)
+    model = RandomForestClassifier(n_estimators=args.trees, random_state=42).fit(X, y)
+
+    rng = np.random.default_rng(0)
+    data = X[rng.integers(0, len(X), size=args.rows)]
+
+    print(f"cpu: {os.cpu_count()}, rows: {args.rows}, shard rows: {args.shard_rows}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        artifact_path = os.path.join(tmp_dir, "model.joblib")
+        joblib.dump(model, artifact_path)
+
+        loaded = LoadedModel("bench", "bench", model, 0, 0.0)
+        baseline = measure(lambda: run_prediction(loaded, data, OUTPUT_MODE_LABEL), args.repeat)
+        expected = run_prediction(loaded, data, OUTPUT_MODE_LABEL).labels
+
+        print(f"{'mode':16} {'time, s':>8} {'rows/s':>12} {'speedup':>8}")
+        print(f"{'single process':16} {baseline:8.2f} {args.rows / baseline:12,.0f} {1.0:7.1f}x")
+
+        for workers in (int(value) for value in args.workers.split(",")):
+            scorer = ShardedScorer(workers=workers, shard_rows=args.shard_rows)
+
+            try:
+                def score():
+                    return scorer.score_artifact(artifact_path, None, data, OUTPUT_MODE_LABEL)
+
+                if not np.array_equal(score().labels, expected):
+                    print(f"{workers} workers: output differs from single process, skipped")
+                    continue
+
+                elapsed = measure(score, args.repeat)
+            finally:
+                scorer.shutdown()
+
+            label = f"{workers} workers"
+            print(f"{label:16} {elapsed:8.2f} {args.rows / elapsed:12,.0f} {baseline / elapsed:7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Время ответа с результатами пакетного предсказания: обычная сериализация
+через response_model против FAST_RESPONSES и сжатия gzip.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_responses.py
+    python benchmarks/bench_responses.py --rows 1 1000 1000000 --repeat 5
+
+Ответ содержит метки и вероятности двух классов, как BatchPredictionResult
+в режиме both. Время измеряется от вызова обработчика до получения клиентом
+всего тела через TestClient, без сети.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.testclient import TestClient
+
+from app.api.responses import FastJSONResponse
+from app.schemas.schemas import BatchPredictionResult
+
+OUTPUTS = {}
+
+def make_app(compression_level: int) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/standard", response_model=BatchPredictionResult)
+    def standard(rows: int) -> BatchPredictionResult:
+        labels, probabilities = OUTPUTS[rows]
+
+        return BatchPredictionResult(
+            prediction_id=1,
+            rows=rows,
+            output_mode="both",
+            predictions=labels.tolist(),
+            probabilities=probabilities.tolist(),
+            classes=[0, 1],
+        )
+
+    @app.get("/fast", response_model=BatchPredictionResult)
+    def fast(rows: int) -> FastJSONResponse:
+        labels, probabilities = OUTPUTS[rows]
+
+        return FastJSONResponse({
+            "prediction_id": 1,
+            "rows": rows,
+            "output_mode": "both",
+            "predictions": labels,
+            "probabilities": probabilities,
+            "classes": [0, 1],
+        })
+
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=compression_level)
+
+    return app
+
+def measure(client: TestClient, path: str, rows: int, gzip: bool, repeat: int) -> tuple:
+    headers = {"accept-encoding": "gzip" if gzip else "identity"}
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path, params={"rows": rows}, headers=headers)
+        response.content
+        timings.append(time.perf_counter() - start)
+
+    size = int(response.headers.get("content-length", len(response.content)))
+
+    return statistics.median(timings), size
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 100, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compression-level", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+
+    for rows in args.rows:
+        probabilities = rng.random((rows, 2))
+        OUTPUTS[rows] = (probabilities.argmax(axis=1), probabilities)
+
+    client = TestClient(make_app(args.compression_level))
+
+    print(f"{'rows':>9} {'mode':14} {'body, KB':>12} {'time, ms':>10}")
+
+    for rows in args.rows:
+        for label, path, gzip in (
+            ("standard", "/standard", False),
+            ("fast", "/fast", False),
+            ("fast + gzip", "/fast", True),
+        ):
+            elapsed, size = measure(client, path, rows, gzip, args.repeat)
+
+            print(f"{rows:>9} {label:14} {size / 1024:12.1f} {elapsed * 1000:10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Пропускная способность скачивания артефактов из хранилища для маленьких
+и больших объектов.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_storage.py --backend local
+    python benchmarks/bench_storage.py --backend minio --sizes 64K,1M,16M,256M
+
+Для MinIO сравниваются скачивание одним потоком и параллельными ranged GET
+запросами. Параметры подключения берутся из настроек (.env).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.core.config import settings
+from app.services.storage_backends import LocalStorageBackend, MinioStorageBackend
+
+UNITS = {"K": 1024, "M": 1024 * 1024, "G": 1024 * 1024 * 1024}
+
+def parse_size(value: str) -> int:
+    value = value.strip().upper()
+
+    if value[-1] in UNITS:
+        return int(float(value[:-1]) * UNITS[value[-1]])
+
+    return int(value)
+
+def minio_backend(range_threshold: int, concurrency: int) -> MinioStorageBackend:
+    return MinioStorageBackend(
+        endpoint=settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        bucket=settings.MINIO_BUCKET,
+        secure=settings.MINIO_SECURE,
+        pool_size=max(settings.STORAGE_POOL_SIZE, concurrency),
+        range_threshold=range_threshold,
+        range_part_size=settings.STORAGE_RANGE_PART_SIZE,
+        range_concurrency=concurrency,
+    )
+
+def measure(backend, object_name: str, target: str, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        backend.get_file(object_name, target)
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["minio", "local"], default=settings.STORAGE_BACKEND)
+    parser.add_argument("--sizes", default="64K,1M,16M,128M")
+    parser.add_argument("--concurrency", type=int, default=settings.STORAGE_RANGE_CONCURRENCY)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if args.backend == "local":
+            variants = {"local": LocalStorageBackend(os.path.join(tmp_dir, "storage"))}
+        else:
+            variants = {
+                "single stream": minio_backend(range_threshold=2 ** 62, concurrency=1),
+                f"ranged x{args.concurrency}": minio_backend(range_threshold=0, concurrency=args.concurrency),
+            }
+
+        uploader = next(iter(variants.values()))
+        source = os.path.join(tmp_dir, "source.bin")
+        target = os.path.join(tmp_dir, "target.bin")
+
+        print(f"{'size':>8} {'variant':16} {'time, ms':>10} {'MB/s':>10}")
+
+        for label in args.sizes.split(","):
+            size = parse_size(label)
+            object_name = f"benchmarks/storage/{size}.bin"
+
+            with open(source, "wb") as f:
+                f.write(os.urandom(size))
+
+            uploader.put_file(object_name, source)
+
+            try:
+                for variant, backend in variants.items():
+                    elapsed = measure(backend, object_name, target, args.repeat)
+                    throughput = size / (1024 * 1024) / elapsed
+
+                    print(f"{label:>8} {variant:16} {elapsed * 1000:10.2f} {throughput:10.1f}")
+            finally:
+                uploader.delete(object_name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Пропускная способность и задержка предсказаний при одновременных запросах
+с политикой потоков и без нее.
+
+Запуск из корня репозитория:
+
+    python benchmarks/bench_threads.py
+    python benchmarks/bench_threads.py --concurrency 16 --requests 50 --batch 100
+
+Без политики модель работает с сохраненным n_jobs=-1, и каждый запрос
+запускает по потоку на ядро. С политикой n_jobs переопределяется значением
+--threads, а запросы делят общий запас потоков --budget (0 - по числу ядер),
+как это делает сервис (MODEL_INFERENCE_THREADS, MODEL_THREAD_BUDGET).
+"""
+import argparse
+import copy
+import os
+import sys
+import threading
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.thread_policy import ThreadPolicy, set_n_jobs
+
+def train_model(n_estimators: int) -> tuple:
+    X, y = make_classification(
+        n_samples=10000,
+        n_features=20,
+        n_informative=10,
+        n_redundant=5,
+        random_state=42,
+    )
+
+    model = RandomForestClassifier(n_estimators=n_estimators, n_jobs=-1, random_state=42).fit(X, y)
+
+    return model, X
+
+def run_load(predict: Callable, X: np.ndarray, concurrency: int, requests: int, batch: int) -> tuple:
+    latencies: List[float] = []
+    lock = threading.Lock()
+    rng = np.random.default_rng(0)
+    batches = [X[rng.integers(0, len(X), size=batch)] for _ in range(requests)]
+
+    def client() -> None:
+        local = []
+
+        for rows in batches:
+            start = time.perf_counter()
+            predict(rows)
+            local.append(time.perf_counter() - start)
+
+        with lock:
+            latencies.extend(local)
+
+    predict(batches[0])
+
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+
+    for thread in clients:
+        thread.start()
+
+    for thread in clients:
+        thread.join()
+
+    elapsed = time.perf_counter() - start
+
+    return len(latencies) / elapsed, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--estimators", type=int, default=100)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--budget", type=int, default=0)
+    args = parser.parse_args()
+
+    model, X = train_model(args.estimators)
+
+    print(f"cpus: {os.cpu_count()}, concurrency: {args.concurrency}, batch: {args.batch}")
+    print(f"{'mode':10} {'req/s':>8} {'p50, ms':>9} {'p99, ms':>9}")
+
+    throughput, p50, p99 = run_load(model.predict, X, args.concurrency, args.requests, args.batch)
+    print(f"{'n_jobs=-1':10} {throughput:8.1f} {p50 * 1000:9.2f} {p99 * 1000:9.2f}")
+
+    policy = ThreadPolicy(threads_per_call=args.threads, budget=args.budget)
+    policy.configure_process()
+
+    limited = copy.deepcopy(model)
+    set_n_jobs(limited, args.threads)
+
+    def predict(rows: np.ndarray) -> np.ndarray:
+        with policy.limit(args.threads):
+            return limited.predict(rows)
+
+    throughput, p50, p99 = run_load(predict, X, args.concurrency, args.requests, args.batch)
+    print(f"{'policy':10} {throughput:8.1f} {p50 * 1000:9.2f} {p99 * 1000:9.2f}")
+
+if __name__ == "__main__":
+    main()
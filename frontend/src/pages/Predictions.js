@@ -95,13 +95,14 @@ const Predictions = () => {
       const response = await axios.post(
         `http://localhost:8000/api/v1/models/${selectedModel}/predict`,
         {
-          input_data: inputData
+          input_data: inputData.split(/[\s,]+/).filter(Boolean).map(Number)
         },
         {
           headers: {
             Authorization: `Bearer ${localStorage.getItem('token')}`,
             'Content-Type': 'application/json',
           },
+          params: { output_mode: 'both' },
         }
       );
       setResult(response.data);
@@ -180,22 +181,20 @@ const Predictions = () => {
     }
   };
 
-  const handleDownload = async (filename) => {
+  const handleDownload = async (predictionId, kind) => {
     try {
       const response = await axios.get(
-        `http://localhost:8000/api/v1/predictions/file/${filename}`,
+        `http://localhost:8000/api/v1/predictions/${predictionId}/download`,
         {
           headers: {
             'Authorization': `Bearer ${localStorage.getItem('token')}`,
           },
-          responseType: 'blob',
+          params: { kind },
         }
       );
 
-      const url = window.URL.createObjectURL(new Blob([response.data]));
       const link = document.createElement('a');
-      link.href = url;
-      link.setAttribute('download', filename);
+      link.href = response.data.url;
       document.body.appendChild(link);
       link.click();
       link.remove();
@@ -304,6 +303,11 @@ const Predictions = () => {
             <Typography variant="body1">
               {String(result.prediction_result)}
             </Typography>
+            {result.probabilities && (
+              <Typography variant="body2" color="text.secondary">
+                Вероятности классов: {result.probabilities.map((p) => p.toFixed(3)).join(', ')}
+              </Typography>
+            )}
           </Box>
         )}
 
@@ -322,11 +326,11 @@ const Predictions = () => {
                 startIcon={<CloudUploadIcon />}
                 fullWidth
               >
-                {selectedFile ? selectedFile.name : 'Выберите CSV файл'}
+                {selectedFile ? selectedFile.name : 'Выберите файл (CSV, Parquet, Arrow)'}
                 <input
                   type="file"
                   hidden
-                  accept=".csv"
+                  accept=".csv,.parquet,.arrow,.feather"
                   onChange={handleFileChange}
                 />
               </Button>
@@ -352,13 +356,13 @@ const Predictions = () => {
               Файл обработан успешно
             </Typography>
             <Typography variant="body2" color="textSecondary" gutterBottom>
-              Количество предсказаний: {fileResult.predictions.length}
+              Количество предсказаний: {fileResult.rows}
             </Typography>
             <Button
               variant="contained"
               color="success"
               startIcon={<DownloadIcon />}
-              onClick={() => handleDownload(fileResult.file_path.split('/').pop())}
+              onClick={() => handleDownload(fileResult.prediction_id, 'result')}
               fullWidth
             >
               Скачать результаты
@@ -398,7 +402,7 @@ const Predictions = () => {
                         <Tooltip title="Скачать входной файл">
                           <IconButton
                             color="primary"
-                            onClick={() => handleDownload(prediction.input_file_path.split('/').pop())}
+                            onClick={() => handleDownload(prediction.id, 'input')}
                           >
                             <DownloadIcon />
                           </IconButton>
@@ -414,7 +418,7 @@ const Predictions = () => {
                         <Tooltip title="Скачать результаты">
                           <IconButton
                             color="primary"
-                            onClick={() => handleDownload(prediction.result_file_path.split('/').pop())}
+                            onClick={() => handleDownload(prediction.id, 'result')}
                           >
                             <DownloadIcon />
                           </IconButton>
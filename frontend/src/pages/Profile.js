@@ -75,22 +75,20 @@ const Profile = () => {
     }
   };
 
-  const handleDownload = async (filename) => {
+  const handleDownload = async (predictionId, kind) => {
     try {
       const response = await axios.get(
-        `http://localhost:8000/api/v1/predictions/file/${filename}`,
+        `http://localhost:8000/api/v1/predictions/${predictionId}/download`,
         {
           headers: {
             'Authorization': `Bearer ${localStorage.getItem('token')}`,
           },
-          responseType: 'blob',
+          params: { kind },
         }
       );
 
-      const url = window.URL.createObjectURL(new Blob([response.data]));
       const link = document.createElement('a');
-      link.href = url;
-      link.setAttribute('download', filename);
+      link.href = response.data.url;
       document.body.appendChild(link);
       link.click();
       link.remove();
@@ -249,7 +247,7 @@ const Profile = () => {
                             <Tooltip title="Скачать входной файл">
                               <IconButton
                                 color="primary"
-                                onClick={() => handleDownload(prediction.input_file_path.split('/').pop())}
+                                onClick={() => handleDownload(prediction.id, 'input')}
                               >
                                 <DownloadIcon />
                               </IconButton>
@@ -265,7 +263,7 @@ const Profile = () => {
                             <Tooltip title="Скачать результаты">
                               <IconButton
                                 color="primary"
-                                onClick={() => handleDownload(prediction.result_file_path.split('/').pop())}
+                                onClick={() => handleDownload(prediction.id, 'result')}
                               >
                                 <DownloadIcon />
                               </IconButton>